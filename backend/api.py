@@ -1,102 +1,450 @@
 from datetime import datetime, timedelta
-from flask import jsonify, request
+from flask import Response, jsonify, request
 import os
-import json
+import time
+import numpy as np
 from crop_prediction import (
+    HARDCODED_DATA,
+    WEATHER_FEATURES,
     get_districts_data,
-    get_district_geojson,
+    get_shadow_stats,
+    model_inputs,
     predict_yield,
+    predict_batch,
     load_historical_data,
 )
-from trend_analysis import (
-    fetch_news,
-    process_articles,
-    save_articles_and_insights,
-    get_last_execution,
-    update_last_execution,
-)
+from trend_analysis import run_news_pipeline
+from backfill import MAX_BACKFILL_WORKERS, run_backfill
+from model_registry import ensure_flat_export, get_model_version, get_shadow_version, load_manifest
+from geo_index import build_grid_index, get_district_features, get_district_geojson, query_bbox, query_point
+from geo_simplify import clamp_zoom, dissolve_grid, simplify_features
+import response_cache
+from response_cache import cached_response, invalidate_prefix, serialize
+from historical_store import get_store, ingest_rows, start_csv_watcher
+from scenarios import run_scenarios
+from forest_uncertainty import PREDICTION_INTERVAL, predict_with_intervals
+import llm_cache
+import insights_store
+import jobs
 
 print(f"Current working directory: {os.getcwd()}")
-# Constants
-NEWS_OUTPUT_DIR = "assets/news_insights"
+# Idle event streams send a comment this often
+SSE_HEARTBEAT_SECONDS = 15
+# An event stream holds a server thread, so it is closed after this long and the client
+# reconnects to /jobs/<id>/events with Last-Event-ID to continue
+SSE_STREAM_SECONDS = int(os.environ.get("SSE_STREAM_SECONDS", 30))
+
+# Load shared data. Historical data is read through get_store() so ingested seasons show up without a restart.
+_, geojson_data, all_districts_geojson = load_historical_data()
+grid_index = build_grid_index(geojson_data)
+# Set once warm_up has loaded the model and built the shared responses
+_readiness = {"ready": False, "error": None, "warmed_at": None}
+
+
+def invalidate_historical_responses(districts):
+    """
+    Drop cached historical responses for the given districts, or for all districts when None.
+    Keys carry the store generation, so this only frees memory: a new snapshot is never served old bytes.
+    """
+    if districts is None:
+        invalidate_prefix("historical:")
+    else:
+        for district in districts:
+            invalidate_prefix(f"historical:{district}:")
+
+
+def _date_arg(name):
+    """
+    Optional YYYY-MM-DD query argument. Raises ValueError for any other format.
+    """
+    value = request.args.get(name)
+    if value:
+        try:
+            datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError(f"{name} must be in YYYY-MM-DD format")
+    return value
+
+
+def _news_date():
+    """
+    The ?date= to process news for, yesterday when not given. Raises ValueError for a malformed date.
+    """
+    date_param = request.args.get("date", None)
+    if not date_param:
+        return datetime.now() - timedelta(days=1)
+    return datetime.strptime(date_param, "%Y-%m-%d")
+
+
+def _sse(event_type, data, event_id=None):
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event_type}\ndata: {serialize(data).decode('utf-8')}\n\n"
 
 
-# Load shared data
-historical_data, geojson_data, all_districts_geojson = load_historical_data()
+def _event_stream(job):
+    """
+    Stream a job's events as text/event-stream, starting with the job itself.
+    The stream ends when the job finishes or after SSE_STREAM_SECONDS, whichever comes first.
+    """
+    last_id = request.headers.get("Last-Event-ID", "")
+    start = int(last_id) + 1 if last_id.isdigit() else 0
+
+    def generate():
+        deadline = time.monotonic() + SSE_STREAM_SECONDS
+        yield _sse("job", job)
+        for index, event in jobs.iter_events(job["id"], start, min(SSE_HEARTBEAT_SECONDS, SSE_STREAM_SECONDS)):
+            if index is None:
+                # Comment lines keep proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+            else:
+                yield _sse(event["type"], event, index)
+            if time.monotonic() > deadline:
+                return
+
+    return Response(generate(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def warm_up():
+    """
+    Load the default model, score every district once and serialize the boundary responses,
+    so the first requests do not pay for it. Under gunicorn this runs in the master before workers fork.
+    A forest without a flat export gets one, and is served memory-mapped from it.
+    """
+    try:
+        version, model, entry = get_model_version()
+        if ensure_flat_export(entry["path"], model):
+            version, model, entry = get_model_version()
+        inputs = np.array([[data["Weather"][f] for f in WEATHER_FEATURES] for data in HARDCODED_DATA.values()])
+        predict_with_intervals(model, model_inputs(version, entry, inputs))
+        response_cache.get_payload("all-districts", lambda: serialize(all_districts_geojson))
+        _readiness.update(ready=True, error=None, warmed_at=time.time())
+        print(f"Warm, serving model version {version}.")
+    except Exception as e:
+        _readiness.update(ready=False, error=str(e))
+        print(f"Warm-up failed: {e}")
+
+
+def start_background_tasks():
+    """
+    Start the threads each serving process needs. Threads do not survive a fork,
+    so under gunicorn this is called in every worker after it forks.
+    """
+    start_csv_watcher(invalidate_historical_responses)
+
+
+# Dates processed before the insights store existed are imported from their JSON files once
+if not insights_store.list_dates():
+    insights_store.migrate_json_dir()
+# Connections must not be shared with forked workers, each worker thread opens its own
+insights_store.close()
+warm_up()
 
 
 def register_routes(app):
+    # Health APIs
+    @app.route("/health/live", methods=["GET"])
+    def liveness():
+        """
+        The process is up and answering requests.
+        """
+        return jsonify({"status": "alive", "pid": os.getpid()})
+
+    @app.route("/health/ready", methods=["GET"])
+    def readiness():
+        """
+        Data, geo indexes and model are loaded and warm. 503 until then, or if warm-up failed.
+        """
+        checks = {
+            "historical_data": bool(get_store().districts()),
+            "grid_index": grid_index is not None,
+            "warm": _readiness["ready"],
+        }
+        ready = all(checks.values())
+        body = {"status": "ready" if ready else "not ready", "checks": checks, "pid": os.getpid()}
+        if _readiness["error"]:
+            body["error"] = _readiness["error"]
+        return jsonify(body), 200 if ready else 503
+
     # District APIs (unchanged)
     @app.route("/districts", methods=["GET"])
     def get_districts():
-        return jsonify({"districts": get_districts_data(historical_data)})
+        return jsonify({"districts": get_districts_data(get_store())})
 
     @app.route("/all-districts", methods=["GET"])
     def get_all_districts():
-        return jsonify(all_districts_geojson)
+        """
+        District boundaries. ?zoom= returns geometries simplified for that zoom level.
+        """
+        zoom = request.args.get("zoom", type=int)
+        if zoom is None:
+            return cached_response("all-districts", lambda: serialize(all_districts_geojson))
+        zoom = clamp_zoom(zoom)
+        return cached_response(
+            f"all-districts:z{zoom}",
+            lambda: serialize({
+                "type": "FeatureCollection",
+                "features": simplify_features(all_districts_geojson["features"], zoom),
+            }),
+        )
 
     @app.route("/district/<district_name>/historical", methods=["GET"])
     def get_historical(district_name):
-        data = get_districts_data(historical_data, district_name)
+        store = get_store()
+        data = store.district_json(district_name)
         if not data:
             return jsonify({"error": "District not found"}), 404
-        return jsonify(data)
+        # An ingest can swap the store between here and caching, the generation keeps the bytes with their snapshot
+        return cached_response(f"historical:{district_name}:g{store.generation}", lambda: data)
+
+    @app.route("/historical/ingest", methods=["POST"])
+    def ingest_historical():
+        """
+        Append new season rows. Body: {"rows": [{"Year": "2024-25", "District": ..., "Area": ..., ...}]}
+        """
+        body = request.get_json(silent=True) or {}
+        if not isinstance(body, dict):
+            return jsonify({"error": "Body must be a JSON object"}), 400
+        try:
+            changed = ingest_rows(body.get("rows"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        invalidate_historical_responses(changed)
+        return jsonify({"message": "Rows ingested.", "rows": len(body["rows"]), "districts": changed})
 
     @app.route("/district/<district_name>/predict", methods=["POST"])
     def predict_production(district_name):
-        prediction = predict_yield(historical_data, district_name)
+        confidence = request.args.get("interval", PREDICTION_INTERVAL, type=float)
+        try:
+            prediction = predict_yield(get_store(), district_name, confidence, request.args.get("model"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         if not prediction:
             return jsonify({"error": "District not found"}), 404
         return jsonify(prediction)
 
+    @app.route("/predict/batch", methods=["POST"])
+    def predict_production_batch():
+        """
+        Score many districts and/or explicit scenarios with one model call.
+        Body: {"districts": [...], "scenarios": [{"District": ..., "Area": ..., "Weather": {...}}], "interval": 0.9,
+               "model": "<version>"}
+        Without a body every known district is scored.
+        """
+        body = request.get_json(silent=True) or {}
+        if not isinstance(body, dict):
+            return jsonify({"error": "Body must be a JSON object"}), 400
+        districts = body.get("districts", [])
+        scenarios = body.get("scenarios", [])
+        if not isinstance(districts, list) or not isinstance(scenarios, list):
+            return jsonify({"error": "'districts' and 'scenarios' must be lists"}), 400
+        if not districts and not scenarios:
+            districts = get_districts_data(get_store())
+
+        try:
+            predictions = predict_batch(
+                get_store(), [{"District": name} for name in districts] + scenarios,
+                float(body.get("interval", PREDICTION_INTERVAL)),
+                body.get("model"),
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"predictions": predictions})
+
+    @app.route("/district/<district_name>/scenarios", methods=["POST"])
+    def predict_scenarios(district_name):
+        """
+        What-if sweep over weather and area.
+        Body: {"mode": "grid" | "monte_carlo", "parameters": {...}, "samples": ..., "percentiles": [...]}
+        The model version comes from ?model= or "model" in the body.
+        """
+        body = request.get_json(silent=True) or {}
+        if request.args.get("model") and isinstance(body, dict):
+            body["model"] = request.args["model"]
+        try:
+            result = run_scenarios(district_name, body)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if not result:
+            return jsonify({"error": "District not found"}), 404
+        return jsonify(result)
+
+    @app.route("/models", methods=["GET"])
+    def list_models():
+        """
+        Model versions that can be requested with ?model=, with the default and shadow versions.
+        """
+        manifest = load_manifest() or {"default": "default", "models": {}}
+        return jsonify({
+            "default": manifest["default"],
+            "shadow": get_shadow_version(),
+            "shadow_scoring": get_shadow_stats(),
+            "models": manifest["models"],
+        })
+
     @app.route("/district/<district_name>/map", methods=["GET"])
     def get_district_map(district_name):
-        geojson = get_district_geojson(geojson_data, district_name)
+        """
+        Grid cells of a district. ?zoom= merges cells too small to see into simplified shapes.
+        """
+        geojson = get_district_geojson(grid_index, district_name)
         if not geojson:
             return jsonify({"error": f"District '{district_name}' not found"}), 404
-        return jsonify(geojson)
+        zoom = request.args.get("zoom", type=int)
+        if zoom is None:
+            return cached_response(f"map:{district_name}", lambda: geojson)
+        zoom = clamp_zoom(zoom)
+        return cached_response(
+            f"map:{district_name}:z{zoom}",
+            lambda: serialize({
+                "type": "FeatureCollection",
+                "features": dissolve_grid(get_district_features(grid_index, district_name), zoom),
+            }),
+        )
+
+    @app.route("/grid", methods=["GET"])
+    def get_grid_bbox():
+        """
+        Grid cells intersecting ?bbox=min_lon,min_lat,max_lon,max_lat.
+        """
+        try:
+            min_lon, min_lat, max_lon, max_lat = [float(v) for v in request.args.get("bbox", "").split(",")]
+        except ValueError:
+            return jsonify({"error": "bbox must be 'min_lon,min_lat,max_lon,max_lat'"}), 400
+        return Response(query_bbox(grid_index, min_lon, min_lat, max_lon, max_lat), mimetype="application/json")
+
+    @app.route("/grid/at", methods=["GET"])
+    def get_grid_at():
+        """
+        Grid cells containing the point ?lat=&lon=.
+        """
+        lat = request.args.get("lat", type=float)
+        lon = request.args.get("lon", type=float)
+        if lat is None or lon is None:
+            return jsonify({"error": "lat and lon are required numbers"}), 400
+        return Response(query_point(grid_index, lat, lon), mimetype="application/json")
 
     # News APIs
     @app.route("/news/trigger", methods=["POST"])
     def trigger_news_processing():
         """
-        Trigger news processing, allowing optional date specification.
+        Trigger news processing in the background, allowing optional date specification.
+        Returns a job id to poll at /jobs/<id>. A trigger for a date that is already
+        being processed returns the running job.
         """
-        date_param = request.args.get("date", None)
-
-        # Default to yesterday if no date is provided
-        date_to_process = (
-            datetime.now() - timedelta(days=1) if not date_param else datetime.strptime(date_param, "%Y-%m-%d")
-        )
+        try:
+            date_to_process = _news_date()
+        except ValueError:
+            return jsonify({"error": "date must be in YYYY-MM-DD format"}), 400
         date_str = date_to_process.strftime("%Y-%m-%d")
 
-        # Fetch and process news
-        articles = fetch_news(date_to_process)
-        processed_data = process_articles(articles)
-        save_articles_and_insights(date_str, articles, processed_data, NEWS_OUTPUT_DIR)
-        update_last_execution(date_str)
-
+        job, created = jobs.submit(f"news:{date_str}", run_news_pipeline, date_to_process)
         return jsonify({
-            "message": "News processing completed.",
-            "insights_saved": date_str,
-            "total_articles": processed_data["total_articles"],
-            "relevant_articles": processed_data["relevant_articles_count"],
-            "insights_count": processed_data["insights_count"]
-        })
+            "message": "News processing started." if created else "News processing already in progress.",
+            "date": date_str,
+            "job_id": job["id"],
+            "status": job["status"],
+        }), 202
+
+    @app.route("/news/stream", methods=["POST"])
+    def stream_news_processing():
+        """
+        Trigger news processing like /news/trigger and stream its events as server-sent events:
+        relevance verdicts, each insight as it completes, the TL;DR piece by piece, then done or failed.
+        """
+        try:
+            date_to_process = _news_date()
+        except ValueError:
+            return jsonify({"error": "date must be in YYYY-MM-DD format"}), 400
+        job, _ = jobs.submit(f"news:{date_to_process:%Y-%m-%d}", run_news_pipeline, date_to_process)
+        return _event_stream(job)
+
+    @app.route("/jobs/<job_id>/events", methods=["GET"])
+    def stream_job_events(job_id):
+        """
+        Server-sent events of a job, replayed from the start or after Last-Event-ID.
+        Only the server process running a job has its events, elsewhere the stream holds its status.
+        """
+        job = jobs.get_job(job_id)
+        if not job:
+            return jsonify({"error": f"Job '{job_id}' not found"}), 404
+        return _event_stream(job)
+
+    @app.route("/news/backfill", methods=["POST"])
+    def trigger_news_backfill():
+        """
+        Process every date from ?start= to ?end= in the background, ?workers= dates at a time
+        up to MAX_BACKFILL_WORKERS. Dates that already have insights are skipped unless ?force=true.
+        """
+        try:
+            start = datetime.strptime(request.args.get("start", ""), "%Y-%m-%d")
+            end = datetime.strptime(request.args.get("end", ""), "%Y-%m-%d")
+        except ValueError:
+            return jsonify({"error": "start and end must be in YYYY-MM-DD format"}), 400
+        if end < start:
+            return jsonify({"error": "end must not be before start"}), 400
+        force = request.args.get("force", "false").lower() in ("1", "true", "yes")
+        workers = request.args.get("workers", type=int)
+        if "workers" in request.args and (workers is None or workers < 1):
+            return jsonify({"error": "workers must be a positive integer"}), 400
+        if workers:
+            workers = min(workers, MAX_BACKFILL_WORKERS)
 
+        job, created = jobs.submit(
+            f"backfill:{start:%Y-%m-%d}:{end:%Y-%m-%d}:{force}",
+            run_backfill, start, end, force, workers,
+        )
+        return jsonify({
+            "message": "Backfill started." if created else "Backfill already in progress.",
+            "job_id": job["id"],
+            "status": job["status"],
+        }), 202
 
+    @app.route("/jobs/<job_id>", methods=["GET"])
+    def get_job_status(job_id):
+        job = jobs.get_job(job_id)
+        if not job:
+            return jsonify({"error": f"Job '{job_id}' not found"}), 404
+        return jsonify(job)
 
+    @app.route("/llm/cache/stats", methods=["GET"])
+    def get_llm_cache_stats():
+        return jsonify(llm_cache.get_stats())
 
     @app.route("/news/insights/<date>", methods=["GET"])
     def get_news_insights(date):
-        file_path = os.path.join(NEWS_OUTPUT_DIR, f"{date}.json")
-        if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                results = json.load(f)
+        results = insights_store.get_day(date)
+        if results:
             return jsonify({"date": date, "results": results})
         return jsonify({"error": f"No insights available for {date}."}), 404
 
     @app.route("/news/dates", methods=["GET"])
     def get_available_dates():
-        files = [f.split(".")[0] for f in os.listdir(NEWS_OUTPUT_DIR) if f.endswith(".json")]
-        return jsonify({"available_dates": sorted(files)})
+        return jsonify({"available_dates": insights_store.list_dates()})
+
+    @app.route("/news/insights", methods=["GET"])
+    def get_news_insights_range():
+        """
+        Insights and TL;DR of every date from ?from= to ?to=, newest first. Paged with ?limit=&offset=.
+        """
+        try:
+            page = insights_store.get_days(
+                _date_arg("from"), _date_arg("to"), request.args.get("limit"), request.args.get("offset")
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(page)
+
+    @app.route("/news/search", methods=["GET"])
+    def search_news_insights():
+        """
+        Full-text search of insight titles and text, ?q= terms must all match. Optional ?from=&to= and ?limit=&offset=.
+        """
+        try:
+            page = insights_store.search(
+                request.args.get("q", ""), _date_arg("from"), _date_arg("to"),
+                request.args.get("limit"), request.args.get("offset"),
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(page)
@@ -1,5 +1,5 @@
 from flask import Flask
-from api import register_routes
+from api import register_routes, start_background_tasks
 from trend_analysis import (
     process_manual_articles
 )
@@ -9,7 +9,8 @@ app = Flask(__name__)
 register_routes(app)
 
 if __name__ == "__main__":
+    # Development server, production runs gunicorn with backend/gunicorn.conf.py
+    start_background_tasks()
     app.run(debug=True)
     # input_file = "assets/articles.json"
-    # output_dir = "assets/news_insights"
-    # process_manual_articles(input_file, output_dir)
+    # process_manual_articles(input_file)
@@ -0,0 +1,137 @@
+# to run: python backend/backfill.py --start 2024-11-01 --end 2024-11-30 [--workers 4] [--force]
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from trend_analysis import cluster_stories, fetch_news, get_last_execution, run_news_pipeline
+from news_dedup import DEDUP_WINDOW_DAYS
+import insights_store
+import jobs
+
+# Dates fetched ahead, and dates processed, at the same time
+BACKFILL_WORKERS = int(os.environ.get("BACKFILL_WORKERS", 4))
+# Most workers a backfill request may ask for, each one fetches and processes a date at a time
+MAX_BACKFILL_WORKERS = int(os.environ.get("MAX_BACKFILL_WORKERS", 16))
+
+
+def _already_processed(date_str, ledger):
+    """
+    A date is done if the ledger says so, or if it predates the ledger and has stored insights.
+    Dates left 'running' by a crash or marked 'failed' are processed again.
+    """
+    entry = ledger.get(date_str)
+    if entry:
+        return entry["status"] == "done"
+    return insights_store.has_day(date_str)
+
+
+def _new_story_fingerprints(date_str, clusters):
+    """
+    Fingerprints of a date's stories not seen on earlier days, like insights_store.recent_fingerprints
+    returns once the date is saved. Their relevancy is not known before the date is classified.
+    """
+    return [
+        {"date": date_str, "url": cluster["representative"].get("url", "No URL"), "relevancy": None,
+         "simhash": cluster["simhash"]}
+        for cluster in clusters if not cluster["earlier"]
+    ]
+
+
+def run_backfill(report_progress, start, end, force=False, workers=None):
+    """
+    Process every date from start to end inclusive.
+    News for all dates is fetched ahead, `workers` dates at a time. Cross-day deduplication is cheap
+    and done in date order, each date against the stories of the DEDUP_WINDOW_DAYS days before it,
+    including earlier dates of this backfill. The LLM work of each date then runs in parallel, `workers` dates at a time.
+    Dates that were already processed are skipped unless `force` is set, and so are dates
+    another job is processing: each date is claimed under the same news:<date> key as /news/trigger.
+    """
+    dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    ledger = get_last_execution().get("dates", {})
+    pending = [
+        date for date in dates
+        if force or not _already_processed(date.strftime("%Y-%m-%d"), ledger)
+    ]
+    skipped = len(dates) - len(pending)
+
+    counters = {"dates_total": len(dates), "dates_skipped": skipped, "dates_done": 0, "dates_failed": 0}
+    failed_dates = []
+    lock = threading.Lock()
+    report_progress(**counters)
+    # A trigger for a date being backfilled returns the backfill job
+    owner = jobs.current_job_id()
+
+    def prefetch(date):
+        try:
+            return fetch_news(date)
+        except Exception as e:
+            # The pipeline fetches the date again and records the failure
+            print(f"Backfill could not prefetch news for {date:%Y-%m-%d}: {e}")
+            return None
+
+    def process_date(date, articles, clusters):
+        date_str = date.strftime("%Y-%m-%d")
+        with jobs.claim(f"news:{date_str}", owner) as claimed:
+            if not claimed:
+                print(f"Backfill skipped {date_str}, another job is processing it.")
+                outcome = "dates_skipped"
+            else:
+                try:
+                    run_news_pipeline(lambda **fields: None, date, articles, clusters)
+                    outcome = "dates_done"
+                except Exception as e:
+                    print(f"Backfill failed for {date_str}: {e}")
+                    outcome = "dates_failed"
+        with lock:
+            counters[outcome] += 1
+            if outcome == "dates_failed":
+                failed_dates.append(date_str)
+            report_progress(**counters)
+
+    if pending:
+        workers = min(workers or BACKFILL_WORKERS, len(pending))
+        pending_strs = {date.strftime("%Y-%m-%d") for date in pending}
+        # New stories of the dates clustered so far: date string -> fingerprints
+        fingerprints = {}
+        with ThreadPoolExecutor(max_workers=workers) as fetcher, ThreadPoolExecutor(max_workers=workers) as executor:
+            prefetched = [(date, fetcher.submit(prefetch, date)) for date in pending]
+            processed = []
+            for date, fetched in prefetched:
+                date_str = date.strftime("%Y-%m-%d")
+                articles, clusters = fetched.result(), None
+                if articles is not None:
+                    window_start = (date - timedelta(days=DEDUP_WINDOW_DAYS)).strftime("%Y-%m-%d")
+                    # Stored stories of dates this backfill redoes are replaced by the ones clustered above
+                    earlier = [
+                        fingerprint for fingerprint in insights_store.recent_fingerprints(date_str, DEDUP_WINDOW_DAYS)
+                        if fingerprint["date"] not in pending_strs
+                    ] + [
+                        fingerprint for day, day_fingerprints in fingerprints.items() if day >= window_start
+                        for fingerprint in day_fingerprints
+                    ]
+                    clusters = cluster_stories(articles, date_str, earlier)
+                    fingerprints[date_str] = _new_story_fingerprints(date_str, clusters)
+                processed.append(executor.submit(process_date, date, articles, clusters))
+            for future in processed:
+                future.result()
+
+    return {**counters, "failed_dates": sorted(failed_dates)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process news insights for a range of dates.")
+    parser.add_argument("--start", required=True, help="First date, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="Last date, YYYY-MM-DD")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS, help="Dates fetched ahead and processed in parallel")
+    parser.add_argument("--force", action="store_true", help="Reprocess dates that already have insights")
+    args = parser.parse_args()
+
+    summary = run_backfill(
+        lambda **fields: print(f"Progress: {fields}"),
+        datetime.strptime(args.start, "%Y-%m-%d"),
+        datetime.strptime(args.end, "%Y-%m-%d"),
+        force=args.force,
+        workers=args.workers,
+    )
+    print(f"Backfill complete: {summary}")
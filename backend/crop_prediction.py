@@ -1,18 +1,24 @@
-import pandas as pd
-import joblib
+import os
 import numpy as np
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from model_registry import get_model_version, get_shadow_version
+from forest_compiler import predict_point
+from forest_uncertainty import PREDICTION_INTERVAL, predict_with_intervals
+from historical_store import get_store
+
+# Rice grid cells shown on the district maps
+GRID_GEOJSON_PATH = os.environ.get("GRID_GEOJSON_PATH", "assets/simulate_rice_grid_1000x1000.geojson")
 
 
 def load_historical_data():
     # Paths for assets
-    historical_csv_path = "assets/actual_crop_data_with_simulated_weather_data.csv"
-    geojson_path = "assets/simulate_rice_grid_1000x1000.geojson"
+    geojson_path = GRID_GEOJSON_PATH
     all_districts_geojson_path = "assets/five_punjab_districts.geojson"
 
-    # Load historical data
-    historical_data = pd.read_csv(historical_csv_path)
-    historical_data["Year"] = historical_data["Year"].str.split("-").str[0].astype(int)
+    # Load the live historical store
+    historical_data = get_store()
 
     # Load GeoJSON data
     with open(geojson_path, "r") as f:
@@ -26,154 +32,264 @@ def load_historical_data():
 def get_districts_data(historical_data, district_name=None):
     
     if district_name:
-        district_data = historical_data[historical_data["District"] == district_name]
-        if district_data.empty:
-            return None
-        return {
-            "District": district_name,
-            "Historical_Data": {
-                "Years": district_data["Year"].tolist(),
-                "Area": district_data["Area"].tolist(),
-                "Production": district_data["Production"].tolist(),
-                "Yield": district_data["Crop_Yield"].tolist(),
-            }
-        }
-    return historical_data["District"].unique().tolist()
-
-
-def predict_yield(historical_data, district_name):
-    # Hardcoded values for area and weather data
-    hardcoded_data = {
-        "Bhawalnagar": {
-            "Area": 110.0,
-            "Weather": {
-                "Plantation_Temperature": 29.0,
-                "Plantation_Humidity": 68.0,
-                "Plantation_Rainfall": 140.0,
-                "Growth_Temperature": 34.0,
-                "Growth_Humidity": 75.0,
-                "Growth_Rainfall": 280.0,
-                "Harvest_Temperature": 20.0,
-                "Harvest_Humidity": 48.0,
-                "Harvest_Rainfall": 45.0,
-            },
+        return historical_data.district_data(district_name)
+    return historical_data.districts()
+
+
+# Weather features in the order the yield model expects them
+WEATHER_FEATURES = [
+    "Plantation_Temperature", "Plantation_Humidity", "Plantation_Rainfall",
+    "Growth_Temperature", "Growth_Humidity", "Growth_Rainfall",
+    "Harvest_Temperature", "Harvest_Humidity", "Harvest_Rainfall",
+]
+
+# Hardcoded values for area and weather data
+HARDCODED_DATA = {
+    "Bhawalnagar": {
+        "Area": 110.0,
+        "Weather": {
+            "Plantation_Temperature": 29.0,
+            "Plantation_Humidity": 68.0,
+            "Plantation_Rainfall": 140.0,
+            "Growth_Temperature": 34.0,
+            "Growth_Humidity": 75.0,
+            "Growth_Rainfall": 280.0,
+            "Harvest_Temperature": 20.0,
+            "Harvest_Humidity": 48.0,
+            "Harvest_Rainfall": 45.0,
         },
-        "Sheikhupura": {
-            "Area": 232.0,
-            "Weather": {
-                "Plantation_Temperature": 30.0,
-                "Plantation_Humidity": 70.0,
-                "Plantation_Rainfall": 150.0,
-                "Growth_Temperature": 35.0,
-                "Growth_Humidity": 80.0,
-                "Growth_Rainfall": 300.0,
-                "Harvest_Temperature": 25.0,
-                "Harvest_Humidity": 50.0,
-                "Harvest_Rainfall": 50.0,
-            },
+    },
+    "Sheikhupura": {
+        "Area": 232.0,
+        "Weather": {
+            "Plantation_Temperature": 30.0,
+            "Plantation_Humidity": 70.0,
+            "Plantation_Rainfall": 150.0,
+            "Growth_Temperature": 35.0,
+            "Growth_Humidity": 80.0,
+            "Growth_Rainfall": 300.0,
+            "Harvest_Temperature": 25.0,
+            "Harvest_Humidity": 50.0,
+            "Harvest_Rainfall": 50.0,
         },
-        "Jhang": {
-            "Area": 154.0,
-            "Weather": {
-                "Plantation_Temperature": 28.0,
-                "Plantation_Humidity": 65.0,
-                "Plantation_Rainfall": 130.0,
-                "Growth_Temperature": 33.0,
-                "Growth_Humidity": 78.0,
-                "Growth_Rainfall": 250.0,
-                "Harvest_Temperature": 22.0,
-                "Harvest_Humidity": 45.0,
-                "Harvest_Rainfall": 40.0,
-            },
+    },
+    "Jhang": {
+        "Area": 154.0,
+        "Weather": {
+            "Plantation_Temperature": 28.0,
+            "Plantation_Humidity": 65.0,
+            "Plantation_Rainfall": 130.0,
+            "Growth_Temperature": 33.0,
+            "Growth_Humidity": 78.0,
+            "Growth_Rainfall": 250.0,
+            "Harvest_Temperature": 22.0,
+            "Harvest_Humidity": 45.0,
+            "Harvest_Rainfall": 40.0,
         },
-        "Sialkot": {
-            "Area": 190.0,
-            "Weather": {
-                "Plantation_Temperature": 27.0,
-                "Plantation_Humidity": 67.0,
-                "Plantation_Rainfall": 145.0,
-                "Growth_Temperature": 32.0,
-                "Growth_Humidity": 76.0,
-                "Growth_Rainfall": 270.0,
-                "Harvest_Temperature": 21.0,
-                "Harvest_Humidity": 46.0,
-                "Harvest_Rainfall": 42.0,
-            },
+    },
+    "Sialkot": {
+        "Area": 190.0,
+        "Weather": {
+            "Plantation_Temperature": 27.0,
+            "Plantation_Humidity": 67.0,
+            "Plantation_Rainfall": 145.0,
+            "Growth_Temperature": 32.0,
+            "Growth_Humidity": 76.0,
+            "Growth_Rainfall": 270.0,
+            "Harvest_Temperature": 21.0,
+            "Harvest_Humidity": 46.0,
+            "Harvest_Rainfall": 42.0,
         },
-        "Hafizabad": {
-            "Area": 156.0,
-            "Weather": {
-                "Plantation_Temperature": 29.5,
-                "Plantation_Humidity": 69.0,
-                "Plantation_Rainfall": 135.0,
-                "Growth_Temperature": 34.5,
-                "Growth_Humidity": 77.0,
-                "Growth_Rainfall": 260.0,
-                "Harvest_Temperature": 23.0,
-                "Harvest_Humidity": 47.0,
-                "Harvest_Rainfall": 43.0,
-            },
+    },
+    "Hafizabad": {
+        "Area": 156.0,
+        "Weather": {
+            "Plantation_Temperature": 29.5,
+            "Plantation_Humidity": 69.0,
+            "Plantation_Rainfall": 135.0,
+            "Growth_Temperature": 34.5,
+            "Growth_Humidity": 77.0,
+            "Growth_Rainfall": 260.0,
+            "Harvest_Temperature": 23.0,
+            "Harvest_Humidity": 47.0,
+            "Harvest_Rainfall": 43.0,
         },
-        "Pakpattan": {
-            "Area": 84.5,
-            "Weather": {
-                "Plantation_Temperature": 28.5,
-                "Plantation_Humidity": 66.0,
-                "Plantation_Rainfall": 140.0,
-                "Growth_Temperature": 33.5,
-                "Growth_Humidity": 74.0,
-                "Growth_Rainfall": 275.0,
-                "Harvest_Temperature": 22.0,
-                "Harvest_Humidity": 46.0,
-                "Harvest_Rainfall": 44.0,
-            },
+    },
+    "Pakpattan": {
+        "Area": 84.5,
+        "Weather": {
+            "Plantation_Temperature": 28.5,
+            "Plantation_Humidity": 66.0,
+            "Plantation_Rainfall": 140.0,
+            "Growth_Temperature": 33.5,
+            "Growth_Humidity": 74.0,
+            "Growth_Rainfall": 275.0,
+            "Harvest_Temperature": 22.0,
+            "Harvest_Humidity": 46.0,
+            "Harvest_Rainfall": 44.0,
         },
-    }
+    },
+}
+
+
+# Shadow scoring runs here so it never delays the primary response
+_shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+# Shadow batches queued or running at most. Beyond that, requests skip shadow scoring
+# instead of queueing their inputs without bound.
+SHADOW_QUEUE_LIMIT = int(os.environ.get("SHADOW_QUEUE_LIMIT", 16))
+_shadow_slots = threading.BoundedSemaphore(SHADOW_QUEUE_LIMIT)
+_shadow_stats = {"scored": 0, "failed": 0, "dropped": 0}
+_shadow_stats_lock = threading.Lock()
 
 
+def predict_yield(historical_data, district_name, confidence=PREDICTION_INTERVAL, model_version=None):
     # Check if the district exists in hardcoded data
-    if district_name not in hardcoded_data:
+    if district_name not in HARDCODED_DATA:
         return None
 
-    # Get fixed values for the district
-    district_data = hardcoded_data[district_name]
-    rice_area = district_data["Area"]
-    weather = district_data["Weather"]
-
-    # Prepare input for the model
-    inputs = np.array([[
-        weather["Plantation_Temperature"], weather["Plantation_Humidity"], weather["Plantation_Rainfall"],
-        weather["Growth_Temperature"], weather["Growth_Humidity"], weather["Growth_Rainfall"],
-        weather["Harvest_Temperature"], weather["Harvest_Humidity"], weather["Harvest_Rainfall"]
-    ]])
-
-    # Load the updated model trained with the new dataset
-    model = joblib.load("assets/rf_yield_prediction_model.pkl")
-    predicted_yield = model.predict(inputs)[0]
-    predicted_production = (predicted_yield * rice_area) / 1000  # Convert from kg to tonnes
-
-    return {
-        "District": district_name,
-        "Predicted_Production": round(predicted_production, 2),
-        "Predicted_Yield": round(predicted_yield, 2),
-        "Inputs": {
-            "Area": round(rice_area, 2),
-            "Plantation_Temperature": round(weather["Plantation_Temperature"], 2),
-            "Plantation_Humidity": round(weather["Plantation_Humidity"], 2),
-            "Plantation_Rainfall": round(weather["Plantation_Rainfall"], 2),
-            "Growth_Temperature": round(weather["Growth_Temperature"], 2),
-            "Growth_Humidity": round(weather["Growth_Humidity"], 2),
-            "Growth_Rainfall": round(weather["Growth_Rainfall"], 2),
-            "Harvest_Temperature": round(weather["Harvest_Temperature"], 2),
-            "Harvest_Humidity": round(weather["Harvest_Humidity"], 2),
-            "Harvest_Rainfall": round(weather["Harvest_Rainfall"], 2),
-        }
-    }
-
-
-
-def get_district_geojson(geojson_data, district_name):
-    if district_name == 'Bhawalnagar':
-         district_name='Bahawalnagar'
-    features = [f for f in geojson_data["features"] if f["properties"].get("district") == district_name]
-    return {"type": "FeatureCollection", "features": features} if features else None
+    return predict_batch(historical_data, [{"District": district_name}], confidence, model_version)[0]
+
+
+def model_inputs(version, entry, inputs):
+    """
+    Select and order the weather columns a model version was trained on.
+    """
+    features = entry.get("features", WEATHER_FEATURES)
+    missing = [feature for feature in features if feature not in WEATHER_FEATURES]
+    if missing:
+        raise ValueError(f"Model '{version}' needs inputs that are not available: {', '.join(missing)}")
+    if features == WEATHER_FEATURES:
+        return inputs
+    return inputs[:, [WEATHER_FEATURES.index(feature) for feature in features]]
+
+
+def get_shadow_stats():
+    """
+    Shadow batches scored, failed, and skipped because the shadow queue was full.
+    """
+    with _shadow_stats_lock:
+        return dict(_shadow_stats)
+
+
+def _submit_shadow(shadow_version, inputs, primary_version, primary_yields):
+    """
+    Queue shadow scoring unless SHADOW_QUEUE_LIMIT batches are already waiting.
+    """
+    if not _shadow_slots.acquire(blocking=False):
+        with _shadow_stats_lock:
+            _shadow_stats["dropped"] += 1
+            dropped = _shadow_stats["dropped"]
+        # Log the first drop and then every hundredth, not every request under load
+        if dropped % 100 == 1:
+            print(f"Shadow queue full, {dropped} shadow batches skipped so far.")
+        return
+    try:
+        future = _shadow_executor.submit(_shadow_score, shadow_version, inputs, primary_version, primary_yields)
+    except RuntimeError:
+        # The executor is shutting down
+        _shadow_slots.release()
+        return
+    future.add_done_callback(lambda _: _shadow_slots.release())
+
+
+def _shadow_score(shadow_version, inputs, primary_version, primary_yields):
+    """
+    Score inputs with the shadow model and log how far it is from the primary model.
+    """
+    try:
+        shadow_version, model, entry = get_model_version(shadow_version)
+        shadow_yields = predict_point(model, model_inputs(shadow_version, entry, inputs))
+        differences = np.abs(shadow_yields - primary_yields)
+        print(f"Shadow {shadow_version} vs {primary_version} on {len(differences)} rows: "
+              f"mean abs diff {differences.mean():.2f}, max abs diff {differences.max():.2f} kg/hectare")
+        outcome = "scored"
+    except Exception as e:
+        print(f"Shadow scoring with {shadow_version} failed: {e}")
+        outcome = "failed"
+    with _shadow_stats_lock:
+        _shadow_stats[outcome] += 1
+
+
+def _resolve_scenario(scenario):
+    """
+    Turn one batch item into (district name, area, weather).
+    An item either names a district, using its hardcoded inputs, or gives explicit
+    "Area" and "Weather" values. Explicit values override the district defaults.
+    """
+    if not isinstance(scenario, dict):
+        raise ValueError(f"Scenario {scenario!r} must be an object")
+    district_name = scenario.get("District")
+    if district_name is not None and district_name not in HARDCODED_DATA:
+        raise ValueError(f"District '{district_name}' not found")
+    defaults = HARDCODED_DATA.get(district_name, {"Area": None, "Weather": {}})
+
+    if not isinstance(scenario.get("Weather", {}), dict):
+        raise ValueError(f"Scenario {scenario} must give 'Weather' as an object")
+
+    rice_area = scenario.get("Area", defaults["Area"])
+    weather = {**defaults["Weather"], **scenario.get("Weather", {})}
+    missing = [feature for feature in WEATHER_FEATURES if feature not in weather]
+    if rice_area is None:
+        missing.insert(0, "Area")
+    if missing:
+        raise ValueError(f"Scenario {scenario} is missing inputs: {', '.join(missing)}")
+    try:
+        return district_name, float(rice_area), {feature: float(weather[feature]) for feature in WEATHER_FEATURES}
+    except (TypeError, ValueError):
+        raise ValueError(f"Scenario {scenario} has non-numeric inputs")
+
+
+def predict_batch(historical_data, scenarios, confidence=PREDICTION_INTERVAL, model_version=None):
+    """
+    Predict yield and production for many districts or scenarios with a single pass over the forest.
+    Returns one result per scenario, in order, shaped like predict_yield's result.
+    Each result carries a `confidence` prediction interval taken from the spread of the individual trees.
+    `model_version` picks a manifest version, the default version is used when None.
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    resolved = [_resolve_scenario(scenario) for scenario in scenarios]
+    if not resolved:
+        return []
+
+    # Stack every scenario into one feature matrix
+    inputs = np.array([[weather[feature] for feature in WEATHER_FEATURES] for _, _, weather in resolved])
+    areas = np.array([rice_area for _, rice_area, _ in resolved])
+
+    # Use the warm model kept by the registry
+    version, model, entry = get_model_version(model_version)
+    predicted_yields, lower_yields, upper_yields, yield_stds = predict_with_intervals(
+        model, model_inputs(version, entry, inputs), confidence
+    )
+    predicted_productions = (predicted_yields * areas) / 1000  # Convert from kg to tonnes
+
+    shadow_version = get_shadow_version()
+    if shadow_version and shadow_version != version:
+        _submit_shadow(shadow_version, inputs, version, predicted_yields)
+
+    results = []
+    for i, (district_name, rice_area, weather) in enumerate(resolved):
+        interval = None
+        if lower_yields is not None:
+            interval = {
+                "Confidence": confidence,
+                "Yield": [round(float(lower_yields[i]), 2), round(float(upper_yields[i]), 2)],
+                "Production": [
+                    round(float(lower_yields[i] * rice_area / 1000), 2),
+                    round(float(upper_yields[i] * rice_area / 1000), 2),
+                ],
+                "Yield_Std": round(float(yield_stds[i]), 2),
+            }
+        results.append({
+            "District": district_name,
+            "Model_Version": version,
+            "Predicted_Production": round(float(predicted_productions[i]), 2),
+            "Predicted_Yield": round(float(predicted_yields[i]), 2),
+            "Prediction_Interval": interval,
+            "Inputs": {
+                "Area": round(rice_area, 2),
+                **{feature: round(weather[feature], 2) for feature in WEATHER_FEATURES},
+            }
+        })
+    return results
+
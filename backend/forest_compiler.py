@@ -0,0 +1,258 @@
+# to run: python backend/forest_compiler.py [model.pkl] [output directory]
+import os
+import sys
+import json
+import shutil
+import threading
+import weakref
+import numpy as np
+import joblib
+
+TREE_LEAF = -1
+# Node arrays saved one .npy file each, so workers can memory-map them
+FLAT_ARRAYS = ["feature", "threshold", "left", "right", "value", "missing_go_to_left", "roots"]
+FLAT_META_FILE = "meta.json"
+# Models whose trees are averaged and can be flattened
+FLAT_MODEL_TYPES = ("RandomForestRegressor", "ExtraTreesRegressor")
+# Above this many rows sklearn's compiled traversal beats the NumPy one, so larger batches use the sklearn model
+FLAT_PREDICT_MAX_ROWS = int(os.environ.get("FLAT_PREDICT_MAX_ROWS", 256))
+
+# Flattened forests of models loaded in this process: model -> flat forest
+_flat_forests = weakref.WeakKeyDictionary()
+
+
+def compile_forest(model):
+    """
+    Flatten the trees of a fitted RandomForestRegressor into contiguous node arrays.
+    Child indices are made global, so all trees live in one set of arrays and
+    roots holds the index of each tree's first node.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.concatenate([[0], np.cumsum([tree.node_count for tree in trees])])
+
+    def global_children(children, offset):
+        return np.where(children == TREE_LEAF, TREE_LEAF, children + offset)
+
+    missing_go_to_left = [
+        getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8)) for tree in trees
+    ]
+    return {
+        "feature": np.concatenate([tree.feature for tree in trees]).astype(np.int64),
+        "threshold": np.concatenate([tree.threshold for tree in trees]).astype(np.float64),
+        "left": np.concatenate([global_children(t.children_left, o) for t, o in zip(trees, offsets)]).astype(np.int64),
+        "right": np.concatenate([global_children(t.children_right, o) for t, o in zip(trees, offsets)]).astype(np.int64),
+        "value": np.concatenate([tree.value[:, 0, 0] for tree in trees]).astype(np.float64),
+        "missing_go_to_left": np.concatenate(missing_go_to_left).astype(bool),
+        "roots": offsets[:-1].astype(np.int64),
+        "max_depth": np.array(max(tree.max_depth for tree in trees)),
+        "n_features": np.array(model.n_features_in_),
+    }
+
+
+class FlatForestModel:
+    """
+    Forest served straight from flat node arrays, without unpickling the sklearn model.
+    The pickle at `source_path` is only unpickled for batches too large for the flat traversal.
+    """
+
+    def __init__(self, forest, source_type, source_path=None):
+        self.forest = forest
+        self.source_type = source_type
+        self.source_path = source_path
+        self.n_features_in_ = int(forest["n_features"])
+        self._sklearn_model = None
+        self._sklearn_lock = threading.Lock()
+
+    def predict(self, inputs):
+        return predict_point(self, inputs)
+
+    def sklearn_model(self):
+        """
+        The model the export was made from, unpickled on first use. None when its path is unknown.
+        """
+        if self._sklearn_model is None and self.source_path:
+            with self._sklearn_lock:
+                if self._sklearn_model is None:
+                    self._sklearn_model = joblib.load(self.source_path)
+                    print(f"Loaded {self.source_path} for large batches.")
+        return self._sklearn_model
+
+
+def is_flattenable(model):
+    return isinstance(model, FlatForestModel) or type(model).__name__ in FLAT_MODEL_TYPES
+
+
+def sklearn_model_for(model, n_rows):
+    """
+    The sklearn forest to predict a batch of `n_rows` with, or None to use the flat node arrays.
+    Small batches are faster flat, large ones in sklearn's compiled tree traversal.
+    """
+    if n_rows <= FLAT_PREDICT_MAX_ROWS:
+        return None
+    if isinstance(model, FlatForestModel):
+        return model.sklearn_model()
+    return model
+
+
+def predict_point(model, inputs):
+    """
+    Point prediction, from the flat node arrays when the model is a forest and the batch is small.
+    """
+    if not is_flattenable(model):
+        return model.predict(inputs)
+    sklearn_model = sklearn_model_for(model, len(inputs))
+    if sklearn_model is not None:
+        return sklearn_model.predict(inputs)
+    return predict_flat(get_flat_forest(model), inputs)
+
+
+def get_flat_forest(model):
+    """
+    Return the flattened forest for a model, compiling it on first use.
+    """
+    if isinstance(model, FlatForestModel):
+        return model.forest
+    forest = _flat_forests.get(model)
+    if forest is None:
+        forest = compile_forest(model)
+        _flat_forests[model] = forest
+    return forest
+
+
+def tree_outputs(forest, inputs):
+    """
+    Output of every tree for every row, as an (n_rows, n_trees) matrix.
+    All (row, tree) pairs descend together, one tree level per NumPy step,
+    and pairs that reached a leaf drop out of the following steps.
+    """
+    # The trees compare float32 inputs against float64 thresholds, like sklearn does
+    inputs = np.asarray(inputs, dtype=np.float32)
+    n_features = int(forest["n_features"])
+    if inputs.ndim != 2 or inputs.shape[1] != n_features:
+        raise ValueError(f"inputs must have shape (n_rows, {n_features})")
+
+    feature, threshold, left, right = forest["feature"], forest["threshold"], forest["left"], forest["right"]
+    n_rows, n_trees = inputs.shape[0], len(forest["roots"])
+    # Node of each (row, tree) pair, row-major, and the offset of its row in the flattened inputs
+    nodes = np.tile(forest["roots"], n_rows)
+    row_offsets = np.repeat(np.arange(n_rows) * n_features, n_trees)
+    flat_inputs = inputs.ravel()
+    active = np.flatnonzero(left[nodes] != TREE_LEAF)
+
+    while active.size:
+        current = nodes[active]
+        x = flat_inputs[row_offsets[active] + feature[current]]
+        go_left = (x <= threshold[current]) | (np.isnan(x) & forest["missing_go_to_left"][current])
+        current = np.where(go_left, left[current], right[current])
+        nodes[active] = current
+        active = active[left[current] != TREE_LEAF]
+
+    return forest["value"][nodes].reshape(n_rows, n_trees)
+
+
+def predict_flat(forest, inputs, outputs=None):
+    """
+    Forest prediction from the flat node arrays.
+    Trees are summed one after the other before dividing, in the same order as sklearn,
+    so results match model.predict bit for bit.
+    """
+    if outputs is None:
+        outputs = tree_outputs(forest, inputs)
+    return average_trees(outputs)
+
+
+def average_trees(outputs):
+    """
+    Mean of an (n_rows, n_trees) matrix of tree outputs, summed tree by tree like sklearn.
+    """
+    total = np.zeros(outputs.shape[0])
+    for column in outputs.T:
+        total += column
+    return total / outputs.shape[1]
+
+
+def flat_path_for(model_path):
+    """
+    Directory holding the flat export of a pickled model: model.pkl -> model.flat
+    """
+    return os.path.splitext(model_path)[0] + ".flat"
+
+
+def export_flat_forest(model, path, source_sha256=None):
+    """
+    Save the node arrays of a forest as .npy files in the directory `path`.
+    `source_sha256` identifies the pickle the export was made from, so stale exports are ignored.
+    """
+    forest = compile_forest(model)
+    temp_path = f"{path}.tmp"
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+    for name in FLAT_ARRAYS:
+        np.save(os.path.join(temp_path, f"{name}.npy"), forest[name])
+    with open(os.path.join(temp_path, FLAT_META_FILE), "w") as f:
+        json.dump({
+            "source_type": type(model).__name__,
+            "source_sha256": source_sha256,
+            "max_depth": int(forest["max_depth"]),
+            "n_features": int(forest["n_features"]),
+        }, f, indent=4)
+
+    # Swap the complete export in, readers fall back to the pickle during the swap
+    old_path = f"{path}.old"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(temp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    print(f"Exported flat forest to {path}.")
+
+
+def load_flat_forest(path, source_sha256=None, mmap_mode="r"):
+    """
+    Load a flat export with its arrays memory-mapped read-only, so processes share one copy in the page cache.
+    Raises ValueError when the export was made from a different pickle than `source_sha256`.
+    """
+    with open(os.path.join(path, FLAT_META_FILE), "r") as f:
+        meta = json.load(f)
+    if source_sha256 and meta.get("source_sha256") != source_sha256:
+        raise ValueError(f"Flat export {path} was made from a different model file")
+    forest = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in FLAT_ARRAYS}
+    forest["max_depth"] = np.array(meta["max_depth"])
+    forest["n_features"] = np.array(meta["n_features"])
+    return forest, meta
+
+
+def load_flat_model(path, source_sha256=None, source_path=None):
+    forest, meta = load_flat_forest(path, source_sha256)
+    return FlatForestModel(forest, meta["source_type"], source_path)
+
+
+def verify_flat_forest(model, forest, inputs):
+    """
+    Raise AssertionError unless the flat forest reproduces model.predict exactly on inputs.
+    """
+    expected = model.predict(np.asarray(inputs, dtype=np.float64))
+    actual = predict_flat(forest, inputs)
+    mismatches = np.flatnonzero(expected != actual)
+    assert not len(mismatches), f"{len(mismatches)} predictions differ, first at row {mismatches[0]}"
+
+
+if __name__ == "__main__":
+    from historical_store import HISTORICAL_CSV_PATH, parse_historical_csv
+    from crop_prediction import WEATHER_FEATURES
+    from model_registry import MODEL_PATH, file_sha256
+
+    model_path = sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH
+    output_path = sys.argv[2] if len(sys.argv) > 2 else flat_path_for(model_path)
+    model = joblib.load(model_path)
+    export_flat_forest(model, output_path, file_sha256(model_path))
+
+    # Check the export on the historical data and on random inputs around it
+    forest, _ = load_flat_forest(output_path)
+    historical_inputs = parse_historical_csv(HISTORICAL_CSV_PATH)[WEATHER_FEATURES].to_numpy()
+    rng = np.random.default_rng(0)
+    random_inputs = rng.uniform(historical_inputs.min(axis=0) * 0.5, historical_inputs.max(axis=0) * 1.5,
+                                (100_000, len(WEATHER_FEATURES)))
+    verify_flat_forest(model, forest, historical_inputs)
+    verify_flat_forest(model, forest, random_inputs)
+    print(f"Flat forest matches model.predict on {len(historical_inputs)} historical and {len(random_inputs)} random rows.")
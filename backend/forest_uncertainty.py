@@ -0,0 +1,64 @@
+import weakref
+import numpy as np
+from forest_compiler import average_trees, get_flat_forest, is_flattenable, sklearn_model_for, tree_outputs
+
+# Share of tree outputs covered by a prediction interval
+PREDICTION_INTERVAL = 0.9
+
+# Trees of every sklearn model with their node values: model -> [(tree, values), ...]
+_tree_values = weakref.WeakKeyDictionary()
+
+
+def _trees_with_values(model):
+    """
+    Pair each tree of a forest with its node values, once per model.
+    """
+    trees = _tree_values.get(model)
+    if trees is None:
+        trees = [(estimator.tree_, estimator.tree_.value[:, 0, 0]) for estimator in model.estimators_]
+        _tree_values[model] = trees
+    return trees
+
+
+def tree_predictions(model, inputs):
+    """
+    Output of every tree for every row, as an (n_rows, n_trees) matrix.
+    Small batches descend the flat node arrays. Large ones use sklearn's compiled
+    tree.apply to find each tree's leaves, called on the trees directly so the
+    input is validated once rather than per tree, then read the leaf values.
+    """
+    sklearn_model = sklearn_model_for(model, len(inputs))
+    if sklearn_model is None:
+        return tree_outputs(get_flat_forest(model), inputs)
+    # Trees compare float32 inputs, the layout tree.apply requires
+    inputs = np.ascontiguousarray(inputs, dtype=np.float32)
+    outputs = np.array([values[tree.apply(inputs)] for tree, values in _trees_with_values(sklearn_model)])
+    return np.ascontiguousarray(outputs.T)
+
+
+def tree_percentiles(outputs, percentiles):
+    """
+    Percentiles across trees for every row, interpolated linearly like np.percentile.
+    Sorting the short rows once is cheaper than np.percentile's partitioning.
+    Returns an (n_rows, len(percentiles)) matrix.
+    """
+    ordered = np.sort(outputs, axis=1)
+    positions = np.asarray(percentiles) / 100 * (outputs.shape[1] - 1)
+    below = np.floor(positions).astype(int)
+    above = np.minimum(below + 1, outputs.shape[1] - 1)
+    weight = positions - below
+    return ordered[:, below] * (1 - weight) + ordered[:, above] * weight
+
+
+def predict_with_intervals(model, inputs, confidence=PREDICTION_INTERVAL):
+    """
+    Point prediction, interval bounds and spread from the distribution of tree outputs.
+    The point prediction is the mean over trees, summed in sklearn's order so it matches predict exactly.
+    Models that are not forests have no tree outputs and get None bounds.
+    """
+    if not is_flattenable(model):
+        return model.predict(inputs), None, None, None
+    outputs = tree_predictions(model, inputs)
+    tail = (1 - confidence) / 2 * 100
+    lower, upper = tree_percentiles(outputs, [tail, 100 - tail]).T
+    return average_trees(outputs), lower, upper, outputs.std(axis=1)
@@ -0,0 +1,73 @@
+import json
+import shapely
+from shapely.geometry import shape
+
+# District names used by the API that are spelled differently in the grid GeoJSON
+DISTRICT_ALIASES = {"Bhawalnagar": "Bahawalnagar"}
+
+
+def _serialize_features(features):
+    """
+    Serialize features as a compact GeoJSON FeatureCollection.
+    """
+    return json.dumps({"type": "FeatureCollection", "features": features}, separators=(",", ":")).encode("utf-8")
+
+
+def build_grid_index(geojson_data):
+    """
+    Index the rice grid once at load time.
+    Cells are grouped by district, with the response for each district serialized up front,
+    and an STR-tree over the cell geometries answers bbox and point queries.
+    """
+    features = geojson_data["features"]
+
+    features_by_district = {}
+    for feature in features:
+        features_by_district.setdefault(feature["properties"].get("district"), []).append(feature)
+
+    district_blobs = {
+        district: _serialize_features(district_features)
+        for district, district_features in features_by_district.items()
+    }
+
+    geometries = [shape(feature["geometry"]) for feature in features]
+    print(f"Indexed {len(features)} grid cells across {len(district_blobs)} districts.")
+
+    return {
+        "features": features,
+        "tree": shapely.STRtree(geometries),
+        "features_by_district": features_by_district,
+        "district_blobs": district_blobs,
+    }
+
+
+def get_district_geojson(grid_index, district_name):
+    """
+    Return the pre-serialized grid FeatureCollection for a district, or None if it has no cells.
+    """
+    district_name = DISTRICT_ALIASES.get(district_name, district_name)
+    return grid_index["district_blobs"].get(district_name)
+
+
+def get_district_features(grid_index, district_name):
+    """
+    Return the grid features for a district, or None if it has no cells.
+    """
+    district_name = DISTRICT_ALIASES.get(district_name, district_name)
+    return grid_index["features_by_district"].get(district_name)
+
+
+def query_bbox(grid_index, min_lon, min_lat, max_lon, max_lat):
+    """
+    Return the grid cells intersecting a bounding box as serialized GeoJSON.
+    """
+    hits = grid_index["tree"].query(shapely.box(min_lon, min_lat, max_lon, max_lat), predicate="intersects")
+    return _serialize_features([grid_index["features"][i] for i in sorted(hits)])
+
+
+def query_point(grid_index, lat, lon):
+    """
+    Return the grid cells containing a point as serialized GeoJSON.
+    """
+    hits = grid_index["tree"].query(shapely.Point(lon, lat), predicate="intersects")
+    return _serialize_features([grid_index["features"][i] for i in sorted(hits)])
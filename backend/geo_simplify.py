@@ -0,0 +1,80 @@
+import math
+import shapely
+from shapely.geometry import mapping, shape
+
+# Web map tile size in pixels
+TILE_SIZE = 256
+MIN_ZOOM = 0
+MAX_ZOOM = 18
+# From this zoom on grid cells are large enough on screen to be drawn one by one
+GRID_DETAIL_ZOOM = 13
+
+
+def clamp_zoom(zoom):
+    return max(MIN_ZOOM, min(MAX_ZOOM, zoom))
+
+
+def tolerance_for_zoom(zoom):
+    """
+    Size of one screen pixel in degrees at a zoom level.
+    Douglas-Peucker with this tolerance drops detail that cannot be seen.
+    """
+    return 360.0 / (TILE_SIZE * 2 ** zoom)
+
+
+def _round_coordinates(coordinates, ndigits):
+    if isinstance(coordinates[0], (int, float)):
+        return [round(c, ndigits) for c in coordinates]
+    return [_round_coordinates(c, ndigits) for c in coordinates]
+
+
+def _simplified_geometry(geometry, zoom):
+    """
+    Simplify a shapely geometry for a zoom level and return it as rounded GeoJSON.
+    """
+    tolerance = tolerance_for_zoom(zoom)
+    simplified = geometry.simplify(tolerance, preserve_topology=True)
+    if simplified.is_empty:
+        return None
+    # Digits finer than a pixel only add bytes
+    ndigits = max(0, math.ceil(-math.log10(tolerance)) + 1)
+    geojson = mapping(simplified)
+    return {"type": geojson["type"], "coordinates": _round_coordinates(geojson["coordinates"], ndigits)}
+
+
+def simplify_features(features, zoom):
+    """
+    Simplify each feature's geometry for a zoom level, keeping its properties.
+    """
+    simplified = []
+    for feature in features:
+        geometry = _simplified_geometry(shape(feature["geometry"]), zoom)
+        if geometry:
+            simplified.append({"type": "Feature", "properties": feature["properties"], "geometry": geometry})
+    return simplified
+
+
+def dissolve_grid(features, zoom):
+    """
+    Merge grid cells with the same fill into one simplified feature per fill.
+    Below GRID_DETAIL_ZOOM the payload then grows with the number of fill classes,
+    not with the number of cells.
+    """
+    if zoom >= GRID_DETAIL_ZOOM:
+        return features
+
+    cells_by_fill = {}
+    for feature in features:
+        cells_by_fill.setdefault(feature["properties"].get("fill"), []).append(shape(feature["geometry"]))
+
+    district = features[0]["properties"].get("district") if features else None
+    dissolved = []
+    for fill, cells in cells_by_fill.items():
+        geometry = _simplified_geometry(shapely.union_all(cells), zoom)
+        if not geometry:
+            continue
+        properties = {"district": district, "cells": len(cells)}
+        if fill is not None:
+            properties["fill"] = fill
+        dissolved.append({"type": "Feature", "properties": properties, "geometry": geometry})
+    return dissolved
@@ -0,0 +1,34 @@
+# to run (from the repository root): gunicorn -c backend/gunicorn.conf.py wsgi:app
+import gc
+import multiprocessing
+import os
+
+# Backend modules import each other by name, as they do under the development server
+pythonpath = "backend"
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_WORKERS", multiprocessing.cpu_count()))
+# Every open news event stream holds one of a worker's threads for up to SSE_STREAM_SECONDS
+# before the client reconnects. Raise WEB_THREADS above the number of Trends pages
+# expected to stream at once per worker, or those streams queue every other request.
+threads = int(os.environ.get("WEB_THREADS", 4))
+worker_class = "gthread"
+# Scenario sweeps and batch predictions can take a while
+timeout = int(os.environ.get("WEB_TIMEOUT", 120))
+keepalive = 5
+accesslog = "-"
+
+# Load historical data, geo indexes and the model once in the master. Workers fork from it
+# and share those pages copy-on-write instead of each loading their own copy.
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Move preloaded objects out of the collector's generations, so collections in
+    # workers do not touch their refcounts and copy the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Background threads started in the master do not exist in the forked workers
+    from api import start_background_tasks
+    start_background_tasks()
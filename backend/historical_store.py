@@ -0,0 +1,338 @@
+import io
+import os
+import re
+import json
+import itertools
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# Paths for assets
+HISTORICAL_CSV_PATH = "assets/actual_crop_data_with_simulated_weather_data.csv"
+HISTORICAL_PARQUET_PATH = "assets/actual_crop_data_with_simulated_weather_data.parquet"
+
+# Columns of the historical CSV, in file order
+HISTORICAL_COLUMNS = [
+    "Year", "District", "Area", "Production", "Crop_Yield",
+    "Plantation_Temperature", "Plantation_Humidity", "Plantation_Rainfall",
+    "Growth_Temperature", "Growth_Humidity", "Growth_Rainfall",
+    "Harvest_Temperature", "Harvest_Humidity", "Harvest_Rainfall",
+]
+NUMERIC_COLUMNS = HISTORICAL_COLUMNS[2:]
+SEASON_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+# Seconds between checks of the CSV for appended rows, 0 disables the watcher
+HISTORICAL_WATCH_INTERVAL = float(os.environ.get("HISTORICAL_WATCH_INTERVAL", 5))
+# Every store snapshot gets the next number, so responses built from an older snapshot can be told apart
+_generations = itertools.count(1)
+
+
+def _categorize_districts(frame, categories=None):
+    """
+    Store districts as categorical codes, in order of first appearance unless categories are given.
+    """
+    districts = frame["District"].astype(str)
+    if categories is None:
+        categories = pd.unique(districts)
+    return frame.assign(District=pd.Categorical(districts, categories=categories))
+
+
+def _parse_seasons(frame):
+    """
+    Turn seasons like '2014-15' into the start year.
+    """
+    return frame.assign(Year=frame["Year"].astype(str).str.split("-").str[0].astype(int))
+
+
+def parse_historical_csv(csv_path):
+    """
+    Read historical rows from CSV, parsing seasons and categorizing districts.
+    """
+    return _categorize_districts(_parse_seasons(pd.read_csv(csv_path)))
+
+
+def ingest_csv(csv_path=HISTORICAL_CSV_PATH, parquet_path=HISTORICAL_PARQUET_PATH):
+    """
+    Convert the historical CSV into a Parquet file sorted by district and year.
+    """
+    frame = parse_historical_csv(csv_path)
+    frame = frame.sort_values(["District", "Year"], kind="stable").reset_index(drop=True)
+    frame.to_parquet(parquet_path, index=False)
+    print(f"Ingested {len(frame)} historical rows into {parquet_path}.")
+    return frame
+
+
+class HistoricalStore:
+    """
+    Immutable snapshot of the historical data, sorted by district and year,
+    with the row slice and ready-to-send JSON of every district.
+    `district_json` carries over already serialized districts that did not change.
+    `generation` increases with every snapshot.
+    """
+
+    def __init__(self, frame, district_json=None):
+        self.generation = next(_generations)
+        if not isinstance(frame["District"].dtype, pd.CategoricalDtype):
+            frame = _categorize_districts(frame)
+        frame = frame.sort_values(["District", "Year"], kind="stable").reset_index(drop=True)
+        self.frame = frame
+
+        # Rows of each district are contiguous after sorting, find where each run starts and stops
+        codes = frame["District"].cat.codes.to_numpy()
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        starts = np.concatenate([[0], boundaries]) if len(codes) else np.array([], dtype=int)
+        stops = np.concatenate([boundaries, [len(codes)]]) if len(codes) else np.array([], dtype=int)
+        categories = frame["District"].cat.categories
+        self.slices = {categories[codes[start]]: (int(start), int(stop)) for start, stop in zip(starts, stops)}
+
+        self._columns = {
+            "Years": frame["Year"].to_numpy(),
+            "Area": frame["Area"].to_numpy(),
+            "Production": frame["Production"].to_numpy(),
+            "Yield": frame["Crop_Yield"].to_numpy(),
+        }
+        district_json = district_json or {}
+        self._district_json = {
+            district: district_json.get(district) or self._serialize_district(district) for district in self.slices
+        }
+
+    def _serialize_district(self, district_name):
+        return json.dumps(self.district_data(district_name), separators=(",", ":")).encode("utf-8")
+
+    def districts(self):
+        """
+        Districts in order of first appearance in the source data.
+        """
+        return list(self.slices)
+
+    def district_data(self, district_name):
+        """
+        Historical series of a district, or None if it is unknown.
+        """
+        if district_name not in self.slices:
+            return None
+        start, stop = self.slices[district_name]
+        return {
+            "District": district_name,
+            "Historical_Data": {name: values[start:stop].tolist() for name, values in self._columns.items()},
+        }
+
+    def district_json(self, district_name):
+        """
+        Pre-serialized district_data as JSON bytes, or None if the district is unknown.
+        """
+        return self._district_json.get(district_name)
+
+    def with_rows(self, rows):
+        """
+        Return a new store with parsed rows appended.
+        Only the districts the rows belong to are serialized again.
+        """
+        categories = list(self.frame["District"].cat.categories)
+        categories += [district for district in pd.unique(rows["District"].astype(str)) if district not in categories]
+        frame = pd.concat(
+            [_categorize_districts(self.frame, categories), _categorize_districts(rows, categories)],
+            ignore_index=True,
+        )
+        changed = set(rows["District"].astype(str))
+        unchanged_json = {
+            district: blob for district, blob in self._district_json.items() if district not in changed
+        }
+        return HistoricalStore(frame, unchanged_json)
+
+
+def load_historical_store(csv_path=HISTORICAL_CSV_PATH, parquet_path=HISTORICAL_PARQUET_PATH):
+    """
+    Load the columnar historical store, re-ingesting the CSV when it is newer than the Parquet file.
+    """
+    if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(csv_path):
+        frame = ingest_csv(csv_path, parquet_path)
+    else:
+        frame = pd.read_parquet(parquet_path)
+    return HistoricalStore(frame)
+
+
+############## Live store and incremental ingestion #######################
+
+_store = None
+# Bytes of the CSV already reflected in the live store
+_csv_offset = 0
+# Serializes writers, readers never wait
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Return the live store snapshot, loading it on first use.
+    Snapshots are never modified, so a reader keeps a consistent view for as long as it holds one.
+    """
+    global _store, _csv_offset
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _csv_offset = os.path.getsize(HISTORICAL_CSV_PATH)
+                _store = load_historical_store()
+    return _store
+
+
+def validate_rows(records):
+    """
+    Check new season rows and return them as a DataFrame in CSV column order.
+    Years may be given as a season ('2024-25') or a start year (2024).
+    """
+    if not isinstance(records, list) or not records:
+        raise ValueError("rows must be a non-empty list")
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f"Row {i} must be an object")
+        missing = [column for column in HISTORICAL_COLUMNS if column not in record]
+        if missing:
+            raise ValueError(f"Row {i} is missing columns: {', '.join(missing)}")
+
+    rows = pd.DataFrame(records, columns=HISTORICAL_COLUMNS)
+    for column in NUMERIC_COLUMNS:
+        try:
+            rows[column] = pd.to_numeric(rows[column], errors="raise").astype(float)
+        except (TypeError, ValueError):
+            raise ValueError(f"Column '{column}' must be numeric")
+    if rows[NUMERIC_COLUMNS].isna().any().any():
+        raise ValueError("Numeric columns must not be empty")
+
+    rows["District"] = rows["District"].astype(str).str.strip()
+    if (rows["District"] == "").any():
+        raise ValueError("District must not be empty")
+
+    seasons = []
+    for year in rows["Year"]:
+        year = str(year).strip()
+        if re.fullmatch(r"\d{4}", year):
+            year = f"{year}-{(int(year) + 1) % 100:02d}"
+        if not SEASON_PATTERN.match(year):
+            raise ValueError(f"Year '{year}' must look like '2024-25' or 2024")
+        seasons.append(year)
+    rows["Year"] = seasons
+    return rows
+
+
+def _repeats_season(rows):
+    """
+    Whether each row repeats a season of the live store or an earlier row. Called with _store_lock held.
+    """
+    seasons = _parse_seasons(rows)
+    frame = _store.frame[_store.frame["District"].astype(str).isin(set(seasons["District"]))]
+    seen = set(zip(frame["District"].astype(str), frame["Year"]))
+    repeats = []
+    for district, start_year in zip(seasons["District"], seasons["Year"]):
+        repeats.append((district, start_year) in seen)
+        seen.add((district, start_year))
+    return repeats
+
+
+def _repeated_seasons(rows, repeats):
+    """
+    'District Year' of every row flagged by _repeats_season.
+    """
+    return [f"{district} {season}" for district, season, repeat in zip(rows["District"], rows["Year"], repeats) if repeat]
+
+
+def _apply_rows(rows):
+    """
+    Swap in a store with the rows appended. Must be called with _store_lock held.
+    """
+    global _store
+    _store = _store.with_rows(_parse_seasons(rows))
+    return sorted(set(rows["District"]))
+
+
+def ingest_rows(records):
+    """
+    Validate new season rows, append them to the CSV and add them to the live store.
+    Rows for a season a district already has are rejected with ValueError.
+    Returns the districts whose data changed.
+    """
+    global _csv_offset
+    rows = validate_rows(records)
+    get_store()
+    with _store_lock:
+        repeated = _repeated_seasons(rows, _repeats_season(rows))
+        if repeated:
+            raise ValueError(f"Seasons already present: {', '.join(repeated)}")
+        # Make sure appended rows start on a new line
+        needs_newline = False
+        with open(HISTORICAL_CSV_PATH, "rb") as f:
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        with open(HISTORICAL_CSV_PATH, "a", newline="") as f:
+            if needs_newline:
+                f.write("\n")
+            rows.to_csv(f, header=False, index=False)
+        changed = _apply_rows(rows)
+        _csv_offset = os.path.getsize(HISTORICAL_CSV_PATH)
+    print(f"Ingested {len(rows)} historical rows for {', '.join(changed)}.")
+    return changed
+
+
+def _check_csv(on_change):
+    """
+    Ingest rows appended to the CSV since the last check.
+    A CSV that shrank was rewritten, so it is reloaded in full.
+    """
+    global _store, _csv_offset
+    get_store()
+    with _store_lock:
+        size = os.path.getsize(HISTORICAL_CSV_PATH)
+        if size == _csv_offset:
+            return
+        if size < _csv_offset:
+            _store = HistoricalStore(ingest_csv())
+            _csv_offset = size
+            changed = None
+        else:
+            with open(HISTORICAL_CSV_PATH, "rb") as f:
+                f.seek(_csv_offset)
+                appended = f.read(size - _csv_offset)
+            # Leave a partially written last line for the next check
+            complete = appended[:appended.rfind(b"\n") + 1]
+            if not complete.strip():
+                return
+            rows = pd.read_csv(io.BytesIO(complete), header=None, names=HISTORICAL_COLUMNS)
+            try:
+                rows = validate_rows(rows.to_dict("records"))
+            except ValueError as e:
+                print(f"Skipping invalid rows appended to {HISTORICAL_CSV_PATH}: {e}")
+                _csv_offset += len(complete)
+                return
+            _csv_offset += len(complete)
+            # Another process may have accepted a season this one already has
+            repeats = _repeats_season(rows)
+            if any(repeats):
+                print(f"Skipping rows appended to {HISTORICAL_CSV_PATH} for seasons already present: "
+                      f"{', '.join(_repeated_seasons(rows, repeats))}")
+                rows = rows[[not repeat for repeat in repeats]].reset_index(drop=True)
+                if rows.empty:
+                    return
+            changed = _apply_rows(rows)
+    print(f"Picked up historical CSV changes for {', '.join(changed) if changed else 'all districts'}.")
+    on_change(changed)
+
+
+def start_csv_watcher(on_change, interval=HISTORICAL_WATCH_INTERVAL):
+    """
+    Tail the historical CSV in a background thread.
+    on_change is called with the changed districts, or None when everything was reloaded.
+    """
+    if not interval:
+        return None
+
+    def watch():
+        while True:
+            time.sleep(interval)
+            try:
+                _check_csv(on_change)
+            except Exception as e:
+                print(f"Historical CSV watcher error: {e}")
+
+    thread = threading.Thread(target=watch, name="historical-csv-watcher", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,307 @@
+# to migrate the JSON insight files: python backend/insights_store.py [--source assets/news_insights] [--overwrite]
+import argparse
+import os
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+# News insights, TL;DR points and classified articles for every processed date, with a full-text index
+INSIGHTS_DB_PATH = os.environ.get("INSIGHTS_DB_PATH", "assets/news_insights.sqlite3")
+# Directory of the per-date JSON files the store replaces
+NEWS_OUTPUT_DIR = "assets/news_insights"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY, total_articles INTEGER, relevant_articles_count INTEGER,
+    insights_count INTEGER, updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS insights (
+    id INTEGER PRIMARY KEY, date TEXT NOT NULL, position INTEGER, title TEXT, url TEXT, insight TEXT,
+    duplicate_urls TEXT
+);
+CREATE INDEX IF NOT EXISTS insights_date ON insights (date, position);
+CREATE TABLE IF NOT EXISTS tldr_points (
+    date TEXT NOT NULL, position INTEGER, point TEXT, PRIMARY KEY (date, position)
+);
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY, date TEXT NOT NULL, position INTEGER, title TEXT, url TEXT, relevancy TEXT,
+    simhash INTEGER, duplicate_of TEXT, label_source TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_date ON articles (date, position);
+CREATE VIRTUAL TABLE IF NOT EXISTS insights_fts USING fts5 (
+    title, insight, content='insights', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS insights_fts_insert AFTER INSERT ON insights BEGIN
+    INSERT INTO insights_fts (rowid, title, insight) VALUES (new.id, new.title, new.insight);
+END;
+CREATE TRIGGER IF NOT EXISTS insights_fts_delete AFTER DELETE ON insights BEGIN
+    INSERT INTO insights_fts (insights_fts, rowid, title, insight) VALUES ('delete', old.id, old.title, old.insight);
+END;
+"""
+# Columns added after the first version of the schema: table -> [(column, type)]
+ADDED_COLUMNS = {
+    "insights": [("duplicate_urls", "TEXT")],
+    "articles": [("simhash", "INTEGER"), ("duplicate_of", "TEXT"), ("label_source", "TEXT")],
+}
+
+_local = threading.local()
+
+
+def _add_missing_columns(connection):
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+        for column, column_type in columns:
+            if column not in existing:
+                connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+
+def _to_signed(value):
+    """
+    SQLite integers are signed 64-bit, SimHashes are unsigned.
+    """
+    return value - (1 << 64) if value is not None and value >= 1 << 63 else value
+
+
+def _connection():
+    """
+    One SQLite connection per thread, created on first use.
+    """
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = sqlite3.connect(INSIGHTS_DB_PATH, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        _add_missing_columns(connection)
+        connection.commit()
+        _local.connection = connection
+    return connection
+
+
+def close():
+    """
+    Close this thread's connection, e.g. before the process forks.
+    """
+    connection = getattr(_local, "connection", None)
+    if connection is not None:
+        connection.close()
+        _local.connection = None
+
+
+def save_day(date, processed_data):
+    """
+    Store the results of processing one date, replacing anything stored for it before.
+    """
+    connection = _connection()
+    with connection:
+        for table in ("insights", "tldr_points", "articles"):
+            connection.execute(f"DELETE FROM {table} WHERE date = ?", (date,))
+        connection.execute(
+            "INSERT OR REPLACE INTO days (date, total_articles, relevant_articles_count, insights_count, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (date, processed_data["total_articles"], processed_data["relevant_articles_count"],
+             processed_data["insights_count"], time.time()),
+        )
+        connection.executemany(
+            "INSERT INTO insights (date, position, title, url, insight, duplicate_urls) VALUES (?, ?, ?, ?, ?, ?)",
+            [(date, i, item.get("title", ""), item.get("url", ""), item.get("insight", ""),
+              json.dumps(item.get("duplicate_urls", [])))
+             for i, item in enumerate(processed_data["relevant_insights"])],
+        )
+        connection.executemany(
+            "INSERT INTO tldr_points (date, position, point) VALUES (?, ?, ?)",
+            [(date, i, point) for i, point in enumerate(processed_data["tldr_points"])],
+        )
+        connection.executemany(
+            "INSERT INTO articles (date, position, title, url, relevancy, simhash, duplicate_of, label_source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(date, i, item.get("title", ""), item.get("url", ""), item.get("relevancy", ""),
+              _to_signed(item.get("simhash")), item.get("duplicate_of"), item.get("label_source"))
+             for i, item in enumerate(processed_data.get("processed_articles", []))],
+        )
+
+
+def has_day(date):
+    return _connection().execute("SELECT 1 FROM days WHERE date = ?", (date,)).fetchone() is not None
+
+
+def list_dates():
+    return [row["date"] for row in _connection().execute("SELECT date FROM days ORDER BY date")]
+
+
+def _day_results(connection, day):
+    """
+    A stored date in the shape of the former per-date JSON file.
+    """
+    date = day["date"]
+    return {
+        "date": date,
+        "total_articles": day["total_articles"],
+        "relevant_articles_count": day["relevant_articles_count"],
+        "insights_count": day["insights_count"],
+        "tldr": [row["point"] for row in connection.execute(
+            "SELECT point FROM tldr_points WHERE date = ? ORDER BY position", (date,))],
+        "insights": [
+            {"title": row["title"], "insight": row["insight"], "url": row["url"],
+             "duplicate_urls": json.loads(row["duplicate_urls"] or "[]")}
+            for row in connection.execute(
+                "SELECT title, insight, url, duplicate_urls FROM insights WHERE date = ? ORDER BY position", (date,))
+        ],
+    }
+
+
+def get_day(date):
+    """
+    Insights and TL;DR for one date, or None if the date has not been processed.
+    """
+    connection = _connection()
+    day = connection.execute("SELECT * FROM days WHERE date = ?", (date,)).fetchone()
+    return _day_results(connection, day) if day else None
+
+
+def get_articles(date):
+    return [dict(row) for row in _connection().execute(
+        "SELECT title, url, relevancy, duplicate_of, label_source FROM articles WHERE date = ? ORDER BY position",
+        (date,))]
+
+
+def llm_labelled_headlines():
+    """
+    Distinct (title, verdict) pairs the LLM decided, the training data of the relevance filter.
+    Rows stored before label sources were recorded all come from the LLM.
+    """
+    return [tuple(row) for row in _connection().execute(
+        "SELECT DISTINCT title, relevancy FROM articles WHERE relevancy IN ('Relevant', 'Irrelevant') "
+        "AND duplicate_of IS NULL AND (label_source = 'llm' OR label_source IS NULL) ORDER BY title"
+    )]
+
+
+def relevance_label_counts():
+    """
+    Per date, the classified headlines and how many of them the local filter decided: [(date, classified, local)]
+    """
+    return [tuple(row) for row in _connection().execute(
+        "SELECT date, COUNT(*), SUM(label_source = 'prefilter') FROM articles "
+        "WHERE duplicate_of IS NULL AND label_source IS NOT NULL GROUP BY date ORDER BY date"
+    )]
+
+
+def recent_fingerprints(date, days):
+    """
+    SimHashes of the stories processed in the `days` days before `date`, for near-duplicate detection.
+    """
+    start = (datetime.strptime(date, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+    rows = _connection().execute(
+        "SELECT date, url, relevancy, simhash FROM articles WHERE date >= ? AND date < ? "
+        "AND simhash IS NOT NULL AND duplicate_of IS NULL",
+        (start, date),
+    )
+    return [{"date": row["date"], "url": row["url"], "relevancy": row["relevancy"],
+             "simhash": row["simhash"] & ((1 << 64) - 1)} for row in rows]
+
+
+def _page(limit, offset):
+    limit = min(max(int(limit or DEFAULT_PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    return limit, max(int(offset or 0), 0)
+
+
+def _date_filter(column, start, end):
+    clauses, params = [], []
+    if start:
+        clauses.append(f"{column} >= ?")
+        params.append(start)
+    if end:
+        clauses.append(f"{column} <= ?")
+        params.append(end)
+    return clauses, params
+
+
+def get_days(start=None, end=None, limit=None, offset=None):
+    """
+    Stored dates from `start` to `end` inclusive (YYYY-MM-DD, either may be None), newest first, one page at a time.
+    """
+    limit, offset = _page(limit, offset)
+    connection = _connection()
+    clauses, params = _date_filter("date", start, end)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    total = connection.execute(f"SELECT COUNT(*) FROM days {where}", params).fetchone()[0]
+    days = connection.execute(
+        f"SELECT * FROM days {where} ORDER BY date DESC LIMIT ? OFFSET ?", params + [limit, offset]
+    ).fetchall()
+    return {
+        "total": total, "limit": limit, "offset": offset,
+        "results": [_day_results(connection, day) for day in days],
+    }
+
+
+def _match_expression(query):
+    """
+    Quote every search term, so user input is matched as words and never parsed as FTS5 syntax.
+    """
+    terms = query.split()
+    if not terms:
+        raise ValueError("q must contain at least one search term")
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def search(query, start=None, end=None, limit=None, offset=None):
+    """
+    Insights matching every term of `query` in their title or text, best matches first.
+    Raises ValueError for an empty query.
+    """
+    limit, offset = _page(limit, offset)
+    connection = _connection()
+    clauses, params = _date_filter("insights.date", start, end)
+    where = " AND ".join(["insights_fts MATCH ?"] + clauses)
+    params = [_match_expression(query)] + params
+    base = f"FROM insights_fts JOIN insights ON insights.id = insights_fts.rowid WHERE {where}"
+    total = connection.execute(f"SELECT COUNT(*) {base}", params).fetchone()[0]
+    rows = connection.execute(
+        f"SELECT insights.date, insights.title, insights.url, insights.insight, insights.duplicate_urls, "
+        f"snippet(insights_fts, 1, '**', '**', '...', 24) AS snippet {base} "
+        f"ORDER BY bm25(insights_fts), insights.date DESC LIMIT ? OFFSET ?",
+        params + [limit, offset],
+    ).fetchall()
+    results = [{**dict(row), "duplicate_urls": json.loads(row["duplicate_urls"] or "[]")} for row in rows]
+    return {"total": total, "limit": limit, "offset": offset, "results": results}
+
+
+def migrate_json_dir(directory=NEWS_OUTPUT_DIR, overwrite=False):
+    """
+    Import the per-date JSON insight files. Dates already in the store are kept unless `overwrite` is set.
+    Returns the number of dates imported.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    imported = 0
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith(".json"):
+            continue
+        date = file_name[:-len(".json")]
+        if not overwrite and has_day(date):
+            continue
+        with open(os.path.join(directory, file_name), "r") as f:
+            data = json.load(f)
+        insights = data.get("insights", [])
+        save_day(date, {
+            "total_articles": data.get("total_articles", 0),
+            "relevant_articles_count": data.get("relevant_articles_count", len(insights)),
+            "insights_count": data.get("insights_count", len(insights)),
+            "tldr_points": data.get("tldr", []),
+            "relevant_insights": insights,
+        })
+        imported += 1
+    print(f"Imported {imported} dates of insights from {directory} into {INSIGHTS_DB_PATH}.")
+    return imported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import per-date JSON insight files into the insights store.")
+    parser.add_argument("--source", default=NEWS_OUTPUT_DIR, help="Directory of YYYY-MM-DD.json files")
+    parser.add_argument("--overwrite", action="store_true", help="Replace dates that are already stored")
+    args = parser.parse_args()
+    migrate_json_dir(args.source, args.overwrite)
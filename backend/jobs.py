@@ -0,0 +1,287 @@
+import os
+import re
+import json
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Background jobs run on an in-process worker pool
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+# Finished jobs are forgotten after this long
+JOB_RETENTION_SECONDS = 24 * 3600
+# Job snapshots are mirrored here, so any server worker can answer /jobs/<id> for a job another worker runs
+JOB_STATE_DIR = os.environ.get("JOB_STATE_DIR", "assets/jobs")
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+_lock = threading.Lock()
+_jobs = {}  # job id -> job dict
+_active_jobs = {}  # job key -> id of its queued or running job
+_events = {}  # job id -> list of events published by the job, kept in this process only
+# Woken whenever a job publishes an event or finishes
+_changed = threading.Condition(_lock)
+# Id of the job the current thread runs
+_current = threading.local()
+
+
+def _snapshot(job):
+    return {**job, "progress": dict(job["progress"])}
+
+
+def _state_path(job_id):
+    return os.path.join(JOB_STATE_DIR, f"{job_id}.json")
+
+
+def _persist(job):
+    """
+    Write a job snapshot for other processes. Called with _lock held.
+    """
+    try:
+        os.makedirs(JOB_STATE_DIR, exist_ok=True)
+        temp_path = f"{_state_path(job['id'])}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(_snapshot(job), f, default=str)
+        os.replace(temp_path, _state_path(job["id"]))
+    except OSError as e:
+        print(f"Failed to persist job {job['id']}: {e}")
+
+
+def _read_persisted(job_id):
+    try:
+        with open(_state_path(job_id), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _claim_path(key):
+    return os.path.join(JOB_STATE_DIR, "claims", re.sub(r"[^\w.-]", "_", key) + ".json")
+
+
+def _read_claim(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _claim_is_live(holder):
+    """
+    A claim is stale once its process died or its job finished. Called with _lock held.
+    """
+    if not _pid_alive(holder["pid"]):
+        return False
+    owner = _jobs.get(holder["job_id"]) or (_read_persisted(holder["job_id"]) if holder["job_id"] else None)
+    return not (owner and owner["finished_at"])
+
+
+def _claim(key, job_id):
+    """
+    Claim a job key for job_id across every server process sharing JOB_STATE_DIR.
+    Returns None once claimed, or the live claim {"job_id", "pid"} that holds the key. Called with _lock held.
+    """
+    path = _claim_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write the claim whole, then link it into place: the link fails if the key is already claimed
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"job_id": job_id, "pid": os.getpid()}, f)
+    try:
+        for _ in range(2):
+            try:
+                os.link(temp_path, path)
+                return None
+            except FileExistsError:
+                holder = _read_claim(path)
+                if holder and _claim_is_live(holder):
+                    return holder
+                print(f"Taking over stale claim on job key {key}: {holder}")
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return _read_claim(path) or {"job_id": None, "pid": None}
+    finally:
+        os.remove(temp_path)
+
+
+def _release(key, job_id):
+    """
+    Remove a claim if job_id still holds it. Called with _lock held.
+    """
+    path = _claim_path(key)
+    holder = _read_claim(path)
+    if holder and holder["job_id"] == job_id and holder["pid"] == os.getpid():
+        os.remove(path)
+
+
+@contextmanager
+def claim(key, job_id=None):
+    """
+    Hold a job key for the duration of a block, so submit() in any process returns job_id's job for it.
+    Yields False without claiming when another job holds the key.
+    """
+    with _lock:
+        claimed = _claim(key, job_id) is None
+    try:
+        yield claimed
+    finally:
+        if claimed:
+            with _lock:
+                _release(key, job_id)
+
+
+def current_job_id():
+    """
+    Id of the job running on this thread, None outside jobs.
+    """
+    return getattr(_current, "job_id", None)
+
+
+def _prune_finished_jobs():
+    cutoff = time.time() - JOB_RETENTION_SECONDS
+    for job_id in [job_id for job_id, job in _jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+        del _jobs[job_id]
+        _events.pop(job_id, None)
+        if os.path.exists(_state_path(job_id)):
+            os.remove(_state_path(job_id))
+
+
+def _publish(job, event):
+    """
+    Append an event to a job's log and wake its subscribers. Called with _lock held.
+    """
+    _events[job["id"]].append(event)
+    _changed.notify_all()
+
+
+def _run(job, fn, args):
+    def report_progress(event=None, **fields):
+        """
+        Update progress counters. `event` is a dict published to subscribers of the job's event stream.
+        """
+        with _lock:
+            if event is not None:
+                _publish(job, event)
+            if fields:
+                job["progress"].update(fields)
+                _persist(job)
+                _publish(job, {"type": "progress", **fields})
+
+    with _lock:
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        _persist(job)
+    _current.job_id = job["id"]
+    try:
+        result = fn(report_progress, *args)
+        status, error = "done", None
+    except Exception as e:
+        traceback.print_exc()
+        result, status, error = None, "failed", str(e)
+    finally:
+        _current.job_id = None
+    with _lock:
+        job.update(status=status, result=result, error=error, finished_at=time.time())
+        _persist(job)
+        _publish(job, {"type": status, "result": result, "error": error})
+        if _active_jobs.get(job["key"]) == job["id"]:
+            del _active_jobs[job["key"]]
+        _release(job["key"], job["id"])
+
+
+def submit(key, fn, *args):
+    """
+    Run fn(report_progress, *args) in the background and return the job.
+    fn reports counters with report_progress(**fields) and publishes stream events with report_progress(event={...}).
+    While a job with the same key is queued or running, in this or another server process,
+    that job is returned instead of starting a new one.
+    Returns (job snapshot, created) where created is False for a collapsed duplicate.
+    """
+    with _lock:
+        active_id = _active_jobs.get(key)
+        if active_id:
+            return _snapshot(_jobs[active_id]), False
+
+        _prune_finished_jobs()
+        job_id = uuid.uuid4().hex
+        holder = _claim(key, job_id)
+        if holder:
+            owner = _jobs.get(holder["job_id"]) or _read_persisted(holder["job_id"] or "")
+            if owner:
+                return _snapshot(owner), False
+            # Held outside any job, e.g. by a command-line backfill
+            return {"id": holder["job_id"], "key": key, "status": "running", "progress": {}, "result": None,
+                    "error": None, "created_at": None, "started_at": None, "finished_at": None}, False
+        job = {
+            "id": job_id,
+            "key": key,
+            "status": "queued",
+            "progress": {},
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        _jobs[job["id"]] = job
+        _events[job["id"]] = []
+        _active_jobs[key] = job["id"]
+        _persist(job)
+        snapshot = _snapshot(job)
+
+    _executor.submit(_run, job, fn, args)
+    return snapshot, True
+
+
+def get_job(job_id):
+    """
+    Return a snapshot of a job, or None if it is unknown.
+    Jobs started by other processes are read from their persisted snapshot.
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if job:
+            return _snapshot(job)
+    # Job ids are hex uuids, anything else cannot name a state file
+    if not all(c in "0123456789abcdef" for c in job_id):
+        return None
+    return _read_persisted(job_id)
+
+
+def iter_events(job_id, start=0, heartbeat=None):
+    """
+    Yield (index, event) for every event of a job run by this process, from `start` on,
+    waiting for new ones until the job finishes. Yields (None, None) every `heartbeat` seconds without events.
+    Returns immediately for jobs this process does not run.
+    """
+    index = start
+    while True:
+        timed_out = False
+        with _lock:
+            events = _events.get(job_id)
+            if events is None:
+                return
+            if index >= len(events):
+                if _jobs[job_id]["finished_at"] is not None:
+                    return
+                timed_out = not _changed.wait(timeout=heartbeat)
+            pending = events[index:]
+        if timed_out and not pending:
+            yield None, None
+        for event in pending:
+            yield index, event
+            index += 1
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# Persistent cache of LLM responses keyed by hash(model, system prompt, user prompt)
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "assets/llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_DAYS", 90)) * 24 * 3600
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_MB", 100)) * 1024 * 1024
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _connection():
+    """
+    One SQLite connection per thread, created on first use.
+    """
+    connection = getattr(_local, "connection", None)
+    if connection is None:
+        connection = sqlite3.connect(LLM_CACHE_PATH, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, size INTEGER, created_at REAL, last_access REAL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        connection.commit()
+        _local.connection = connection
+    return connection
+
+
+def cache_key(model, system_prompt, user_prompt):
+    """
+    Hash a prompt with whitespace collapsed, so syndicated copies that differ only
+    in line breaks or spacing share an entry.
+    """
+    parts = [model, " ".join(system_prompt.split()), " ".join(user_prompt.split())]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def _count(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def get(model, system_prompt, user_prompt):
+    """
+    Return the cached response for a prompt, or None if it is missing or expired.
+    """
+    connection = _connection()
+    key = cache_key(model, system_prompt, user_prompt)
+    now = time.time()
+    row = connection.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+    if row is None or now - row[1] > LLM_CACHE_TTL_SECONDS:
+        _count("misses")
+        return None
+    connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+    connection.commit()
+    _count("hits")
+    return row[0]
+
+
+def put(model, system_prompt, user_prompt, response):
+    """
+    Store a response, then evict expired entries and least recently used ones above the size limit.
+    """
+    connection = _connection()
+    now = time.time()
+    connection.execute(
+        "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+        (cache_key(model, system_prompt, user_prompt), model, response, len(response.encode("utf-8")), now, now),
+    )
+    connection.execute("DELETE FROM responses WHERE created_at < ?", (now - LLM_CACHE_TTL_SECONDS,))
+
+    total_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    if total_size > LLM_CACHE_MAX_BYTES:
+        # Walk entries from least to most recently used until enough space is freed
+        excess = total_size - LLM_CACHE_MAX_BYTES
+        stale_keys = []
+        for key, size in connection.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if excess <= 0:
+                break
+            stale_keys.append((key,))
+            excess -= size
+        connection.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+    connection.commit()
+
+
+def get_stats():
+    """
+    Hit/miss counters since startup plus the current size of the cache.
+    """
+    entries, size = _connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+        "entries": entries,
+        "size_bytes": size,
+        "max_bytes": LLM_CACHE_MAX_BYTES,
+        "ttl_seconds": LLM_CACHE_TTL_SECONDS,
+    }
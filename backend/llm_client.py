@@ -0,0 +1,113 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import openai
+from openai import OpenAI
+import llm_cache
+from retry_backoff import retry_delay
+
+OPENAI_API_KEY = "INSERT KEY HERE"
+
+# Default model for every prompt in the news pipeline
+LLM_MODEL = "gpt-4o-mini"
+# Maximum number of LLM requests in flight at once
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", 8))
+# Retries for rate limits and transient server errors
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 5))
+LLM_BACKOFF_SECONDS = 1.0
+# Longest wait between attempts, whatever Retry-After the server sends
+LLM_MAX_BACKOFF_SECONDS = float(os.environ.get("LLM_MAX_BACKOFF_SECONDS", 60))
+
+# Retries are handled in chat_completion so they can back off across all workers' calls
+client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+def chat_completion(system_prompt, user_prompt, model=LLM_MODEL, use_cache=True):
+    """
+    Send one system + user prompt pair and return the stripped response text.
+    Responses are served from and stored in the persistent LLM cache unless `use_cache` is False.
+    Rate limits and transient errors are retried with backoff.
+    """
+    if use_cache:
+        cached = llm_cache.get(model, system_prompt, user_prompt)
+        if cached is not None:
+            return cached
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ]
+            )
+            text = response.choices[0].message.content.strip()
+            if use_cache:
+                llm_cache.put(model, system_prompt, user_prompt, text)
+            return text
+        except RETRYABLE_ERRORS as e:
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            delay = retry_delay(getattr(e, "response", None), attempt, LLM_BACKOFF_SECONDS, LLM_MAX_BACKOFF_SECONDS)
+            print(f"LLM call failed ({type(e).__name__}), retrying in {delay:.1f}s.")
+            time.sleep(delay)
+
+
+def chat_completion_stream(system_prompt, user_prompt, model=LLM_MODEL, use_cache=True):
+    """
+    Like chat_completion, but yields the response text in pieces as the model produces them.
+    A cached response is yielded whole. Failures before the first piece are retried with backoff.
+    """
+    if use_cache:
+        cached = llm_cache.get(model, system_prompt, user_prompt)
+        if cached is not None:
+            yield cached
+            return
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        pieces = []
+        try:
+            stream = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                stream=True,
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    pieces.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+            break
+        except RETRYABLE_ERRORS as e:
+            # Pieces already yielded cannot be taken back, only retry before the first one
+            if pieces or attempt == LLM_MAX_RETRIES:
+                raise
+            delay = retry_delay(getattr(e, "response", None), attempt, LLM_BACKOFF_SECONDS, LLM_MAX_BACKOFF_SECONDS)
+            print(f"LLM stream failed ({type(e).__name__}), retrying in {delay:.1f}s.")
+            time.sleep(delay)
+
+    if use_cache:
+        llm_cache.put(model, system_prompt, user_prompt, "".join(pieces).strip())
+
+
+def map_concurrent(fn, items, concurrency=None):
+    """
+    Apply fn to every item with at most `concurrency` calls in flight.
+    Results are returned in the order of `items`.
+    """
+    items = list(items)
+    if not items:
+        return []
+    concurrency = concurrency or LLM_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as executor:
+        return list(executor.map(fn, items))
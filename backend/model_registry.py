@@ -0,0 +1,208 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import joblib
+from forest_compiler import (
+    FLAT_META_FILE, FlatForestModel, export_flat_forest, flat_path_for, is_flattenable, load_flat_model,
+)
+
+# Default yield model artefact, served when there is no manifest
+MODEL_PATH = "assets/rf_yield_prediction_model.pkl"
+# Lists model versions with their artefact path, feature schema and checksum
+MANIFEST_PATH = "assets/models/manifest.json"
+# Loaded models beyond this count are evicted, least recently used first
+MAX_LOADED_MODELS = int(os.environ.get("MAX_LOADED_MODELS", 3))
+
+# Loaded models keyed by path, in least to most recently used order: path -> (signature, model)
+_models = OrderedDict()
+_lock = threading.Lock()
+# Held while unpickling, so readers of already loaded models never wait for a load
+_load_lock = threading.Lock()
+_manifest = {"signature": None, "data": None}
+# Signature of a file version that failed to load while its previous model kept serving: path -> signature
+_failed_signatures = {}
+
+
+def _file_signature(path):
+    """
+    Identify the current version of a file by its mtime and size.
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _model_signature(path):
+    """
+    Signature of a model file together with its flat export, if there is one.
+    """
+    meta_path = os.path.join(flat_path_for(path), FLAT_META_FILE)
+    return _file_signature(path), _file_signature(meta_path) if os.path.exists(meta_path) else None
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _cached_model(path, signature):
+    with _lock:
+        entry = _models.get(path)
+        # A version that failed to load is not retried until the file changes again
+        if entry and signature in (entry[0], _failed_signatures.get(path)):
+            _models.move_to_end(path)
+            return entry[1]
+        return None
+
+
+def _load_model(path, sha256):
+    """
+    Load the memory-mapped flat export of a model when there is a current one, else unpickle it.
+    """
+    flat_path = flat_path_for(path)
+    if os.path.isdir(flat_path):
+        try:
+            return load_flat_model(flat_path, sha256 or file_sha256(path), path)
+        except Exception as e:
+            print(f"Ignoring flat export {flat_path}, loading the pickle: {e}")
+    if sha256 and file_sha256(path) != sha256:
+        raise ValueError(f"Checksum of {path} does not match the manifest")
+    return joblib.load(path)
+
+
+def get_model(path=MODEL_PATH, sha256=None):
+    """
+    Return the model stored at `path`.
+    The model is loaded on first use and reloaded when the file changes on disk.
+    A flat export next to the pickle (model.flat) is memory-mapped instead of unpickling.
+    Readers always see either the old or the new model, never a partial one.
+    When `sha256` is given the file must match it before it is loaded.
+    """
+    signature = _model_signature(path)
+    model = _cached_model(path, signature)
+    if model is not None:
+        return model
+
+    with _load_lock:
+        # Another thread may have loaded the model while we waited
+        model = _cached_model(path, signature)
+        if model is not None:
+            return model
+        with _lock:
+            previous = _models.get(path)
+        try:
+            model = _load_model(path, sha256)
+        except Exception as e:
+            if previous:
+                # The file is probably still being written, keep serving the old model
+                print(f"Failed to reload model {path}, keeping previous version: {e}")
+                with _lock:
+                    _failed_signatures[path] = signature
+                return previous[1]
+            raise
+        with _lock:
+            _models[path] = (signature, model)
+            _models.move_to_end(path)
+            _failed_signatures.pop(path, None)
+            while len(_models) > MAX_LOADED_MODELS:
+                evicted_path, _ = _models.popitem(last=False)
+                _failed_signatures.pop(evicted_path, None)
+                print(f"Evicted model {evicted_path}.")
+        print(f"Loaded model {path}.")
+        return model
+
+
+def load_manifest():
+    """
+    Return the model manifest, re-read when the file changes. None if there is no manifest.
+    """
+    if not os.path.exists(MANIFEST_PATH):
+        return None
+    signature = _file_signature(MANIFEST_PATH)
+    if _manifest["signature"] != signature:
+        with open(MANIFEST_PATH, "r") as f:
+            data = json.load(f)
+        _manifest.update(signature=signature, data=data)
+    return _manifest["data"]
+
+
+def get_model_version(version=None):
+    """
+    Return (version, model, entry) for a manifest version, or for the default version when None.
+    Raises ValueError for an unknown version.
+    """
+    manifest = load_manifest()
+    if manifest is None:
+        if version not in (None, "default"):
+            raise ValueError(f"Unknown model version '{version}'")
+        return "default", get_model(), {"path": MODEL_PATH}
+
+    version = version or manifest["default"]
+    entry = manifest["models"].get(version)
+    if entry is None:
+        raise ValueError(f"Unknown model version '{version}'")
+    return version, get_model(entry["path"], entry.get("sha256")), entry
+
+
+def get_shadow_version():
+    """
+    Candidate version to score alongside the default, or None.
+    """
+    manifest = load_manifest()
+    return os.environ.get("SHADOW_MODEL") or (manifest or {}).get("shadow")
+
+
+def register_model_version(version, entry, make_default=False):
+    """
+    Add a model version to the manifest, optionally making it the default.
+    """
+    with _load_lock:
+        manifest = load_manifest() or {"default": None, "shadow": None, "models": {}}
+        manifest["models"][version] = entry
+        if make_default or not manifest["default"]:
+            manifest["default"] = version
+        os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+        # Write then rename, so readers never see a partial manifest
+        temp_path = f"{MANIFEST_PATH}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(temp_path, MANIFEST_PATH)
+
+
+def preload_models(paths=None):
+    """
+    Load models at startup so the first request does not pay for unpickling.
+    Without paths the default manifest version is loaded.
+    """
+    if paths is None:
+        get_model_version()
+        return
+    for path in paths:
+        get_model(path)
+
+
+def ensure_flat_export(path, model):
+    """
+    Write the flat export of a forest loaded from the pickle at `path` when it has none, or a stale one,
+    so the next load memory-maps it. Returns True when an export was written.
+    """
+    if isinstance(model, FlatForestModel) or not is_flattenable(model):
+        return False
+    sha256 = file_sha256(path)
+    meta_path = os.path.join(flat_path_for(path), FLAT_META_FILE)
+    if os.path.exists(meta_path):
+        with open(meta_path, "r") as f:
+            if json.load(f).get("source_sha256") == sha256:
+                return False
+    export_flat_forest(model, flat_path_for(path), sha256)
+    return True
+
+
+def clear_models():
+    """
+    Drop all loaded models. The next get_model call loads from disk again.
+    """
+    with _lock:
+        _models.clear()
+        _failed_signatures.clear()
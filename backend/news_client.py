@@ -0,0 +1,176 @@
+import os
+import json
+import math
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from retry_backoff import retry_delay
+
+# News API Key - personal
+# News API Key - work
+NEWS_API_KEY = "INSERT KEY HERE"
+NEWS_API_URL = os.environ.get("NEWS_API_URL", "https://newsapi.org/v2/everything")
+NEWS_PAGE_SIZE = 100  # Largest page NewsAPI serves
+# Pages after the first are fetched this many at a time
+NEWS_FETCH_CONCURRENCY = int(os.environ.get("NEWS_FETCH_CONCURRENCY", 4))
+NEWS_MAX_PAGES = int(os.environ.get("NEWS_MAX_PAGES", 20))
+NEWS_MAX_RETRIES = int(os.environ.get("NEWS_MAX_RETRIES", 4))
+NEWS_BACKOFF_SECONDS = 1.0
+# Longest wait between attempts, whatever Retry-After the server sends
+NEWS_MAX_BACKOFF_SECONDS = float(os.environ.get("NEWS_MAX_BACKOFF_SECONDS", 60))
+NEWS_TIMEOUT = (5, 30)  # Connect and read timeouts in seconds
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Raw responses keyed by query and date, so re-runs do not call NewsAPI again
+NEWS_CACHE_DIR = os.environ.get("NEWS_CACHE_DIR", "assets/news_cache")
+# Articles for recent dates can still arrive, their cache entries are revalidated after this long
+NEWS_CACHE_RECENT_DAYS = 2
+NEWS_CACHE_RECENT_TTL_SECONDS = int(os.environ.get("NEWS_CACHE_RECENT_TTL_SECONDS", 3600))
+
+_session_lock = threading.Lock()
+_session = None
+
+
+def get_session():
+    """
+    Shared session, so connections to NewsAPI are pooled and reused across calls and threads.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(NEWS_FETCH_CONCURRENCY, 10))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def get_page(params, page, headers=None):
+    """
+    Request one page, retrying rate limits, server errors and connection failures.
+    Returns the response, which may be 304 when conditional headers are given.
+    """
+    for attempt in range(NEWS_MAX_RETRIES + 1):
+        response = None
+        try:
+            response = get_session().get(
+                NEWS_API_URL,
+                params={**params, "page": page, "pageSize": NEWS_PAGE_SIZE},
+                headers={"X-Api-Key": NEWS_API_KEY, **(headers or {})},
+                timeout=NEWS_TIMEOUT,
+            )
+            if response.status_code not in RETRYABLE_STATUS:
+                return response
+            error = f"status {response.status_code}"
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = type(e).__name__
+        if attempt == NEWS_MAX_RETRIES:
+            raise RuntimeError(f"NewsAPI page {page} failed after {attempt + 1} attempts: {error}")
+        delay = retry_delay(response, attempt, NEWS_BACKOFF_SECONDS, NEWS_MAX_BACKOFF_SECONDS)
+        print(f"NewsAPI page {page} failed ({error}), retrying in {delay:.1f}s.")
+        time.sleep(delay)
+
+
+def _check(response, page):
+    if response.status_code != 200:
+        raise RuntimeError(f"NewsAPI page {page} failed. Status Code: {response.status_code}, Response: {response.text}")
+    return response.json()
+
+
+def _cache_path(params, date_str):
+    """
+    Cache file for a query on a date. The API key is not part of the request parameters.
+    """
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(NEWS_CACHE_DIR, f"{date_str}-{digest}.json")
+
+
+def _is_fresh(entry, date_str):
+    """
+    Entries for dates older than NEWS_CACHE_RECENT_DAYS are final, recent ones expire after a TTL.
+    """
+    recent_after = datetime.now() - timedelta(days=NEWS_CACHE_RECENT_DAYS)
+    if datetime.strptime(date_str, "%Y-%m-%d") < recent_after:
+        return True
+    return time.time() - entry["fetched_at"] < NEWS_CACHE_RECENT_TTL_SECONDS
+
+
+def _read_cache(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path, entry):
+    os.makedirs(NEWS_CACHE_DIR, exist_ok=True)
+    # Write then rename, so concurrent runs never read a partial entry
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(entry, f)
+    os.replace(temp_path, path)
+
+
+def fetch_all_pages(params, date_str, use_cache=True):
+    """
+    Fetch every page of a NewsAPI query for one date and return the articles, without duplicates.
+    Page 1 gives the total, the remaining pages are fetched concurrently.
+    Cached results are reused, and stale ones are revalidated with If-None-Match when the server sent an ETag.
+    Raises RuntimeError when a page cannot be fetched.
+    """
+    path = _cache_path(params, date_str)
+    entry = _read_cache(path) if use_cache else None
+    if entry and _is_fresh(entry, date_str):
+        print(f"Using cached NewsAPI response for {date_str}.")
+        return entry["articles"]
+
+    headers = {"If-None-Match": entry["etag"]} if entry and entry.get("etag") else None
+    first = get_page(params, 1, headers)
+    if first.status_code == 304:
+        print(f"NewsAPI response for {date_str} is unchanged.")
+        entry["fetched_at"] = time.time()
+        _write_cache(path, entry)
+        return entry["articles"]
+    data = _check(first, 1)
+
+    total = data.get("totalResults", 0)
+    page_count = min(math.ceil(total / NEWS_PAGE_SIZE), NEWS_MAX_PAGES)
+    pages = [data["articles"]]
+    if page_count > 1:
+        def fetch(page):
+            response = get_page(params, page)
+            # NewsAPI answers 426 once a plan's result limit is reached
+            if response.status_code == 426:
+                print(f"NewsAPI result limit reached at page {page}, later articles for {date_str} are missing.")
+                return []
+            return _check(response, page)["articles"]
+
+        with ThreadPoolExecutor(max_workers=NEWS_FETCH_CONCURRENCY) as executor:
+            pages.extend(executor.map(fetch, range(2, page_count + 1)))
+    if total > NEWS_MAX_PAGES * NEWS_PAGE_SIZE:
+        print(f"NewsAPI has {total} articles for {date_str}, only the first {NEWS_MAX_PAGES} pages are fetched.")
+
+    # New articles shift later ones across page boundaries while paging, drop the repeats
+    articles, seen = [], set()
+    for article in (article for page in pages for article in page):
+        key = article.get("url") or article.get("title")
+        if key not in seen:
+            seen.add(key)
+            articles.append(article)
+
+    if use_cache:
+        _write_cache(path, {
+            "params": params,
+            "date": date_str,
+            "fetched_at": time.time(),
+            "etag": first.headers.get("ETag"),
+            "total_results": total,
+            "articles": articles,
+        })
+    return articles
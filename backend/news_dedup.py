@@ -0,0 +1,118 @@
+import os
+import re
+import hashlib
+
+# Articles whose 64-bit SimHashes differ in at most this many bits are the same story
+SIMHASH_MAX_DISTANCE = int(os.environ.get("SIMHASH_MAX_DISTANCE", 3))
+# Earlier days whose articles new ones are compared against
+DEDUP_WINDOW_DAYS = int(os.environ.get("DEDUP_WINDOW_DAYS", 3))
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+
+# "Rice prices rise - Reuters" and "Rice prices rise | Business Insider" are the same headline
+_SOURCE_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]{2,40}$")
+# NewsAPI truncates content and appends "[+1234 chars]"
+_TRUNCATION_MARKER = re.compile(r"\[\+\d+ chars\]")
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize(article):
+    """
+    Lowercased title and content words, without source suffixes, truncation markers or punctuation.
+    """
+    title = _SOURCE_SUFFIX.sub("", article.get("title") or "")
+    content = _TRUNCATION_MARKER.sub("", article.get("content") or article.get("description") or "")
+    return _NON_WORD.sub(" ", f"{title} {content}".lower()).split()
+
+
+def simhash(words):
+    """
+    64-bit SimHash of the word shingles of a text.
+    """
+    shingles = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))]
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def article_simhash(article):
+    return simhash(normalize(article))
+
+
+def _bands(value):
+    """
+    Split a hash into SIMHASH_MAX_DISTANCE + 1 bands. Hashes within the distance share at least one band exactly.
+    """
+    band_count = SIMHASH_MAX_DISTANCE + 1
+    width = SIMHASH_BITS // band_count
+    return [(band, value >> (band * width) & ((1 << width) - 1)) for band in range(band_count)]
+
+
+class _BandIndex:
+    """
+    Candidate lookup by shared band, so hashes are not all compared with each other.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+
+    def add(self, value, item):
+        for band in _bands(value):
+            self.buckets.setdefault(band, []).append((value, item))
+
+    def matches(self, value):
+        seen = set()
+        for band in _bands(value):
+            for other, item in self.buckets.get(band, []):
+                if id(item) not in seen and bin(value ^ other).count("1") <= SIMHASH_MAX_DISTANCE:
+                    seen.add(id(item))
+                    yield item
+
+
+def deduplicate(articles, earlier=()):
+    """
+    Cluster near-duplicate articles and pick one representative per cluster.
+    `earlier` holds fingerprints of articles from previous days as dicts with "simhash", "url" and "relevancy".
+    Returns one cluster per representative, in order of first appearance:
+    {"representative": article, "simhash": int, "duplicates": [articles], "earlier": matching fingerprint or None}
+    """
+    hashes = [article_simhash(article) for article in articles]
+
+    # Union near-duplicates within the day
+    parents = list(range(len(articles)))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    index = _BandIndex()
+    for i, value in enumerate(hashes):
+        for j in index.matches(value):
+            parents[find(i)] = find(j)
+        index.add(value, i)
+
+    members = {}
+    for i in range(len(articles)):
+        members.setdefault(find(i), []).append(i)
+
+    earlier_index = _BandIndex()
+    for fingerprint in earlier:
+        earlier_index.add(fingerprint["simhash"], fingerprint)
+
+    clusters = []
+    for indices in sorted(members.values()):
+        # The longest copy gives the LLM the most to work with
+        best = max(indices, key=lambda i: len(articles[i].get("content") or ""))
+        match = next(earlier_index.matches(hashes[best]), None)
+        clusters.append({
+            "representative": articles[best],
+            "simhash": hashes[best],
+            "duplicates": [articles[i] for i in indices if i != best],
+            "earlier": match,
+        })
+    return clusters
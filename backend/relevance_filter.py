@@ -0,0 +1,60 @@
+import os
+import json
+import threading
+import joblib
+
+# Local headline classifier trained on past LLM relevance verdicts, see training/relevance.py
+RELEVANCE_FILTER_PATH = os.environ.get("RELEVANCE_FILTER_PATH", "assets/models/relevance_filter.pkl")
+RELEVANCE_FILTER_ENABLED = os.environ.get("RELEVANCE_FILTER_ENABLED", "1") != "0"
+
+_lock = threading.Lock()
+_filter = {"signature": None, "model": None, "meta": None}
+
+
+def metadata_path(path=RELEVANCE_FILTER_PATH):
+    return os.path.splitext(path)[0] + ".json"
+
+
+def load_filter():
+    """
+    Return (model, metadata) of the trained filter, reloaded when the file changes. (None, None) without one.
+    """
+    if not RELEVANCE_FILTER_ENABLED or not os.path.exists(RELEVANCE_FILTER_PATH):
+        return None, None
+    stat = os.stat(RELEVANCE_FILTER_PATH)
+    signature = stat.st_mtime_ns, stat.st_size
+    with _lock:
+        if _filter["signature"] != signature:
+            try:
+                model = joblib.load(RELEVANCE_FILTER_PATH)
+                with open(metadata_path(), "r") as f:
+                    meta = json.load(f)
+                thresholds = meta["thresholds"]
+                # Filters trained before thresholds were kept apart could decide every headline locally
+                if thresholds["irrelevant_below"] >= thresholds["relevant_above"]:
+                    raise ValueError(f"thresholds overlap: {thresholds}, retrain the filter")
+            except Exception as e:
+                print(f"Failed to load relevance filter {RELEVANCE_FILTER_PATH}, every headline goes to the LLM: {e}")
+                model, meta = None, None
+            _filter.update(signature=signature, model=model, meta=meta)
+        return _filter["model"], _filter["meta"]
+
+
+def prefilter(titles):
+    """
+    Local 'Relevant' or 'Irrelevant' verdicts for headlines the classifier is confident about,
+    None for the uncertain ones, which the LLM classifies.
+    """
+    model, meta = load_filter()
+    if model is None or not titles:
+        return [None] * len(titles)
+    thresholds = meta["thresholds"]
+    try:
+        probabilities = model.predict_proba(titles)[:, 1]
+    except Exception as e:
+        print(f"Relevance filter failed, every headline goes to the LLM: {e}")
+        return [None] * len(titles)
+    return [
+        "Irrelevant" if p <= thresholds["irrelevant_below"] else "Relevant" if p >= thresholds["relevant_above"] else None
+        for p in probabilities
+    ]
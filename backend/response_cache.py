@@ -0,0 +1,99 @@
+import gzip
+import hashlib
+import json
+import threading
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Serialized response bodies keyed by cache key: key -> payload dict
+_payloads = {}
+_lock = threading.Lock()
+
+
+def serialize(data):
+    """
+    Serialize data as compact JSON bytes.
+    """
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def build_payload(body):
+    """
+    Precompute the identity, gzip and brotli variants of a body along with their strong ETags.
+    """
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9)}
+    if brotli:
+        variants["br"] = brotli.compress(body)
+    return {
+        "variants": variants,
+        "etags": {encoding: f"{digest}-{encoding}" for encoding in variants},
+    }
+
+
+def get_payload(key, build_body):
+    """
+    Return the cached payload for `key`, serializing and compressing it on first use.
+    `build_body` returns the response body as bytes.
+    """
+    payload = _payloads.get(key)
+    if payload is None:
+        payload = build_payload(build_body())
+        with _lock:
+            payload = _payloads.setdefault(key, payload)
+    return payload
+
+
+def invalidate(key=None):
+    """
+    Drop one cached payload, or all of them when no key is given.
+    """
+    with _lock:
+        if key is None:
+            _payloads.clear()
+        else:
+            _payloads.pop(key, None)
+
+
+def invalidate_prefix(prefix):
+    """
+    Drop every cached payload whose key starts with `prefix`.
+    """
+    with _lock:
+        for key in [key for key in _payloads if key.startswith(prefix)]:
+            del _payloads[key]
+
+
+def _pick_encoding(variants):
+    """
+    Choose the best encoding the client accepts.
+    """
+    for encoding in ("br", "gzip"):
+        if encoding in variants and request.accept_encodings[encoding]:
+            return encoding
+    return "identity"
+
+
+def cached_response(key, build_body, mimetype="application/json"):
+    """
+    Serve a cached payload, compressed if the client allows it.
+    Answers a matching If-None-Match with 304 Not Modified.
+    """
+    payload = get_payload(key, build_body)
+    encoding = _pick_encoding(payload["variants"])
+    etag = payload["etags"][encoding]
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload["variants"][encoding], mimetype=mimetype)
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,19 @@
+import random
+
+
+def retry_delay(response, attempt, backoff_seconds, max_seconds):
+    """
+    Seconds to wait before retrying after a failed attempt, at most `max_seconds`.
+    Honours the Retry-After header of `response` when there is one, otherwise backs off
+    exponentially from `backoff_seconds` with jitter. A negative, NaN or unparsable value falls back to backoff.
+    """
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    delay = None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            pass
+    if delay is None or not delay >= 0:
+        delay = backoff_seconds * 2 ** attempt * random.uniform(0.5, 1.5)
+    return min(delay, max_seconds)
@@ -0,0 +1,188 @@
+import os
+import numpy as np
+from crop_prediction import HARDCODED_DATA, WEATHER_FEATURES, model_inputs
+from model_registry import get_model_version
+from forest_compiler import predict_point
+
+# Rows scored per forest pass, bounds memory for large sweeps
+SCENARIO_CHUNK_ROWS = int(os.environ.get("SCENARIO_CHUNK_ROWS", 65536))
+MAX_SCENARIOS = int(os.environ.get("MAX_SCENARIOS", 2_000_000))
+DEFAULT_PERCENTILES = [5, 25, 50, 75, 95]
+# Inputs a scenario may vary
+SCENARIO_PARAMETERS = ["Area"] + WEATHER_FEATURES
+
+
+def _grid_values(name, spec, limit):
+    """
+    Values swept for one parameter: explicit "values" or an inclusive "start"/"stop" range in "steps".
+    More than `limit` values raise ValueError before anything is allocated.
+    """
+    if "values" in spec:
+        if not isinstance(spec["values"], list):
+            raise ValueError(f"Parameter '{name}' values must be a list")
+        count = len(spec["values"])
+    elif {"start", "stop"} <= spec.keys():
+        count = int(spec.get("steps", 10))
+    else:
+        raise ValueError(f"Parameter '{name}' needs 'values' or 'start' and 'stop'")
+    if count < 1:
+        raise ValueError(f"Parameter '{name}' must have at least one value")
+    if count > limit:
+        raise ValueError(f"Grid exceeds the limit of {MAX_SCENARIOS} scenarios")
+    if "values" in spec:
+        values = np.asarray(spec["values"], dtype=float)
+    else:
+        values = np.linspace(float(spec["start"]), float(spec["stop"]), count)
+    if values.ndim != 1:
+        raise ValueError(f"Parameter '{name}' values must be numbers")
+    return values
+
+
+def _sampler(name, spec):
+    """
+    Return a function drawing n samples of one parameter from its distribution.
+    """
+    distribution = spec.get("distribution")
+    if distribution == "uniform":
+        low, high = float(spec["low"]), float(spec["high"])
+        return lambda rng, n: rng.uniform(low, high, n)
+    if distribution == "normal":
+        mean, std = float(spec["mean"]), float(spec["std"])
+        return lambda rng, n: rng.normal(mean, std, n)
+    if distribution == "triangular":
+        low, mode, high = float(spec["low"]), float(spec["mode"]), float(spec["high"])
+        return lambda rng, n: rng.triangular(low, mode, high, n)
+    if "values" in spec:
+        values = np.asarray(spec["values"], dtype=float)
+        return lambda rng, n: rng.choice(values, n)
+    raise ValueError(f"Parameter '{name}' needs a distribution of 'uniform', 'normal' or 'triangular', or 'values'")
+
+
+def _validate_parameters(parameters):
+    if not isinstance(parameters, dict) or not parameters:
+        raise ValueError("'parameters' must be a non-empty object")
+    unknown = [name for name in parameters if name not in SCENARIO_PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+    for name, spec in parameters.items():
+        if not isinstance(spec, dict):
+            raise ValueError(f"Parameter '{name}' must be an object")
+
+
+def _score_chunks(base_row, fill_chunk, total, model_version=None):
+    """
+    Score `total` scenarios in chunks with the flattened forest. fill_chunk(matrix, start, stop) writes the varied columns.
+    Returns (yields, areas) as flat arrays.
+    """
+    version, model, entry = get_model_version(model_version)
+    yields = np.empty(total)
+    areas = np.empty(total)
+    for start in range(0, total, SCENARIO_CHUNK_ROWS):
+        stop = min(start + SCENARIO_CHUNK_ROWS, total)
+        chunk = np.tile(base_row, (stop - start, 1))
+        fill_chunk(chunk, start, stop)
+        # Column 0 holds the area, the model only sees the weather
+        areas[start:stop] = chunk[:, 0]
+        yields[start:stop] = predict_point(model, model_inputs(version, entry, chunk[:, 1:]))
+    return yields, areas
+
+
+def _summary(values, percentiles):
+    return {
+        "mean": round(float(values.mean()), 2),
+        "percentiles": {f"p{q:g}": round(float(v), 2) for q, v in zip(percentiles, np.percentile(values, percentiles))},
+    }
+
+
+def run_scenarios(district_name, body):
+    """
+    Score a what-if sweep for a district and return yield and production percentile bands.
+    Parameters not listed in the body keep the district's hardcoded inputs.
+    Returns None for an unknown district, raises ValueError for an invalid body.
+    """
+    if district_name not in HARDCODED_DATA:
+        return None
+    if not isinstance(body, dict):
+        raise ValueError("Body must be a JSON object")
+
+    mode = body.get("mode", "grid")
+    parameters = body.get("parameters")
+    _validate_parameters(parameters)
+    percentiles = body.get("percentiles", DEFAULT_PERCENTILES)
+    if not isinstance(percentiles, list) or not percentiles:
+        raise ValueError("percentiles must be a non-empty list")
+    try:
+        percentiles = [float(q) for q in percentiles]
+    except (TypeError, ValueError):
+        raise ValueError("percentiles must be numbers")
+    if any(q < 0 or q > 100 for q in percentiles):
+        raise ValueError("percentiles must be between 0 and 100")
+
+    district_data = HARDCODED_DATA[district_name]
+    base_row = np.array([district_data["Area"]] + [district_data["Weather"][f] for f in WEATHER_FEATURES])
+    names = list(parameters)
+    columns = [SCENARIO_PARAMETERS.index(name) for name in names]
+
+    if mode == "grid":
+        # Each axis may only be as long as the scenarios left after the axes before it
+        axes, total = [], 1
+        try:
+            for name in names:
+                axes.append(_grid_values(name, parameters[name], MAX_SCENARIOS // total))
+                total *= len(axes[-1])
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid grid parameters: {e}")
+        shape = tuple(len(values) for values in axes)
+
+        def fill_chunk(chunk, start, stop):
+            # Decode flat scenario numbers into one index per axis, no per-row Python objects
+            indices = np.unravel_index(np.arange(start, stop), shape)
+            for column, values, index in zip(columns, axes, indices):
+                chunk[:, column] = values[index]
+
+    elif mode == "monte_carlo":
+        try:
+            total = int(body.get("samples", 10000))
+        except (TypeError, ValueError):
+            raise ValueError("samples must be an integer")
+        if not 0 < total <= MAX_SCENARIOS:
+            raise ValueError(f"samples must be between 1 and {MAX_SCENARIOS}")
+        try:
+            samplers = [_sampler(name, parameters[name]) for name in names]
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid distribution parameters: missing or invalid {e}")
+        seed = body.get("seed")
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+            raise ValueError("seed must be a non-negative integer or null")
+        rng = np.random.default_rng(seed)
+
+        def fill_chunk(chunk, start, stop):
+            for column, sampler in zip(columns, samplers):
+                chunk[:, column] = sampler(rng, stop - start)
+
+    else:
+        raise ValueError("mode must be 'grid' or 'monte_carlo'")
+
+    yields, areas = _score_chunks(base_row, fill_chunk, total, body.get("model"))
+    productions = (yields * areas) / 1000  # Convert from kg to tonnes
+
+    result = {
+        "District": district_name,
+        "mode": mode,
+        "scenario_count": total,
+        "Predicted_Yield": _summary(yields, percentiles),
+        "Predicted_Production": _summary(productions, percentiles),
+    }
+
+    if mode == "grid":
+        # Production band for every value of each swept parameter, across all other parameters
+        grid = productions.reshape(shape)
+        result["Production_Bands"] = {}
+        for axis, (name, values) in enumerate(zip(names, axes)):
+            per_value = np.moveaxis(grid, axis, 0).reshape(len(values), -1)
+            bands = np.percentile(per_value, percentiles, axis=1)
+            result["Production_Bands"][name] = {
+                "values": np.round(values, 2).tolist(),
+                **{f"p{q:g}": np.round(band, 2).tolist() for q, band in zip(percentiles, bands)},
+            }
+    return result
@@ -0,0 +1,3 @@
+from training.pipeline import DEFAULT_PARAM_GRID, run_training
+
+__all__ = ["DEFAULT_PARAM_GRID", "run_training"]
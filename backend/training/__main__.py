@@ -0,0 +1,23 @@
+# to run (from the repository root): PYTHONPATH=backend python -m training [--n-jobs 4] [--promote]
+import argparse
+import json
+from training.pipeline import DEFAULT_PARAM_GRID, MODELS_DIR, run_training
+from historical_store import HISTORICAL_CSV_PATH
+
+# Worker processes re-import this module, only run the CLI in the parent
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the yield model with cross-validated hyperparameter search.")
+    parser.add_argument("--csv", default=HISTORICAL_CSV_PATH, help="Historical data CSV")
+    parser.add_argument("--n-jobs", type=int, default=None, help="Worker processes for the search, defaults to all CPUs")
+    parser.add_argument("--param-grid", default=None, help="JSON object of parameter lists to search")
+    parser.add_argument("--output-dir", default=MODELS_DIR, help="Directory for versioned artefacts")
+    parser.add_argument("--promote", action="store_true", help="Also serve the new model as the default model")
+    args = parser.parse_args()
+
+    run_training(
+        csv_path=args.csv,
+        param_grid=json.loads(args.param_grid) if args.param_grid else DEFAULT_PARAM_GRID,
+        n_jobs=args.n_jobs,
+        output_dir=args.output_dir,
+        promote=args.promote,
+    )
@@ -0,0 +1,145 @@
+import json
+import os
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import joblib
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold, LeaveOneGroupOut, ParameterGrid
+from crop_prediction import WEATHER_FEATURES
+from historical_store import HISTORICAL_CSV_PATH, parse_historical_csv
+from model_registry import file_sha256, register_model_version
+from forest_compiler import export_flat_forest, flat_path_for
+
+MODELS_DIR = "assets/models"
+TARGET = "Crop_Yield"
+RANDOM_STATE = 42
+KFOLD_SPLITS = 5
+
+DEFAULT_PARAM_GRID = {
+    "n_estimators": [100, 300],
+    "max_depth": [None, 6, 12],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": [1.0, "sqrt"],
+}
+
+
+def load_training_data(csv_path=HISTORICAL_CSV_PATH):
+    """
+    Features, target and season groups from the historical CSV, in the feature order predict_yield uses.
+    """
+    frame = parse_historical_csv(csv_path)
+    return frame[WEATHER_FEATURES].to_numpy(), frame[TARGET].to_numpy(dtype=float), frame["Year"].to_numpy()
+
+
+def _metrics(y_true, y_pred):
+    errors = y_pred - y_true
+    total = ((y_true - y_true.mean()) ** 2).sum()
+    return {
+        "mae": round(float(np.abs(errors).mean()), 3),
+        "rmse": round(float(np.sqrt((errors ** 2).mean())), 3),
+        "r2": round(float(1 - (errors ** 2).sum() / total), 4) if total else None,
+    }
+
+
+def _cross_validate(params, X, y, splits):
+    """
+    Out-of-fold predictions for every row, scored once over the whole dataset.
+    """
+    predictions = np.empty_like(y)
+    for train, test in splits:
+        model = RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=1, **params)
+        model.fit(X[train], y[train])
+        predictions[test] = model.predict(X[test])
+    return _metrics(y, predictions)
+
+
+def evaluate_config(params, X, y, groups):
+    """
+    Score one hyperparameter configuration with k-fold and leave-one-year-out cross-validation.
+    Runs in a worker process.
+    """
+    start = time.perf_counter()
+    kfold = KFold(n_splits=min(KFOLD_SPLITS, len(y)), shuffle=True, random_state=RANDOM_STATE)
+    result = {
+        "params": params,
+        "kfold": _cross_validate(params, X, y, kfold.split(X)),
+        "leave_one_year_out": _cross_validate(params, X, y, LeaveOneGroupOut().split(X, y, groups)),
+    }
+    result["training_seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_training(csv_path=HISTORICAL_CSV_PATH, param_grid=None, n_jobs=None, output_dir=MODELS_DIR, promote=False):
+    """
+    Search hyperparameters in parallel, refit the best configuration on all rows and
+    write a versioned model artefact with its metadata and register it in the model manifest.
+    The best configuration has the lowest leave-one-year-out RMSE.
+    With `promote` the new version becomes the default served version.
+    Returns the metadata written next to the artefact.
+    """
+    X, y, groups = load_training_data(csv_path)
+    configs = list(ParameterGrid(param_grid or DEFAULT_PARAM_GRID))
+    print(f"Evaluating {len(configs)} configurations on {len(y)} rows with {n_jobs or os.cpu_count()} workers.")
+
+    search_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        results = list(executor.map(evaluate_config, configs, [X] * len(configs), [y] * len(configs),
+                                    [groups] * len(configs)))
+    search_seconds = time.perf_counter() - search_start
+    for result in results:
+        print(f"{result['params']}: LOYO RMSE {result['leave_one_year_out']['rmse']}, "
+              f"k-fold RMSE {result['kfold']['rmse']}, {result['training_seconds']}s")
+
+    best = min(results, key=lambda result: result["leave_one_year_out"]["rmse"])
+    fit_start = time.perf_counter()
+    model = RandomForestRegressor(random_state=RANDOM_STATE, **best["params"])
+    model.fit(X, y)
+    fit_seconds = time.perf_counter() - fit_start
+
+    version = datetime.now().strftime("%Y%m%dT%H%M%S")
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, f"rf_yield_{version}.pkl")
+    joblib.dump(model, model_path)
+    # Serving workers memory-map this export instead of unpickling the model
+    export_flat_forest(model, flat_path_for(model_path), file_sha256(model_path))
+
+    metadata = {
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "model_path": model_path,
+        "model_sha256": file_sha256(model_path),
+        "features": WEATHER_FEATURES,
+        "target": TARGET,
+        "params": best["params"],
+        "metrics": {"kfold": best["kfold"], "leave_one_year_out": best["leave_one_year_out"]},
+        "training_data": {"path": csv_path, "rows": len(y), "sha256": file_sha256(csv_path)},
+        "random_state": RANDOM_STATE,
+        "timings": {
+            "search_seconds": round(search_seconds, 3),
+            "final_fit_seconds": round(fit_seconds, 3),
+            "n_jobs": n_jobs or os.cpu_count(),
+        },
+        "search": results,
+        "environment": {
+            "python": platform.python_version(),
+            "sklearn": sklearn.__version__,
+            "numpy": np.__version__,
+        },
+    }
+    with open(os.path.join(output_dir, f"rf_yield_{version}.json"), "w") as f:
+        json.dump(metadata, f, indent=4, default=str)
+    print(f"Saved model version {version} to {model_path}.")
+
+    register_model_version(version, {
+        "path": model_path,
+        "type": type(model).__name__,
+        "features": WEATHER_FEATURES,
+        "sha256": metadata["model_sha256"],
+        "metrics": {"leave_one_year_out": best["leave_one_year_out"]},
+    }, make_default=promote)
+    print(f"Registered model version {version}{' as the default' if promote else ''}.")
+    return metadata
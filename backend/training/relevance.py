@@ -0,0 +1,159 @@
+# to run (from the repository root): PYTHONPATH=backend python -m training.relevance [--target-precision 0.98] [--report]
+import argparse
+import json
+import math
+import os
+from datetime import datetime
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+from sklearn.pipeline import make_pipeline
+import insights_store
+from relevance_filter import RELEVANCE_FILTER_PATH, metadata_path
+
+RANDOM_STATE = 42
+KFOLD_SPLITS = 5
+# Share of local verdicts that must agree with the LLM on held-out headlines
+TARGET_PRECISION = 0.98
+MIN_EXAMPLES_PER_CLASS = 20
+
+
+def build_classifier():
+    """
+    Hashed word and bigram TF-IDF with logistic regression. Hashing needs no vocabulary, so unseen words cost nothing.
+    """
+    return make_pipeline(
+        HashingVectorizer(ngram_range=(1, 2), n_features=2 ** 18, alternate_sign=False, norm=None),
+        TfidfTransformer(sublinear_tf=True),
+        LogisticRegression(C=4.0, class_weight="balanced", max_iter=1000),
+    )
+
+
+def _confident_prefix(probabilities, is_target, target_precision):
+    """
+    Number of headlines, taken in order of `probabilities`, that can be decided locally while the
+    share of `is_target` among them stays at least `target_precision`.
+    A prefix never ends inside a run of equal probabilities, since a threshold cannot split it.
+    """
+    if not len(is_target):
+        return 0
+    precision = np.cumsum(is_target) / np.arange(1, len(is_target) + 1)
+    run_ends = np.append(probabilities[1:] != probabilities[:-1], True)
+    passing = np.flatnonzero((precision >= target_precision) & run_ends)
+    return int(passing[-1]) + 1 if len(passing) else 0
+
+
+def choose_thresholds(probabilities, labels, target_precision=TARGET_PRECISION):
+    """
+    Lowest and highest probabilities of relevance at which the filter still matches the LLM with `target_precision`.
+    Each side only considers its own half of the probabilities, so the locally decided sets never overlap.
+    A side without such a threshold is disabled (-1 or 2, never reached).
+    """
+    below_half = probabilities < 0.5
+    ascending = np.flatnonzero(below_half)[np.argsort(probabilities[below_half], kind="stable")]
+    low_count = _confident_prefix(probabilities[ascending], labels[ascending] == 0, target_precision)
+    descending = np.flatnonzero(~below_half)[np.argsort(-probabilities[~below_half], kind="stable")]
+    high_count = _confident_prefix(probabilities[descending], labels[descending] == 1, target_precision)
+    thresholds = {
+        "irrelevant_below": float(probabilities[ascending[low_count - 1]]) if low_count else -1.0,
+        "relevant_above": float(probabilities[descending[high_count - 1]]) if high_count else 2.0,
+    }
+    assert thresholds["irrelevant_below"] < thresholds["relevant_above"], thresholds
+    return thresholds
+
+
+def evaluate(probabilities, labels, thresholds):
+    """
+    Precision and recall of the local verdicts against the LLM labels, and the share of headlines decided locally.
+    """
+    local_irrelevant = probabilities <= thresholds["irrelevant_below"]
+    # prefilter checks the irrelevant side first, so no headline counts on both sides
+    local_relevant = (probabilities >= thresholds["relevant_above"]) & ~local_irrelevant
+
+    def scores(decided, label):
+        true_positives = int((decided & (labels == label)).sum())
+        return {
+            "decided": int(decided.sum()),
+            "precision": round(true_positives / decided.sum(), 4) if decided.any() else None,
+            "recall": round(true_positives / (labels == label).sum(), 4) if (labels == label).any() else None,
+        }
+
+    return {
+        "headlines": len(labels),
+        "coverage": round(float((local_irrelevant | local_relevant).mean()), 4),
+        "irrelevant": scores(local_irrelevant, 0),
+        "relevant": scores(local_relevant, 1),
+        # The costly mistake: relevant news the LLM never sees
+        "relevant_dropped": int((local_irrelevant & (labels == 1)).sum()),
+    }
+
+
+def run_relevance_training(target_precision=TARGET_PRECISION, output_path=RELEVANCE_FILTER_PATH):
+    """
+    Train the headline filter on stored LLM verdicts, pick its confidence thresholds from
+    cross-validated probabilities and save it with its metadata. Returns the metadata, or None
+    when there are too few labelled headlines.
+    """
+    rows = insights_store.llm_labelled_headlines()
+    titles = [title for title, _ in rows]
+    labels = np.array([1 if relevancy == "Relevant" else 0 for _, relevancy in rows])
+    counts = {"relevant": int(labels.sum()), "irrelevant": int(len(labels) - labels.sum())}
+    if min(counts.values()) < MIN_EXAMPLES_PER_CLASS:
+        print(f"Not enough labelled headlines to train the relevance filter: {counts}, "
+              f"need {MIN_EXAMPLES_PER_CLASS} of each.")
+        return None
+
+    splits = StratifiedKFold(n_splits=KFOLD_SPLITS, shuffle=True, random_state=RANDOM_STATE)
+    probabilities = cross_val_predict(build_classifier(), titles, labels, cv=splits, method="predict_proba")[:, 1]
+    thresholds = choose_thresholds(probabilities, labels, target_precision)
+    report = evaluate(probabilities, labels, thresholds)
+
+    model = build_classifier().fit(titles, labels)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    # Write then rename, so the pipeline never loads a half-written filter
+    temp_path = f"{output_path}.tmp"
+    joblib.dump(model, temp_path)
+    meta = {
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "examples": counts,
+        "target_precision": target_precision,
+        "thresholds": thresholds,
+        "cross_validation": report,
+    }
+    with open(f"{metadata_path(output_path)}.tmp", "w") as f:
+        json.dump(meta, f, indent=4)
+    os.replace(f"{metadata_path(output_path)}.tmp", metadata_path(output_path))
+    os.replace(temp_path, output_path)
+    print(f"Saved relevance filter to {output_path}: {json.dumps(report)}")
+    return meta
+
+
+def report_calls_avoided(batch_size):
+    """
+    Per processed date, the headlines the filter decided and the relevance requests that saved.
+    """
+    for date, classified, local in insights_store.relevance_label_counts():
+        avoided = math.ceil(classified / batch_size) - math.ceil((classified - local) / batch_size)
+        print(f"{date}  headlines={classified:4d}  decided locally={local:4d}  relevance requests avoided={avoided}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the local headline relevance filter on past LLM verdicts.")
+    parser.add_argument("--target-precision", type=float, default=TARGET_PRECISION,
+                        help="Agreement with the LLM required of local verdicts")
+    parser.add_argument("--output", default=RELEVANCE_FILTER_PATH, help="Where to save the filter")
+    parser.add_argument("--report", action="store_true", help="Only print the LLM calls avoided per date")
+    args = parser.parse_args()
+
+    if args.report:
+        from trend_analysis import RELEVANCE_BATCH_SIZE
+        if os.path.exists(metadata_path(args.output)):
+            with open(metadata_path(args.output), "r") as f:
+                meta = json.load(f)
+            print(f"Filter trained {meta['trained_at']}, cross-validated against the LLM: "
+                  f"{json.dumps(meta['cross_validation'])}")
+        report_calls_avoided(RELEVANCE_BATCH_SIZE)
+    else:
+        run_relevance_training(args.target_precision, args.output)
@@ -1,22 +1,22 @@
 import os
 import json
-import requests
-from openai import OpenAI
+import threading
 from datetime import datetime, timedelta
-
-# News API Key - personal
-# News API Key - work
-NEWS_API_KEY = "INSERT KEY HERE"
-OPENAI_API_KEY = "INSERT KEY HERE"
-
-client = OpenAI(api_key=OPENAI_API_KEY)
-
-# Execution log file to track the last execution date
+from llm_client import LLM_MODEL, chat_completion, chat_completion_stream, map_concurrent
+import llm_cache
+import math
+import insights_store
+from news_client import fetch_all_pages
+from news_dedup import DEDUP_WINDOW_DAYS, deduplicate
+from relevance_filter import prefilter
+
+# Execution log file to track the last execution date and the status of every processed date
 execution_log_file = "assets/last_execution.json"
+execution_log_lock = threading.Lock()
 
-def fetch_news(date=None):
+def fetch_news(date=None, use_cache=True):
     """
-    Fetch news articles from NewsAPI with optimized API calls for a specific date.
+    Fetch news articles from NewsAPI for a specific date, following every result page.
     If no date is provided, default to yesterday.
     """
     sources = ",".join([
@@ -38,149 +38,373 @@ def fetch_news(date=None):
     target_date = date if date else datetime.now() - timedelta(days=1)
     target_date_str = target_date.strftime('%Y-%m-%d')
 
-    # Define the API request
-    url = (
-        f"https://newsapi.org/v2/everything?"
-        f"q={query}&"
-        f"sources={sources}&"
-        f"from={target_date_str}&"
-        f"to={target_date_str}&"
-        f"sortBy=publishedAt&"
-        f"pageSize=100&"  # Maximize results per call
-        f"apiKey={NEWS_API_KEY}"
+    params = {
+        "q": query,
+        "sources": sources,
+        "from": target_date_str,
+        "to": target_date_str,
+        "sortBy": "publishedAt",
+    }
+    articles = fetch_all_pages(params, target_date_str, use_cache)
+    print(f"Fetched {len(articles)} articles from NewsAPI for {target_date_str}.")
+    return articles
+
+
+# System prompts shared by the news pipeline
+RELEVANCE_SYSTEM_PROMPT = "You are a Pakistani expert in agricultural markets."
+INSIGHTS_SYSTEM_PROMPT = (
+    "You are a Pakistani expert in agricultural markets. You help decision makers at Rashid Rice Mills in Pakistan. "
+    "Rashid Rice Mills purchases rice paddy from different districts in Pakistan, processes it to produce rice. "
+    "This rice is sold to local distributors and exported to markets in UAE and Saudi Arabia. Your goal is to "
+    "analyze news from different sources and identify key insights and implications about rice supply, demand, and pricing."
+    "If no insights have been provided to you return a blank response."
+)
+TLDR_SYSTEM_PROMPT = "You are an expert in summarizing insights for executives at Rashid Rice Mills."
+
+# Number of headlines classified per relevance request, 1 disables batching
+RELEVANCE_BATCH_SIZE = int(os.environ.get("RELEVANCE_BATCH_SIZE", 20))
+RELEVANCE_VERDICTS = {"relevant": "Relevant", "irrelevant": "Irrelevant"}
+
+
+def _relevance_prompt(title):
+    return (
+        f"You are a Pakistani expert in local and global agricultural markets. Determine if the following headline is relevant to rice supply, demand, "
+        f"or pricing. Respond with 'Relevant' or 'Irrelevant'.\n\nHeadline: {title}"
     )
 
-    # Make the API call
-    response = requests.get(url)
-    if response.status_code == 200:
-        articles = response.json().get("articles", [])
-        print(f"Fetched {len(articles)} articles from NewsAPI for {target_date_str}.")
-        return articles
-    else:
-        print(f"Failed to fetch news. Status Code: {response.status_code}, Response: {response.text}")
-        return []
 
-def process_articles(articles):
+def classify_relevance(title):
     """
-    Process articles to identify relevance, extract insights, and generate a TL;DR.
-    Generates a TL;DR for all relevant insights.
+    1st Prompt: Filter an article based on its headline.
     """
-    processed_articles = []  # All articles with relevance status
-    relevant_insights = []  # Insights for relevant articles
-    tldr_points = []  # Bullet points for the TL;DR
+    return chat_completion(RELEVANCE_SYSTEM_PROMPT, _relevance_prompt(title))
 
-    # 1st Prompt: Filter articles based on headlines
-    for article in articles:
-        title = article.get("title", "")
-        url = article.get("url", "No URL")
-        content = article.get("content", "")
 
-        if not title:
-            continue  # Skip articles without a title
+def _parse_batch_verdicts(response_text, batch_length):
+    """
+    Parse a batched relevance response into {headline number: verdict}.
+    Entries that are missing, out of range or not a valid verdict are left out.
+    """
+    text = response_text.strip()
+    # Models sometimes wrap JSON in a markdown code fence
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("["):]
+    try:
+        entries = json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(entries, list):
+        return {}
+
+    verdicts = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        number = entry.get("id")
+        verdict = RELEVANCE_VERDICTS.get(str(entry.get("verdict", "")).strip().lower())
+        if isinstance(number, int) and 1 <= number <= batch_length and verdict:
+            verdicts[number] = verdict
+    return verdicts
+
+
+def _classify_batch(titles):
+    """
+    Classify a batch of headlines with one request.
+    Headlines the response does not give a valid verdict for are classified one by one.
+    """
+    if len(titles) == 1:
+        return [classify_relevance(titles[0])]
+
+    headlines = "\n".join(f"{number}. {' '.join(title.split())}" for number, title in enumerate(titles, start=1))
+    batch_prompt = (
+        f"You are a Pakistani expert in local and global agricultural markets. For each of the following headlines, determine "
+        f"if it is relevant to rice supply, demand, or pricing. Respond only with a JSON array containing one object per "
+        f"headline, in the same order, of the form {{\"id\": <headline number>, \"verdict\": \"Relevant\" or \"Irrelevant\"}}."
+        f"\n\nHeadlines:\n{headlines}"
+    )
+    # Batch prompts rarely repeat, verdicts are cached per headline below instead
+    verdicts = _parse_batch_verdicts(
+        chat_completion(RELEVANCE_SYSTEM_PROMPT, batch_prompt, use_cache=False), len(titles)
+    )
+    for number, verdict in verdicts.items():
+        llm_cache.put(LLM_MODEL, RELEVANCE_SYSTEM_PROMPT, _relevance_prompt(titles[number - 1]), verdict)
 
-        filter_prompt = (
-            f"You are a Pakistani expert in local and global agricultural markets. Determine if the following headline is relevant to rice supply, demand, "
-            f"or pricing. Respond with 'Relevant' or 'Irrelevant'.\n\nHeadline: {title}"
-        )
-        filter_response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a Pakistani expert in agricultural markets."},
-                {"role": "user", "content": filter_prompt},
-            ]
-        )
-        relevance = filter_response.choices[0].message.content.strip()
+    missing = [number for number in range(1, len(titles) + 1) if number not in verdicts]
+    if missing:
+        print(f"Batched relevance response missed {len(missing)} of {len(titles)} headlines, classifying them one by one.")
+        for number in missing:
+            verdicts[number] = classify_relevance(titles[number - 1])
+    return [verdicts[number] for number in range(1, len(titles) + 1)]
+
+
+def classify_headlines(titles, batch_size=None, concurrency=None, on_verdicts=None):
+    """
+    Classify headlines as 'Relevant' or 'Irrelevant', sending `batch_size` headlines per request.
+    Headlines with a cached verdict are not sent again.
+    Verdicts are returned in the order of `titles`.
+    `on_verdicts(indices, verdicts)` is called with positions in `titles` and their verdicts, first for
+    the cached headlines and then for each batch as soon as it is classified, from the worker threads.
+    """
+    verdicts = [llm_cache.get(LLM_MODEL, RELEVANCE_SYSTEM_PROMPT, _relevance_prompt(title)) for title in titles]
+    uncached = [i for i, verdict in enumerate(verdicts) if verdict is None]
+    if on_verdicts and len(uncached) < len(titles):
+        cached = [i for i, verdict in enumerate(verdicts) if verdict is not None]
+        on_verdicts(cached, [verdicts[i] for i in cached])
+
+    batch_size = batch_size or RELEVANCE_BATCH_SIZE
+    batches = [uncached[j:j + batch_size] for j in range(0, len(uncached), batch_size)]
+
+    def classify(indices):
+        batch_verdicts = _classify_batch([titles[i] for i in indices])
+        if on_verdicts:
+            on_verdicts(indices, batch_verdicts)
+        return batch_verdicts
+
+    for indices, batch_verdicts in zip(batches, map_concurrent(classify, batches, concurrency)):
+        for i, verdict in zip(indices, batch_verdicts):
+            verdicts[i] = verdict
+    return verdicts
+
+
+def extract_insight(content):
+    """
+    2nd Prompt: Insights for a relevant article.
+    """
+    insights_prompt = (
+        f"Analyse the following article to identify potential implications on Rashid Rice Mills on rice supply, "
+        f"demand and price globally and locally. Your response should be to the point and in one paragraph of no more than "
+        f"200 words. Your analysis will be used by executives at Rashid Rice Mills to make decisions around purchase of more "
+        f"raw materials and increasing or decreasing production. Take special note that you cannot mention anything about "
+        f"changing the product.\n\n{content}"
+    )
+    return chat_completion(INSIGHTS_SYSTEM_PROMPT, insights_prompt)
 
-        # Store article with relevance status
-        processed_articles.append({
-            "title": title,
-            "url": url,
-            "relevancy": relevance
-        })
 
-        # 2nd Prompt: Insights for relevant articles
-        if relevance.lower() == "relevant":
-            insights_prompt = (
-                f"Analyse the following article to identify potential implications on Rashid Rice Mills on rice supply, "
-                f"demand and price globally and locally. Your response should be to the point and in one paragraph of no more than "
-                f"200 words. Your analysis will be used by executives at Rashid Rice Mills to make decisions around purchase of more "
-                f"raw materials and increasing or decreasing production. Take special note that you cannot mention anything about "
-                f"changing the product.\n\n{content}"
-            )
-            insights_response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a Pakistani expert in agricultural markets. You help decision makers at Rashid Rice Mills in Pakistan. "
-                            "Rashid Rice Mills purchases rice paddy from different districts in Pakistan, processes it to produce rice. "
-                            "This rice is sold to local distributors and exported to markets in UAE and Saudi Arabia. Your goal is to "
-                            "analyze news from different sources and identify key insights and implications about rice supply, demand, and pricing."
-                            "If no insights have been provided to you return a blank response."
-                        )
-                    },
-                    {"role": "user", "content": insights_prompt},
-                ]
-            )
-            insight_text = insights_response.choices[0].message.content.strip()
-
-            relevant_insights.append({
-                "title": title,
-                "insight": insight_text,
-                "url": url
-            })
-
-    # 3rd Prompt: Generate TL;DR
+def summarize_insights(relevant_insights, on_token=None):
+    """
+    3rd Prompt: Generate TL;DR
+    With `on_token` the response is streamed and every piece is passed to it as it arrives.
+    """
     tldr_prompt = (
         "Combine the following insights into a concise, high-level summary (TL;DR) that can be read in 30 seconds. "
         "Focus on key takeaways and potential implications for Rashid Rice Mills."
         "If you are not provided any insights return a blank response.\n\n" + 
         "\n".join([insight['insight'] for insight in relevant_insights])
     )
-    tldr_response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are an expert in summarizing insights for executives at Rashid Rice Mills."},
-            {"role": "user", "content": tldr_prompt},
-        ]
+    if on_token is None:
+        return chat_completion(TLDR_SYSTEM_PROMPT, tldr_prompt).split("\n")
+    pieces = []
+    for piece in chat_completion_stream(TLDR_SYSTEM_PROMPT, tldr_prompt):
+        pieces.append(piece)
+        on_token(piece)
+    return "".join(pieces).strip().split("\n")
+
+
+def _ignore_progress(**fields):
+    pass
+
+
+def _dedup_stats(clusters, relevances, article_count, batch_size):
+    """
+    How many copies deduplication removed and the LLM calls that saved.
+    """
+    within_day = sum(len(cluster["duplicates"]) for cluster in clusters)
+    earlier = [cluster for cluster in clusters if cluster["earlier"]]
+    unique = len(clusters) - len(earlier)
+    # Without deduplication every copy of a relevant story gets its own insight call
+    insight_calls_saved = sum(
+        len(cluster["duplicates"]) for cluster, relevance in zip(clusters, relevances)
+        if not cluster["earlier"] and relevance.lower() == "relevant"
+    ) + sum(
+        1 + len(cluster["duplicates"]) for cluster in earlier
+        # Stories of a date still being backfilled have no relevancy yet
+        if (cluster["earlier"]["relevancy"] or "").lower() == "relevant"
+    )
+    batch_size = batch_size or RELEVANCE_BATCH_SIZE
+    return {
+        "articles": article_count,
+        "unique_stories": unique,
+        "duplicates_within_day": within_day,
+        "duplicates_of_earlier_days": sum(1 + len(cluster["duplicates"]) for cluster in earlier),
+        "dedup_ratio": round(1 - unique / article_count, 3) if article_count else 0.0,
+        "llm_calls_saved": {
+            "relevance": math.ceil(article_count / batch_size) - math.ceil(unique / batch_size),
+            "insights": insight_calls_saved,
+        },
+    }
+
+
+def cluster_stories(articles, date=None, earlier=None):
+    """
+    Cluster near-duplicate copies among the titled articles, see news_dedup.deduplicate.
+    With a `date`, stories of the previous DEDUP_WINDOW_DAYS days are marked as seen before.
+    Their fingerprints come from the insights store unless they are passed as `earlier`.
+    """
+    titled_articles = [article for article in articles if article.get("title", "")]
+    if earlier is None:
+        earlier = insights_store.recent_fingerprints(date, DEDUP_WINDOW_DAYS) if date else []
+    return deduplicate(titled_articles, earlier)
+
+
+def process_articles(articles, concurrency=None, batch_size=None, on_progress=_ignore_progress, date=None,
+                     clusters=None):
+    """
+    Process articles to identify relevance, extract insights, and generate a TL;DR.
+    Generates a TL;DR for all relevant insights.
+    Near-duplicate copies of a story are clustered first and only one representative per cluster
+    reaches the LLM, its insight lists the other copies' URLs. With a `date`, stories already seen
+    in the previous DEDUP_WINDOW_DAYS days are skipped. `clusters` are passed when the articles
+    were already clustered with cluster_stories.
+    Headlines the local relevance filter is confident about are not sent to the LLM.
+    Relevance and insight calls run concurrently, up to `concurrency` at a time.
+    Insights keep the order in which their stories first appear. processed_articles is grouped
+    by story: each representative comes first, followed by its copies.
+    Headlines are classified `batch_size` per request.
+    `on_progress` is called with updated counters as each stage advances, and with
+    event={...} for every verdict, every finished insight and every piece of the streamed TL;DR.
+    """
+    # Skip articles without a title
+    titled_articles = [article for article in articles if article.get("title", "")]
+
+    if clusters is None:
+        clusters = cluster_stories(titled_articles, date)
+    new_clusters = [cluster for cluster in clusters if not cluster["earlier"]]
+    on_progress(unique_stories=len(new_clusters))
+
+    def publish_verdict(cluster, relevancy):
+        on_progress(event={
+            "type": "verdict",
+            "title": cluster["representative"].get("title", ""),
+            "url": cluster["representative"].get("url", "No URL"),
+            "relevancy": relevancy,
+            "copies": 1 + len(cluster["duplicates"]),
+        })
+
+    titles = [cluster["representative"].get("title", "") for cluster in new_clusters]
+    local_verdicts = prefilter(titles)
+    # Verdicts known without the LLM are published straight away, the LLM's as each batch returns
+    for cluster in clusters:
+        if cluster["earlier"]:
+            publish_verdict(cluster, "duplicate")
+    for cluster, verdict in zip(new_clusters, local_verdicts):
+        if verdict is not None:
+            publish_verdict(cluster, verdict)
+    llm_clusters = [cluster for cluster, verdict in zip(new_clusters, local_verdicts) if verdict is None]
+    llm_titles = [cluster["representative"].get("title", "") for cluster in llm_clusters]
+
+    def publish_llm_verdicts(indices, verdicts):
+        for i, verdict in zip(indices, verdicts):
+            publish_verdict(llm_clusters[i], verdict)
+
+    llm_verdicts = iter(classify_headlines(
+        llm_titles, batch_size, concurrency, None if on_progress is _ignore_progress else publish_llm_verdicts
+    ))
+    new_relevances = iter([verdict or next(llm_verdicts) for verdict in local_verdicts])
+    new_sources = iter(["llm" if verdict is None else "prefilter" for verdict in local_verdicts])
+    # Stories seen on an earlier day are not classified again
+    relevances, sources = [], []
+    for cluster in clusters:
+        relevances.append("duplicate" if cluster["earlier"] else next(new_relevances))
+        sources.append(None if cluster["earlier"] else next(new_sources))
+
+    # All articles with relevance status, copies point at the article that was processed
+    processed_articles = []
+    for cluster, relevance, source in zip(clusters, relevances, sources):
+        representative_url = cluster["representative"].get("url", "No URL")
+        processed_articles.append({
+            "title": cluster["representative"].get("title", ""),
+            "url": representative_url,
+            "relevancy": relevance,
+            "label_source": source,
+            "simhash": cluster["simhash"],
+            "duplicate_of": cluster["earlier"]["url"] if cluster["earlier"] else None,
+        })
+        processed_articles.extend(
+            {"title": article.get("title", ""), "url": article.get("url", "No URL"), "relevancy": relevance,
+             "label_source": source, "simhash": None, "duplicate_of": representative_url}
+            for article in cluster["duplicates"]
+        )
+    relevant_clusters = [
+        cluster for cluster, relevance in zip(clusters, relevances) if relevance.lower() == "relevant"
+    ]
+
+    on_progress(articles_classified=len(processed_articles), relevant_articles=len(relevant_clusters))
+
+    insights_done = [0]
+    insights_lock = threading.Lock()
+
+    def insight_with_progress(cluster):
+        insight_text = extract_insight(cluster["representative"].get("content", ""))
+        with insights_lock:
+            insights_done[0] += 1
+            on_progress(insights_extracted=insights_done[0])
+        on_progress(event={
+            "type": "insight",
+            "title": cluster["representative"].get("title", ""),
+            "url": cluster["representative"].get("url", "No URL"),
+            "insight": insight_text,
+            "duplicate_urls": [article.get("url", "No URL") for article in cluster["duplicates"]],
+        })
+        return insight_text
+
+    insight_texts = map_concurrent(insight_with_progress, relevant_clusters, concurrency)
+    # Insights for relevant articles
+    relevant_insights = [
+        {
+            "title": cluster["representative"].get("title", ""),
+            "insight": insight_text,
+            "url": cluster["representative"].get("url", "No URL"),
+            "duplicate_urls": [article.get("url", "No URL") for article in cluster["duplicates"]],
+        }
+        for cluster, insight_text in zip(relevant_clusters, insight_texts)
+    ]
+
+    # Bullet points for the TL;DR
+    # Stream the TL;DR only when someone is listening
+    stream_tldr = None if on_progress is _ignore_progress else (
+        lambda piece: on_progress(event={"type": "tldr_token", "text": piece})
     )
-    tldr_points = tldr_response.choices[0].message.content.strip().split("\n")
+    tldr_points = summarize_insights(relevant_insights, stream_tldr)
+    on_progress(summarized=True)
+
+    dedup = _dedup_stats(clusters, relevances, len(titled_articles), batch_size)
+    print(f"Deduplication: {dedup['articles']} articles, {dedup['unique_stories']} unique stories, "
+          f"LLM calls saved: {dedup['llm_calls_saved']}.")
+    batch_size = batch_size or RELEVANCE_BATCH_SIZE
+    relevance_filter = {
+        "headlines": len(titles),
+        "decided_locally": len(titles) - len(llm_titles),
+        "llm_calls_avoided": math.ceil(len(titles) / batch_size) - math.ceil(len(llm_titles) / batch_size),
+    }
+    print(f"Relevance filter: {relevance_filter['decided_locally']} of {len(titles)} headlines decided locally.")
 
     return {
         "total_articles": len(articles),
         "relevant_articles_count": len(relevant_insights),
         "insights_count": len(relevant_insights),
         "tldr_points": tldr_points,
-        "relevant_insights": relevant_insights
+        "relevant_insights": relevant_insights,
+        "processed_articles": processed_articles,
+        "dedup": dedup,
+        "relevance_filter": relevance_filter
     }
 
 
 
 
-def save_articles_and_insights(date, articles, processed_data, NEWS_OUTPUT_DIR):
+def save_articles_and_insights(date, processed_data):
     """
-    Save processed articles, insights, and TL;DR to a JSON file.
+    Save processed articles, insights, and TL;DR to the insights store, replacing earlier results for the date.
     """
-    output_data = {
-        "date": date,
-        "total_articles": processed_data["total_articles"],
-        "relevant_articles_count": processed_data["relevant_articles_count"],
-        "insights_count": processed_data["insights_count"],
-        "tldr": processed_data["tldr_points"],
-        "insights": processed_data["relevant_insights"]
-    }
-    output_file = os.path.join(NEWS_OUTPUT_DIR, f"{date}.json")
-    with open(output_file, "w") as f:
-        json.dump(output_data, f, indent=4)
-    return output_file
+    insights_store.save_day(date, processed_data)
 
 
 
 
 def get_last_execution():
     """
-    Retrieve the last execution date from the log.
+    Retrieve the last execution date and the per-date ledger from the log.
     """
     if os.path.exists(execution_log_file):
         with open(execution_log_file, "r") as f:
@@ -188,19 +412,73 @@ def get_last_execution():
     return {}
 
 
+def _write_execution_log(log):
+    # Write to a temporary file first so a crash never leaves a truncated log
+    temp_file = f"{execution_log_file}.tmp"
+    with open(temp_file, "w") as f:
+        json.dump(log, f, indent=4)
+    os.replace(temp_file, execution_log_file)
+
+
+def record_execution(date, status, error=None):
+    """
+    Record the status ('running', 'done' or 'failed') of a date in the ledger.
+    """
+    with execution_log_lock:
+        log = get_last_execution()
+        entry = {"status": status, "updated_at": datetime.now().isoformat(timespec="seconds")}
+        if error:
+            entry["error"] = error
+        log.setdefault("dates", {})[date] = entry
+        _write_execution_log(log)
+
+
 def update_last_execution(date):
     """
-    Update the log with the last execution date.
+    Update the log with the last execution date and mark the date as done in the ledger.
+    """
+    with execution_log_lock:
+        log = get_last_execution()
+        log["last_execution"] = date
+        log.setdefault("dates", {})[date] = {
+            "status": "done", "updated_at": datetime.now().isoformat(timespec="seconds")
+        }
+        _write_execution_log(log)
+
+def run_news_pipeline(report_progress, date, articles=None, clusters=None):
     """
-    with open(execution_log_file, "w") as f:
-        json.dump({"last_execution": date}, f)
+    Fetch, process and save the news for one date, reporting progress along the way.
+    A backfill passes the `articles` it fetched ahead and their `clusters` from cluster_stories.
+    """
+    date_str = date.strftime("%Y-%m-%d")
+    record_execution(date_str, "running")
+    try:
+        if articles is None:
+            articles = fetch_news(date)
+        report_progress(articles_fetched=len(articles))
+
+        processed_data = process_articles(articles, on_progress=report_progress, date=date_str, clusters=clusters)
+        save_articles_and_insights(date_str, processed_data)
+    except Exception as e:
+        record_execution(date_str, "failed", str(e))
+        raise
+    update_last_execution(date_str)
+
+    return {
+        "insights_saved": date_str,
+        "total_articles": processed_data["total_articles"],
+        "relevant_articles": processed_data["relevant_articles_count"],
+        "insights_count": processed_data["insights_count"],
+        "dedup": processed_data["dedup"],
+        "relevance_filter": processed_data["relevance_filter"]
+    }
 
 ############## Manual processing #######################
 
-def process_manual_articles(input_file, output_dir):
+def process_manual_articles(input_file):
     """
     Process articles from a manually provided JSON file, generating insights and TL;DR summaries.
-    Save results grouped by date in separate JSON files.
+    Save results grouped by date in the insights store.
     """
     try:
         # Load the input JSON file
@@ -224,9 +502,9 @@ def process_manual_articles(input_file, output_dir):
         # Process articles for each date
         for date, articles in articles_by_date.items():
             print(f"Processing articles for date: {date}")
-            processed_data = process_articles(articles)  # Reuse the process_articles function
-            save_articles_and_insights(date, articles, processed_data, output_dir)
+            processed_data = process_articles(articles, date=date)  # Reuse the process_articles function
+            save_articles_and_insights(date, processed_data)
 
-        print(f"Processing complete. Results saved in {output_dir}.")
+        print(f"Processing complete. Results saved in {insights_store.INSIGHTS_DB_PATH}.")
     except Exception as e:
         print(f"Error processing manual articles: {e}")
@@ -0,0 +1,2 @@
+# Production entry point, to run (from the repository root): gunicorn -c backend/gunicorn.conf.py wsgi:app
+from app import app
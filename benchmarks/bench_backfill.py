@@ -0,0 +1,56 @@
+# Benchmark backfill wall time against worker count using stub NewsAPI and OpenAI servers.
+# to run (from the repository root): python benchmarks/bench_backfill.py
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.dirname(__file__))
+os.chdir(ROOT)
+
+from fake_newsapi_server import FakeNewsAPIServer
+from fake_openai_server import FakeOpenAIServer
+
+START = datetime(2024, 11, 1)
+END = datetime(2024, 11, 14)
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+if __name__ == "__main__":
+    work_dir = tempfile.mkdtemp()
+    news_server = FakeNewsAPIServer(latency=0.2, articles_per_day=20).start()
+    llm_server = FakeOpenAIServer(latency=0.2).start()
+    # Point the pipeline at the stubs before it is imported
+    os.environ["NEWS_API_URL"] = news_server.url
+    os.environ["OPENAI_BASE_URL"] = llm_server.base_url
+    os.environ["LLM_CACHE_PATH"] = os.path.join(work_dir, "llm_cache.sqlite3")
+    os.environ["INSIGHTS_DB_PATH"] = os.path.join(work_dir, "news_insights.sqlite3")
+    os.environ["NEWS_CACHE_DIR"] = os.path.join(work_dir, "news_cache")
+
+    import trend_analysis
+    from backfill import run_backfill
+
+    trend_analysis.execution_log_file = os.path.join(work_dir, "last_execution.json")
+
+    # Load the relevance filter and open the stores before anything is timed
+    news_server.run_tag = "warm-up"
+    run_backfill(lambda **fields: None, START, START, force=True, workers=1)
+
+    baseline = None
+    for workers in WORKER_COUNTS:
+        news_server.run_tag = f"run-{workers}"
+        # Every run fetches afresh, so it sees its own articles
+        shutil.rmtree(os.environ["NEWS_CACHE_DIR"], ignore_errors=True)
+        start = time.perf_counter()
+        summary = run_backfill(lambda **fields: None, START, END, force=True, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers={workers:2d}  dates={summary['dates_done']:3d}  failed={summary['dates_failed']}  "
+              f"wall={elapsed:7.2f} s  speedup={baseline / elapsed:4.1f}x")
+
+    news_server.stop()
+    llm_server.stop()
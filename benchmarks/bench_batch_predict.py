@@ -0,0 +1,52 @@
+# Benchmark N one-row model.predict calls against one N-row predict_batch call.
+# to run (from the repository root): python benchmarks/bench_batch_predict.py
+import os
+import sys
+import time
+import numpy as np
+import joblib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+os.chdir(ROOT)
+
+from crop_prediction import HARDCODED_DATA, WEATHER_FEATURES, predict_batch
+from model_registry import MODEL_PATH
+
+ROW_COUNTS = [1, 6, 100, 10_000]
+
+
+def make_scenarios(n, rng):
+    """
+    Perturb the hardcoded district inputs to get n distinct scenarios.
+    """
+    districts = list(HARDCODED_DATA)
+    scenarios = []
+    for i in range(n):
+        district = HARDCODED_DATA[districts[i % len(districts)]]
+        weather = {
+            feature: district["Weather"][feature] * rng.uniform(0.9, 1.1) for feature in WEATHER_FEATURES
+        }
+        scenarios.append({"Area": district["Area"], "Weather": weather})
+    return scenarios
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    # The sklearn model itself, not the flat export the registry may serve
+    model = joblib.load(MODEL_PATH)
+
+    for n in ROW_COUNTS:
+        scenarios = make_scenarios(n, rng)
+
+        start = time.perf_counter()
+        for scenario in scenarios:
+            model.predict(np.array([[scenario["Weather"][feature] for feature in WEATHER_FEATURES]]))
+        looped = time.perf_counter() - start
+
+        start = time.perf_counter()
+        predict_batch(None, scenarios)
+        batched = time.perf_counter() - start
+
+        print(f"rows={n:6d}  one-row calls={looped * 1000:10.2f} ms  "
+              f"batch={batched * 1000:8.2f} ms  speedup={looped / batched:7.1f}x")
@@ -0,0 +1,47 @@
+# Compare per-headline and batched relevance classification against the fake OpenAI server.
+# Runs the batch path with well-formed, partial and malformed batch responses and checks
+# that every mode returns the same verdicts as per-headline classification.
+# to run (from the repository root): python benchmarks/bench_batch_relevance.py
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.dirname(__file__))
+os.chdir(ROOT)
+
+from fake_openai_server import FakeOpenAIServer
+
+LATENCY = 0.1
+HEADLINE_COUNT = 200
+BATCH_SIZES = [1, 10, 20, 50]
+
+
+if __name__ == "__main__":
+    server = FakeOpenAIServer(latency=LATENCY).start()
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    # A scratch LLM cache, so the real one is untouched and cached verdicts cannot hide batch requests
+    os.environ["LLM_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "llm_cache.sqlite3")
+    os.environ["RELEVANCE_FILTER_ENABLED"] = "0"
+    from trend_analysis import classify_headlines
+
+    # The fake server finds headlines mentioning rice relevant
+    expected = ["Relevant" if i % 3 == 0 else "Irrelevant" for i in range(HEADLINE_COUNT)]
+
+    for batch_mode in ("ok", "partial", "malformed"):
+        server.batch_mode = batch_mode
+        for batch_size in BATCH_SIZES:
+            # New headlines every run, so none is answered from the cache
+            titles = [f"[{batch_mode}-{batch_size}] Headline {i}: "
+                      + ("rice prices surge" if i % 3 == 0 else "cricket final tonight")
+                      for i in range(HEADLINE_COUNT)]
+            server.request_count = 0
+            start = time.perf_counter()
+            verdicts = classify_headlines(titles, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            assert verdicts == expected, f"verdicts differ for batch_mode={batch_mode} batch_size={batch_size}"
+            print(f"batch_mode={batch_mode:9s} batch_size={batch_size:3d}  "
+                  f"requests={server.request_count:4d}  wall={elapsed:6.2f} s")
+    server.stop()
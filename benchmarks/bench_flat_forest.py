@@ -0,0 +1,43 @@
+# Benchmark the flat NumPy forest against sklearn's predict, single row and batch.
+# to run (from the repository root): python benchmarks/bench_flat_forest.py
+import os
+import sys
+import time
+import numpy as np
+import joblib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+os.chdir(ROOT)
+
+from crop_prediction import HARDCODED_DATA, WEATHER_FEATURES
+from forest_compiler import compile_forest, predict_flat, verify_flat_forest
+from model_registry import MODEL_PATH
+
+ROW_COUNTS = [1, 100, 10_000]
+REPEATS = 50
+
+
+def best_time(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    # The sklearn model itself, not the flat export the registry may serve
+    model = joblib.load(MODEL_PATH)
+    forest = compile_forest(model)
+    base = np.array([HARDCODED_DATA["Sheikhupura"]["Weather"][f] for f in WEATHER_FEATURES])
+    rng = np.random.default_rng(0)
+
+    for n in ROW_COUNTS:
+        inputs = base * rng.uniform(0.8, 1.2, (n, len(WEATHER_FEATURES)))
+        verify_flat_forest(model, forest, inputs)
+        sklearn_time = best_time(lambda: model.predict(inputs))
+        flat_time = best_time(lambda: predict_flat(forest, inputs))
+        print(f"rows={n:6d}  sklearn={sklearn_time * 1000:8.3f} ms  flat={flat_time * 1000:8.3f} ms  "
+              f"speedup={sklearn_time / flat_time:5.1f}x")
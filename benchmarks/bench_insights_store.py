@@ -0,0 +1,102 @@
+# Benchmark the SQLite insights store against reading one JSON file per day, over a year of synthetic insights.
+# to run (from the repository root): python benchmarks/bench_insights_store.py
+import os
+import sys
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+os.chdir(ROOT)
+
+DAYS = 365
+INSIGHTS_PER_DAY = 30
+REPEATS = 20
+WORDS = ("rice exports prices flood paddy monsoon basmati procurement tariff demand supply India Pakistan "
+         "Punjab harvest yield inflation freight UAE Saudi policy subsidy").split()
+# Filler vocabulary, so each topic word appears in a few percent of insights like in real text
+VOCABULARY = WORDS + [f"term{i}" for i in range(5000)]
+
+
+def synthetic_day(rng, date):
+    insights = [
+        {
+            "title": " ".join(rng.choices(VOCABULARY, k=8)),
+            "insight": " ".join(rng.choices(VOCABULARY, k=150)),
+            "url": f"https://example.com/{date}/{i}",
+        }
+        for i in range(INSIGHTS_PER_DAY)
+    ]
+    return {
+        "total_articles": INSIGHTS_PER_DAY * 3,
+        "relevant_articles_count": INSIGHTS_PER_DAY,
+        "insights_count": INSIGHTS_PER_DAY,
+        "tldr_points": [" ".join(rng.choices(VOCABULARY, k=40)) for _ in range(4)],
+        "relevant_insights": insights,
+    }
+
+
+def best_time(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def json_range(directory, start, end):
+    """
+    What a range query costs with one JSON file per day: list the directory and parse every file in range.
+    """
+    results = []
+    for file_name in sorted(os.listdir(directory)):
+        if start <= file_name[:-len(".json")] <= end:
+            with open(os.path.join(directory, file_name), "r") as f:
+                results.append(json.load(f))
+    return results
+
+
+def json_search(directory, term):
+    hits = []
+    for file_name in os.listdir(directory):
+        with open(os.path.join(directory, file_name), "r") as f:
+            hits.extend(item for item in json.load(f)["insights"] if term in item["insight"].lower().split())
+    return hits
+
+
+if __name__ == "__main__":
+    work_dir = tempfile.mkdtemp()
+    json_dir = os.path.join(work_dir, "news_insights")
+    os.makedirs(json_dir)
+    os.environ["INSIGHTS_DB_PATH"] = os.path.join(work_dir, "news_insights.sqlite3")
+    import insights_store
+
+    rng = random.Random(0)
+    first = datetime(2024, 1, 1)
+    for i in range(DAYS):
+        date = (first + timedelta(days=i)).strftime("%Y-%m-%d")
+        day = synthetic_day(rng, date)
+        with open(os.path.join(json_dir, f"{date}.json"), "w") as f:
+            json.dump({"date": date, **{k: v for k, v in day.items() if k not in ("tldr_points", "relevant_insights")},
+                       "tldr": day["tldr_points"], "insights": day["relevant_insights"]}, f)
+    start = time.perf_counter()
+    insights_store.migrate_json_dir(json_dir)
+    print(f"Migrated {DAYS} days x {INSIGHTS_PER_DAY} insights in {time.perf_counter() - start:.2f} s")
+
+    cases = [
+        ("list dates", lambda: sorted(f[:-5] for f in os.listdir(json_dir)), insights_store.list_dates),
+        ("one month, page of 20", lambda: json_range(json_dir, "2024-06-01", "2024-06-30")[:20],
+         lambda: insights_store.get_days("2024-06-01", "2024-06-30", limit=20)),
+        ("search 'basmati'", lambda: json_search(json_dir, "basmati"),
+         lambda: insights_store.search("basmati", limit=20)),
+        ("search 2 terms, one quarter", lambda: json_search(json_dir, "monsoon"),
+         lambda: insights_store.search("monsoon tariff", "2024-04-01", "2024-06-30", limit=20)),
+    ]
+    for name, files, store in cases:
+        files_time, store_time = best_time(files), best_time(store)
+        print(f"{name:28s}  json files={files_time * 1000:9.2f} ms  store={store_time * 1000:7.2f} ms  "
+              f"speedup={files_time / store_time:7.1f}x")
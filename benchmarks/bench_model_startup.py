@@ -0,0 +1,89 @@
+# Benchmark worker cold start and memory: unpickling the model against memory-mapping its flat export.
+# Starts 1, 4 and 16 worker processes at once; each loads the model, scores one row and reports.
+# The page cache is warm after the first run, so this measures per-process cost, not disk reads.
+# to run (from the repository root): python benchmarks/bench_model_startup.py
+import os
+import sys
+import json
+import time
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+os.chdir(ROOT)
+
+WORKER_COUNTS = [1, 4, 16]
+MODES = ["pickle", "flat"]
+
+
+def _memory_kb():
+    """
+    RSS and PSS of this process. PSS splits shared pages between the processes mapping them.
+    """
+    memory = {}
+    with open("/proc/self/smaps_rollup", "r") as f:
+        for line in f:
+            name, value = line.split(":", 1)
+            if name in ("Rss", "Pss"):
+                memory[name.lower()] = int(value.split()[0])
+    return memory
+
+
+def run_worker(mode):
+    start = time.perf_counter()
+    import numpy as np
+    from crop_prediction import HARDCODED_DATA, WEATHER_FEATURES
+    from model_registry import MODEL_PATH
+    from forest_compiler import flat_path_for, load_flat_model, predict_point
+
+    if mode == "flat":
+        model = load_flat_model(flat_path_for(MODEL_PATH))
+    else:
+        import joblib
+        model = joblib.load(MODEL_PATH)
+    row = np.array([[HARDCODED_DATA["Sheikhupura"]["Weather"][f] for f in WEATHER_FEATURES]])
+    predict_point(model, row)
+    ready = time.perf_counter() - start
+
+    # Every worker is ready before memory is read, so shared pages are counted across all of them
+    sys.stdout.write(json.dumps({"ready_seconds": ready}) + "\n")
+    sys.stdout.flush()
+    sys.stdin.readline()
+    sys.stdout.write(json.dumps(_memory_kb()) + "\n")
+    sys.stdout.flush()
+
+
+def run_workers(mode, count):
+    workers = [
+        subprocess.Popen([sys.executable, __file__, "--worker", mode], stdin=subprocess.PIPE,
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(count)
+    ]
+    ready = [json.loads(worker.stdout.readline())["ready_seconds"] for worker in workers]
+    memory = []
+    for worker in workers:
+        worker.stdin.write("\n")
+        worker.stdin.flush()
+        memory.append(json.loads(worker.stdout.readline()))
+        worker.wait()
+    return ready, memory
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--worker":
+        run_worker(sys.argv[2])
+        sys.exit(0)
+
+    from model_registry import MODEL_PATH
+    from forest_compiler import flat_path_for
+
+    if not os.path.isdir(flat_path_for(MODEL_PATH)):
+        sys.exit(f"No flat export at {flat_path_for(MODEL_PATH)}, run python backend/forest_compiler.py first.")
+
+    for count in WORKER_COUNTS:
+        for mode in MODES:
+            ready, memory = run_workers(mode, count)
+            rss = sum(m["rss"] for m in memory) / count / 1024
+            pss = sum(m["pss"] for m in memory) / count / 1024
+            print(f"workers={count:2d}  {mode:6s}  cold start mean={sum(ready) / count * 1000:8.1f} ms  "
+                  f"max={max(ready) * 1000:8.1f} ms  RSS/worker={rss:7.1f} MiB  PSS/worker={pss:7.1f} MiB")
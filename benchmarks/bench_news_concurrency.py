@@ -0,0 +1,51 @@
+# Benchmark process_articles wall time against LLM concurrency using the fake OpenAI server.
+# to run (from the repository root): python benchmarks/bench_news_concurrency.py
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.dirname(__file__))
+os.chdir(ROOT)
+
+from fake_openai_server import FakeOpenAIServer
+
+LATENCY = 0.2
+ARTICLE_COUNT = 100
+CONCURRENCY_LEVELS = [1, 4, 8, 16, 32]
+
+
+def make_articles(n, tag=""):
+    return [
+        {
+            "title": f"{tag} Story {i}: " + ("rice exports climb" if i % 2 == 0 else "stock markets rally"),
+            "url": f"https://example.com/{i}",
+            "content": f"{tag} Body of story {i}.",
+        }
+        for i in range(n)
+    ]
+
+
+if __name__ == "__main__":
+    server = FakeOpenAIServer(latency=LATENCY, rate_limit_ratio=0.02).start()
+    # The OpenAI client reads its base URL when llm_client is imported
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    # A scratch LLM cache, so the real one is untouched
+    os.environ["LLM_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "llm_cache.sqlite3")
+    os.environ["RELEVANCE_FILTER_ENABLED"] = "0"
+    from trend_analysis import process_articles
+
+    baseline = None
+    for concurrency in CONCURRENCY_LEVELS:
+        # New articles every run, so no level is answered from the previous level's cache
+        articles = make_articles(ARTICLE_COUNT, tag=f"[concurrency {concurrency}]")
+        server.request_count = 0
+        start = time.perf_counter()
+        result = process_articles(articles, concurrency=concurrency)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"concurrency={concurrency:3d}  wall={elapsed:7.2f} s  speedup={baseline / elapsed:5.1f}x  "
+              f"requests={server.request_count}  insights={result['insights_count']}")
+    server.stop()
@@ -0,0 +1,56 @@
+# Benchmark NewsAPI fetching against a stub server: sequential against concurrent paging,
+# with injected 429/503 errors, then cached and revalidated re-runs.
+# to run (from the repository root): python benchmarks/bench_news_fetch.py
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.dirname(__file__))
+os.chdir(ROOT)
+
+from fake_newsapi_server import FakeNewsAPIServer
+
+ARTICLES_PER_DAY = 1000  # 10 pages of 100
+OLD_DATE = datetime(2024, 11, 1)
+CONCURRENCY_LEVELS = [1, 4, 8]
+
+
+if __name__ == "__main__":
+    server = FakeNewsAPIServer(latency=0.2, articles_per_day=ARTICLES_PER_DAY, error_ratio=0.1).start()
+    os.environ["NEWS_API_URL"] = server.url
+    os.environ["NEWS_CACHE_DIR"] = tempfile.mkdtemp()
+
+    import news_client
+    from trend_analysis import fetch_news
+
+    for concurrency in CONCURRENCY_LEVELS:
+        news_client.NEWS_FETCH_CONCURRENCY = concurrency
+        server.request_count = server.error_count = 0
+        start = time.perf_counter()
+        articles = fetch_news(OLD_DATE, use_cache=False)
+        elapsed = time.perf_counter() - start
+        assert len(articles) == ARTICLES_PER_DAY, f"fetched {len(articles)} of {ARTICLES_PER_DAY} articles"
+        print(f"concurrency={concurrency}  articles={len(articles)}  requests={server.request_count}  "
+              f"retried errors={server.error_count}  wall={elapsed:6.2f} s")
+
+    # First cached run fills the cache, the second is served from disk
+    server.error_ratio = 0.0
+    for label in ["cold cache", "warm cache"]:
+        server.request_count = 0
+        start = time.perf_counter()
+        fetch_news(OLD_DATE)
+        print(f"{label:12s}  requests={server.request_count}  wall={(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    # Recent dates are revalidated once their entry expires, an unchanged page 1 answers 304
+    news_client.NEWS_CACHE_RECENT_TTL_SECONDS = 0
+    fetch_news(datetime.now())
+    server.request_count = 0
+    start = time.perf_counter()
+    fetch_news(datetime.now())
+    print(f"{'revalidated':12s}  requests={server.request_count}  not modified={server.not_modified_count}  "
+          f"wall={(time.perf_counter() - start) * 1000:8.1f} ms")
+    server.stop()
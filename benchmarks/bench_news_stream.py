@@ -0,0 +1,60 @@
+# Benchmark how soon news processing shows something when its events are streamed rather than
+# only available once the job is done, using stub NewsAPI and OpenAI servers.
+# to run (from the repository root): python benchmarks/bench_news_stream.py
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.dirname(__file__))
+os.chdir(ROOT)
+
+from fake_newsapi_server import FakeNewsAPIServer
+from fake_openai_server import FakeOpenAIServer
+
+DATE = datetime(2024, 11, 1)
+MILESTONES = ["verdict", "insight", "tldr_token", "done"]
+
+
+if __name__ == "__main__":
+    work_dir = tempfile.mkdtemp()
+    news_server = FakeNewsAPIServer(latency=0.2, articles_per_day=40).start()
+    llm_server = FakeOpenAIServer(latency=0.3, token_delay=0.02).start()
+    # Point the pipeline at the stubs before it is imported
+    os.environ["NEWS_API_URL"] = news_server.url
+    os.environ["OPENAI_BASE_URL"] = llm_server.base_url
+    os.environ["LLM_CACHE_PATH"] = os.path.join(work_dir, "llm_cache.sqlite3")
+    os.environ["INSIGHTS_DB_PATH"] = os.path.join(work_dir, "news_insights.sqlite3")
+    os.environ["NEWS_CACHE_DIR"] = os.path.join(work_dir, "news_cache")
+    os.environ["JOB_STATE_DIR"] = os.path.join(work_dir, "jobs")
+
+    import jobs
+    import trend_analysis
+    from trend_analysis import run_news_pipeline
+
+    trend_analysis.execution_log_file = os.path.join(work_dir, "last_execution.json")
+
+    start = time.perf_counter()
+    job, _ = jobs.submit(f"news:{DATE:%Y-%m-%d}", run_news_pipeline, DATE)
+    first_seen, counts = {}, {}
+    for _, event in jobs.iter_events(job["id"]):
+        first_seen.setdefault(event["type"], time.perf_counter() - start)
+        counts[event["type"]] = counts.get(event["type"], 0) + 1
+
+    if "failed" in first_seen:
+        print(f"Job failed: {jobs.get_job(job['id'])['error']}")
+    # Polling shows results only once the job is done
+    done = first_seen.get("done")
+    for milestone in MILESTONES:
+        seen = first_seen.get(milestone)
+        if seen is None:
+            print(f"{milestone:12s}  never")
+            continue
+        print(f"{milestone:12s}  first after {seen:6.2f} s  events={counts[milestone]:4d}"
+              + (f"  {done / seen:5.1f}x sooner than polling" if done and milestone != "done" else ""))
+
+    news_server.stop()
+    llm_server.stop()
@@ -0,0 +1,41 @@
+# Benchmark p50/p99 latency of POST /district/<name>/predict
+# with a cold model load per request (old behaviour) and with the warm model registry.
+# to run (from the repository root): python benchmarks/bench_predict_latency.py
+import os
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+os.chdir(ROOT)
+
+from flask import Flask
+from api import register_routes
+import model_registry
+
+REQUESTS = 200
+DISTRICT = "Sheikhupura"
+
+
+def measure(client, cold):
+    latencies = []
+    for _ in range(REQUESTS):
+        if cold:
+            # Forget the model so every request unpickles it, like the old predict_yield did
+            model_registry.clear_models()
+        start = time.perf_counter()
+        response = client.post(f"/district/{DISTRICT}/predict")
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+if __name__ == "__main__":
+    app = Flask(__name__)
+    register_routes(app)
+    client = app.test_client()
+
+    for label, cold in (("before (load per request)", True), ("after (model registry)", False)):
+        p50, p99 = measure(client, cold)
+        print(f"{label:28s} p50={p50:8.2f} ms  p99={p99:8.2f} ms")
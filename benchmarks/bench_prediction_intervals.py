@@ -0,0 +1,43 @@
+# Benchmark prediction intervals from per-tree outputs against plain model.predict.
+# to run (from the repository root): python benchmarks/bench_prediction_intervals.py
+import os
+import sys
+import time
+import numpy as np
+import joblib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+os.chdir(ROOT)
+
+from crop_prediction import HARDCODED_DATA, WEATHER_FEATURES
+from forest_uncertainty import predict_with_intervals
+from model_registry import MODEL_PATH
+
+ROW_COUNTS = [1, 100, 10_000]
+REPEATS = 20
+
+
+def best_time(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    # The sklearn model itself, not the flat export the registry may serve
+    model = joblib.load(MODEL_PATH)
+    base = np.array([HARDCODED_DATA["Sheikhupura"]["Weather"][f] for f in WEATHER_FEATURES])
+    rng = np.random.default_rng(0)
+    # Build the cached leaf value matrix before timing
+    predict_with_intervals(model, base[None, :])
+
+    for n in ROW_COUNTS:
+        inputs = base * rng.uniform(0.9, 1.1, (n, len(WEATHER_FEATURES)))
+        plain = best_time(lambda: model.predict(inputs))
+        intervals = best_time(lambda: predict_with_intervals(model, inputs))
+        print(f"rows={n:6d}  predict={plain * 1000:8.2f} ms  with intervals={intervals * 1000:8.2f} ms  "
+              f"ratio={intervals / plain:4.2f}x")
@@ -0,0 +1,29 @@
+# Benchmark the what-if scenario engine on grid sweeps up to 1M scenarios.
+# to run (from the repository root): python benchmarks/bench_scenarios.py
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+os.chdir(ROOT)
+
+from scenarios import run_scenarios
+
+GRID_STEPS = [10, 100, 1000]
+
+
+if __name__ == "__main__":
+    for steps in GRID_STEPS:
+        body = {
+            "mode": "grid",
+            "parameters": {
+                "Growth_Rainfall": {"start": 150, "stop": 350, "steps": steps},
+                "Harvest_Temperature": {"start": 18, "stop": 30, "steps": steps},
+            },
+        }
+        start = time.perf_counter()
+        result = run_scenarios("Sheikhupura", body)
+        elapsed = time.perf_counter() - start
+        print(f"scenarios={result['scenario_count']:9d}  wall={elapsed:7.2f} s  "
+              f"production p50={result['Predicted_Production']['percentiles']['p50']}")
@@ -0,0 +1,97 @@
+# Local NewsAPI /v2/everything stub for benchmarks.
+# Returns `articles_per_day` articles for the requested date after an injected delay.
+# A share of requests fail with 429 or 503 when `error_ratio` is set, and responses carry
+# an ETag so conditional requests get 304 Not Modified.
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeNewsAPIServer:
+    def __init__(self, latency=0.1, articles_per_day=20, error_ratio=0.0, port=0):
+        self.latency = latency
+        self.articles_per_day = articles_per_day
+        self.error_ratio = error_ratio
+        self.error_count = 0
+        self.not_modified_count = 0
+        # Changing the tag changes every article, so runs do not hit the LLM cache
+        self.run_tag = ""
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v2/everything"
+
+    def articles_for(self, date):
+        return [
+            {
+                "source": {"id": "reuters", "name": "Reuters"},
+                "title": f"{self.run_tag} {date} story {i}: " + ("rice exports rise" if i % 2 == 0 else "markets close higher"),
+                "url": f"https://example.com/{date}/{i}",
+                "content": f"Body of {self.run_tag} story {i} published on {date}.",
+                "publishedAt": f"{date}T12:00:00Z",
+            }
+            for i in range(self.articles_per_day)
+        ]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                params = parse_qs(urlparse(self.path).query)
+                with server._lock:
+                    server.request_count += 1
+                time.sleep(server.latency)
+
+                if random.random() < server.error_ratio:
+                    with server._lock:
+                        server.error_count += 1
+                    self.send_response(random.choice([429, 503]))
+                    self.send_header("Retry-After", "0.05")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                articles = server.articles_for(params.get("from", [""])[0])
+                page_size = int(params.get("pageSize", ["100"])[0])
+                page = int(params.get("page", ["1"])[0])
+                body = json.dumps({
+                    "status": "ok",
+                    "totalResults": len(articles),
+                    "articles": articles[(page - 1) * page_size:page * page_size],
+                }).encode("utf-8")
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,144 @@
+# Local OpenAI-compatible chat completions server for benchmarks.
+# Answers the news pipeline's prompts after an injected delay and can inject 429s.
+# Streaming requests get one chunk per word, token_delay apart.
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _verdict(headline):
+    return "Relevant" if "rice" in headline.lower() else "Irrelevant"
+
+
+def fake_batch_answer(user_prompt, batch_mode):
+    """
+    Answer a batched relevance prompt.
+    batch_mode "partial" drops every other verdict and "malformed" returns invalid JSON.
+    """
+    if batch_mode == "malformed":
+        return "Sure! Here are the verdicts: [{\"id\": 1, \"verdict\": "
+    lines = user_prompt.split("Headlines:\n", 1)[1].split("\n")
+    entries = []
+    for line in lines:
+        number, headline = line.split(". ", 1)
+        entries.append({"id": int(number), "verdict": _verdict(headline)})
+    if batch_mode == "partial":
+        entries = entries[::2]
+    return json.dumps(entries)
+
+
+def fake_answer(user_prompt, batch_mode="ok"):
+    """
+    Deterministic answer for one of the news pipeline's prompts.
+    Headlines mentioning rice are relevant.
+    """
+    if "Respond only with a JSON array" in user_prompt:
+        return fake_batch_answer(user_prompt, batch_mode)
+    if "Respond with 'Relevant' or 'Irrelevant'" in user_prompt:
+        headline = user_prompt.rsplit("Headline:", 1)[-1]
+        return _verdict(headline)
+    if user_prompt.startswith("Combine the following insights"):
+        return "- Rice supply is stable.\n- Prices are expected to rise."
+    return "Insight: " + user_prompt[-80:].replace("\n", " ")
+
+
+class FakeOpenAIServer:
+    def __init__(self, latency=0.05, rate_limit_ratio=0.0, batch_mode="ok", port=0, token_delay=0.0):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.rate_limit_ratio = rate_limit_ratio
+        self.batch_mode = batch_mode
+        self.request_count = 0
+        # Most requests being answered at once
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, model, answer):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                # Keep the whitespace with the words, so the pieces join back into the answer
+                for piece in re.findall(r"\s*\S+", answer):
+                    time.sleep(server.token_delay)
+                    chunk = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server._lock:
+                    server.request_count += 1
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                time.sleep(server.latency)
+                # Counted out before answering, so the client's next request cannot overlap this one
+                with server._lock:
+                    server.in_flight -= 1
+
+                if random.random() < server.rate_limit_ratio:
+                    self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                                    {"Retry-After": "0.1"})
+                    return
+
+                user_prompt = request["messages"][-1]["content"]
+                answer = fake_answer(user_prompt, server.batch_mode)
+                if request.get("stream"):
+                    self._send_stream(request["model"], answer)
+                    return
+                self._send_json(200, {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request["model"],
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": answer},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,95 @@
+# Load test a running backend: throughput and latency at increasing concurrency.
+# to run (from the repository root), with the backend started, e.g. ./run_backend.sh prod:
+#   python benchmarks/load_test.py [--url http://127.0.0.1:5000] [--duration 10] [--district Sheikhupura]
+import argparse
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+CONCURRENCY_LEVELS = [1, 4, 16, 64]
+
+
+def endpoints(district):
+    name = quote(district)
+    return {
+        "districts": ("GET", "/districts"),
+        "historical": ("GET", f"/district/{name}/historical"),
+        "map": ("GET", f"/district/{name}/map?zoom=8"),
+        "predict": ("POST", f"/district/{name}/predict"),
+    }
+
+
+def wait_until_ready(host, port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=5)
+            connection.request("GET", "/health/ready")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(1)
+    raise SystemExit(f"Backend at {host}:{port} did not become ready within {timeout}s")
+
+
+def run_level(host, port, method, path, concurrency, duration):
+    """
+    Send requests from `concurrency` threads for `duration` seconds, each thread on its own keep-alive connection.
+    Returns (sorted latencies, error count).
+    """
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client():
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        local_latencies, local_errors = [], 0
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, headers={"Accept-Encoding": "gzip"})
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+                continue
+            local_latencies.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(client)
+    return sorted(latencies), errors[0]
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q / 100))] if values else float("nan")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the backend API.")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per endpoint and concurrency level")
+    parser.add_argument("--district", default="Sheikhupura")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=CONCURRENCY_LEVELS)
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    wait_until_ready(host, port)
+
+    for name, (method, path) in endpoints(args.district).items():
+        for concurrency in args.concurrency:
+            latencies, errors = run_level(host, port, method, path, concurrency, args.duration)
+            print(f"{name:10s}  concurrency={concurrency:3d}  throughput={len(latencies) / args.duration:8.1f} req/s  "
+                  f"p50={percentile(latencies, 50) * 1000:7.1f} ms  p95={percentile(latencies, 95) * 1000:7.1f} ms  "
+                  f"p99={percentile(latencies, 99) * 1000:7.1f} ms  errors={errors}")
@@ -5,9 +5,71 @@ import folium
 from streamlit_folium import st_folium
 import pandas as pd
 import altair as alt
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 # Backend API URL
 API_URL = "http://127.0.0.1:5000"
+# Initial map zoom, also used to request geometries simplified for that zoom
+MAP_ZOOM = 6
+# Seconds backend responses are reused across reruns. Boundaries rarely change,
+# historical data changes when seasons are ingested, predictions when the model is retrained.
+GEO_CACHE_TTL = 24 * 60 * 60
+HISTORICAL_CACHE_TTL = 10 * 60
+PREDICTION_CACHE_TTL = 5 * 60
+# Backend calls in flight at once
+FETCH_WORKERS = 4
+EMPTY_GEOJSON = {"type": "FeatureCollection", "features": []}
+
+
+@st.cache_resource
+def get_session():
+    """
+    One keep-alive session shared by every rerun and fetch thread.
+    """
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS))
+    return session
+
+
+@st.cache_resource
+def get_executor():
+    return ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+
+
+def fetch_json(method, path, params=None):
+    """
+    Call the backend and return the decoded body. Errors raise, so they are never cached.
+    """
+    response = get_session().request(method, f"{API_URL}{path}", params=params, timeout=30)
+    response.raise_for_status()
+    return response.json()
+
+
+# The fetchers run in worker threads, where a spinner has no page to show on
+@st.cache_data(ttl=GEO_CACHE_TTL, show_spinner=False)
+def fetch_districts():
+    return fetch_json("GET", "/districts")["districts"]
+
+
+@st.cache_data(ttl=GEO_CACHE_TTL, show_spinner=False)
+def fetch_all_districts(zoom):
+    return fetch_json("GET", "/all-districts", {"zoom": zoom})
+
+
+@st.cache_data(ttl=GEO_CACHE_TTL, show_spinner=False)
+def fetch_district_map(district, zoom):
+    return fetch_json("GET", f"/district/{district}/map", {"zoom": zoom})
+
+
+@st.cache_data(ttl=HISTORICAL_CACHE_TTL, show_spinner=False)
+def fetch_historical(district):
+    return fetch_json("GET", f"/district/{district}/historical")["Historical_Data"]
+
+
+@st.cache_data(ttl=PREDICTION_CACHE_TTL, show_spinner=False)
+def fetch_prediction(district):
+    return fetch_json("POST", f"/district/{district}/predict")
 
 def display_supply_section():
     """
@@ -16,31 +78,37 @@ def display_supply_section():
 
     # st.markdown("### Select a district to view its rice-producing map, historical data, and predictions.")
 
+    # Independent calls run concurrently; each is answered from the cache while fresh
+    executor = get_executor()
+    all_districts_future = executor.submit(fetch_all_districts, MAP_ZOOM)
+
     # Sidebar: Fetch Districts
     st.sidebar.title("Select District")
     try:
-        response = requests.get(f"{API_URL}/districts")
-        if response.status_code == 200:
-            districts = response.json()["districts"]
-            selected_district = st.sidebar.selectbox("Districts", sorted(districts))
-        else:
-            st.sidebar.error("Failed to load districts")
-            selected_district = None
+        districts = fetch_districts()
+        selected_district = st.sidebar.selectbox("Districts", sorted(districts))
+    except requests.exceptions.HTTPError:
+        st.sidebar.error("Failed to load districts")
+        selected_district = None
     except requests.exceptions.RequestException:
         st.sidebar.error("Backend not reachable")
         selected_district = None
 
+    # Only the selected district's data changes when another district is picked
+    if selected_district:
+        historical_future = executor.submit(fetch_historical, selected_district)
+        map_future = executor.submit(fetch_district_map, selected_district, MAP_ZOOM)
+        prediction_future = executor.submit(fetch_prediction, selected_district)
+
     # Fetch All Districts GeoJSON from Backend
     try:
-        response = requests.get(f"{API_URL}/all-districts")
-        if response.status_code == 200:
-            all_districts_geojson = response.json()
-        else:
-            st.error("Failed to load all-districts GeoJSON.")
-            all_districts_geojson = {"type": "FeatureCollection", "features": []}
+        all_districts_geojson = all_districts_future.result()
+    except requests.exceptions.HTTPError:
+        st.error("Failed to load all-districts GeoJSON.")
+        all_districts_geojson = EMPTY_GEOJSON
     except requests.exceptions.RequestException:
         st.error("Backend not reachable for all-districts GeoJSON.")
-        all_districts_geojson = {"type": "FeatureCollection", "features": []}
+        all_districts_geojson = EMPTY_GEOJSON
 
     # Display Map, Historical Data, and Predictions for Selected District
     if selected_district:
@@ -49,78 +117,63 @@ def display_supply_section():
         # Fetch and Display Historical Data
         st.markdown("#### Historical Trends")
         try:
-            response = requests.get(f"{API_URL}/district/{selected_district}/historical")
-            if response.status_code == 200:
-                historical_data = response.json()["Historical_Data"]
-
-                # Scale the data to '000 hectares' and '000 tonnes'
-                scaled_area = [x for x in historical_data["Area"]]
-                scaled_production = [x for x in historical_data["Production"]]
-
-                # # Create a DataFrame for the chart
-                # chart_data = pd.DataFrame({
-                #     "Year": historical_data["Years"],
-                #     "Area ('000 hectares)": scaled_area,
-                #     "Production ('000 tonnes')": scaled_production,
-                # }).set_index("Year")
-
-                # # Plot the chart
-                # st.line_chart(chart_data)
-                # Create a DataFrame for the chart
-                chart_data = pd.DataFrame({
-                    "Year": historical_data["Years"],
-                    "Area ('000 hectares)": scaled_area,
-                    "Production ('000 tonnes')": scaled_production,
-                }).melt("Year", var_name="Metric", value_name="Value")
-
-                # Create the Altair chart
-                chart = alt.Chart(chart_data).mark_line().encode(
-                    x=alt.X("Year:O", title="Year"),  # Specify ordinal type to avoid formatting issues
-                    y=alt.Y("Value:Q", title="Value ('000 hectares/tonnes')"),
-                    color="Metric:N"  # Different lines for Area and Production
-                ).properties(
-                    title="Historical Trends of Area and Production"
-                )
-
-                # Display the chart
-                st.altair_chart(chart, use_container_width=True)
-            else:
-                st.error(f"Failed to load historical data for {selected_district}")
+            historical_data = historical_future.result()
+
+            # Scale the data to '000 hectares' and '000 tonnes'
+            scaled_area = [x for x in historical_data["Area"]]
+            scaled_production = [x for x in historical_data["Production"]]
+
+            # # Create a DataFrame for the chart
+            # chart_data = pd.DataFrame({
+            #     "Year": historical_data["Years"],
+            #     "Area ('000 hectares)": scaled_area,
+            #     "Production ('000 tonnes')": scaled_production,
+            # }).set_index("Year")
+
+            # # Plot the chart
+            # st.line_chart(chart_data)
+            # Create a DataFrame for the chart
+            chart_data = pd.DataFrame({
+                "Year": historical_data["Years"],
+                "Area ('000 hectares)": scaled_area,
+                "Production ('000 tonnes')": scaled_production,
+            }).melt("Year", var_name="Metric", value_name="Value")
+
+            # Create the Altair chart
+            chart = alt.Chart(chart_data).mark_line().encode(
+                x=alt.X("Year:O", title="Year"),  # Specify ordinal type to avoid formatting issues
+                y=alt.Y("Value:Q", title="Value ('000 hectares/tonnes')"),
+                color="Metric:N"  # Different lines for Area and Production
+            ).properties(
+                title="Historical Trends of Area and Production"
+            )
+
+            # Display the chart
+            st.altair_chart(chart, use_container_width=True)
+        except requests.exceptions.HTTPError:
+            st.error(f"Failed to load historical data for {selected_district}")
         except requests.exceptions.RequestException:
             st.error("Backend not reachable for historical data.")
 
         # Fetch and Display District Map
         st.markdown("#### Rice-production Map")
         try:
-            response = requests.get(f"{API_URL}/district/{selected_district}/map")
-            if response.status_code == 200:
-                district_geojson = response.json()
-            else:
-                st.error(f"Failed to load map data for {selected_district}")
-                district_geojson = {"type": "FeatureCollection", "features": []}
+            district_geojson = map_future.result()
+        except requests.exceptions.HTTPError:
+            st.error(f"Failed to load map data for {selected_district}")
+            district_geojson = EMPTY_GEOJSON
         except requests.exceptions.RequestException:
             st.error("Backend not reachable for map data.")
-            district_geojson = {"type": "FeatureCollection", "features": []}
+            district_geojson = EMPTY_GEOJSON
 
         # Validate the district GeoJSON
         if not district_geojson["features"]:
             st.error("No features found for the selected district. Check the GeoJSON.")
         else:
             # Create the map
-            m = folium.Map(location=[30.3753, 69.3451], zoom_start=6)
-
-            # Add all districts layer
-            folium.GeoJson(
-                all_districts_geojson,
-                style_function=lambda feature: {
-                    "fillColor": "gray",
-                    "color": "black",
-                    "weight": 0.5,
-                    "fillOpacity": 0.3,
-                },
-            ).add_to(m)
+            m = folium.Map(location=[30.3753, 69.3451], zoom_start=MAP_ZOOM)
 
-            # Highlight selected district
+            # All districts in gray with the selected district highlighted
             folium.GeoJson(
                 all_districts_geojson,
                 style_function=lambda feature: {
@@ -147,14 +200,12 @@ def display_supply_section():
         # Fetch and Display Predictions
         st.markdown("#### Predictions for the Current Year")
         try:
-            response = requests.post(f"{API_URL}/district/{selected_district}/predict")
-            if response.status_code == 200:
-                prediction = response.json()
-                st.write(f"**Expected Area:** {prediction['Inputs']['Area']} (000 hectares)")
-                st.write(f"**Expected Yield:** {round(prediction['Predicted_Yield'], 2)} kg/hectare")
-                st.write(f"**Expected Production:** {prediction['Predicted_Production']} (000 tonnes)")
-                st.markdown("*Calculated in September 2024*")
-            else:
-                st.error(f"Failed to load predictions for {selected_district}")
+            prediction = prediction_future.result()
+            st.write(f"**Expected Area:** {prediction['Inputs']['Area']} (000 hectares)")
+            st.write(f"**Expected Yield:** {round(prediction['Predicted_Yield'], 2)} kg/hectare")
+            st.write(f"**Expected Production:** {prediction['Predicted_Production']} (000 tonnes)")
+            st.markdown("*Calculated in September 2024*")
+        except requests.exceptions.HTTPError:
+            st.error(f"Failed to load predictions for {selected_district}")
         except requests.exceptions.RequestException:
             st.error("Backend not reachable for predictions.")
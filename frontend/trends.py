@@ -1,10 +1,101 @@
 # trends.py
 import streamlit as st
 import requests
+import json
+import time
 from datetime import datetime
 
 # Backend API URL
 API_URL = "http://127.0.0.1:5000"
+# Connect and between-event timeouts; the backend sends a keep-alive every 15 seconds
+STREAM_READ_TIMEOUT = (5, 60)
+# Seconds to wait before reopening a stream the backend closed
+STREAM_RECONNECT_DELAY = 1
+
+
+def iter_sse(response):
+    """
+    Yield (event id, event type, data) for every server-sent event of a streamed response.
+    """
+    event_id, event_type, data = None, "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "id":
+                event_id = value
+            elif field == "event":
+                event_type = value
+            elif field == "data":
+                data.append(value)
+        elif data:
+            yield event_id, event_type, json.loads("\n".join(data))
+            event_id, event_type, data = None, "message", []
+
+
+def stream_news_processing(date):
+    """
+    Run news processing for a date, rendering verdicts, insights and the TL;DR as they arrive.
+    Returns the final job event, or None if the stream ended without one.
+    """
+    status_placeholder = st.empty()
+    st.markdown("### TL;DR")
+    tldr_placeholder = st.empty()
+    st.markdown("### Article Summaries")
+    verdicts = {"Relevant": 0, "Irrelevant": 0}
+    progress, tldr = {}, ""
+
+    response = requests.post(f"{API_URL}/news/stream", params={"date": str(date)}, stream=True,
+                             timeout=STREAM_READ_TIMEOUT)
+    if response.status_code != 200:
+        st.error(response.json().get("error", "Failed to trigger the news insights processing."))
+        return None
+    job_id, last_event_id = None, None
+    while True:
+        # The job as of this connection, and whether the connection replayed any of its events
+        snapshot, replayed = None, False
+        with response:
+            for event_id, event_type, event in iter_sse(response):
+                last_event_id = event_id or last_event_id
+                replayed = replayed or event_type != "job"
+                if event_type == "job":
+                    job_id, snapshot = event["id"], event
+                    progress.update(event.get("progress", {}))
+                elif event_type == "progress":
+                    progress.update(event)
+                elif event_type == "verdict":
+                    verdicts[event["relevancy"]] = verdicts.get(event["relevancy"], 0) + 1
+                elif event_type == "insight":
+                    st.markdown(f"#### {event['title']}")
+                    st.write(event["insight"])
+                    st.write(f"[Source]({event['url']})")
+                elif event_type == "tldr_token":
+                    tldr += event["text"]
+                    tldr_placeholder.markdown(tldr)
+                elif event_type in ("done", "failed"):
+                    status_placeholder.empty()
+                    return event
+                status_placeholder.info(
+                    f"Fetched: {progress.get('articles_fetched', '-')} | "
+                    f"Unique: {progress.get('unique_stories', '-')} | "
+                    f"Relevant: {verdicts['Relevant']} | "
+                    f"Irrelevant: {verdicts['Irrelevant']} | "
+                    f"Insights: {progress.get('insights_extracted', 0)}"
+                )
+        # A finished job's replay ends with its done or failed event. Only a backend process
+        # without the job's events sends nothing after the snapshot, then the snapshot is all there is.
+        if snapshot and snapshot["status"] in ("done", "failed") and not replayed:
+            status_placeholder.empty()
+            return {"type": snapshot["status"], "error": snapshot["error"]}
+        if job_id is None:
+            return None
+        # The backend closes streams after a while, continue after the last event seen
+        time.sleep(STREAM_RECONNECT_DELAY)
+        response = requests.get(f"{API_URL}/jobs/{job_id}/events", stream=True, timeout=STREAM_READ_TIMEOUT,
+                                headers={"Last-Event-ID": last_event_id} if last_event_id else {})
+        if response.status_code != 200:
+            return None
+
 
 def display_trends_section():
     """
@@ -28,11 +119,13 @@ def display_trends_section():
     date = st.date_input("Select a date for processing news insights", datetime.now().date())
     if st.button("Run News Insights Processing"):
         try:
-            response = requests.post(f"{API_URL}/news/trigger?date={date}")
-            if response.status_code == 200:
-                st.success(f"News insights processing triggered successfully for {date}.")
+            result = stream_news_processing(date)
+            if result is None:
+                st.error("News insights processing stream ended early, check the job status later.")
+            elif result["type"] == "done":
+                st.success(f"News insights processing completed for {date}.")
             else:
-                st.error(response.json().get("error", "Failed to trigger the news insights processing."))
+                st.error(f"News insights processing failed: {result['error']}")
         except requests.exceptions.RequestException:
             st.error("Backend not reachable for triggering news insights.")
 
@@ -68,6 +161,11 @@ def display_trends_section():
                             st.markdown(f"#### {insight['title']}")
                             st.write(insight["insight"])
                             st.write(f"[Source]({insight['url']})")
+                            duplicate_urls = insight.get("duplicate_urls", [])
+                            if duplicate_urls:
+                                st.caption("Also reported at: " + ", ".join(
+                                    f"[{i + 1}]({url})" for i, url in enumerate(duplicate_urls)
+                                ))
                     else:
                         st.info("No insights available for the selected date.")
                 else:
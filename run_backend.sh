@@ -1,7 +1,14 @@
 #!/bin/bash
+# Usage: ./run_backend.sh [dev|prod]
+# prod runs gunicorn, configured with WEB_WORKERS, WEB_THREADS and BIND
 
 # Activate virtual environment
 source venv/bin/activate
 
-# Run Flask backend
-python backend/app.py
+if [ "${1:-dev}" = "prod" ]; then
+    # Run the production server
+    exec gunicorn -c backend/gunicorn.conf.py wsgi:app
+else
+    # Run Flask backend
+    python backend/app.py
+fi
@@ -0,0 +1,81 @@
+# to run (from the repository root): python -m pytest tests
+import json
+import os
+import sys
+import tempfile
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+os.chdir(ROOT)
+
+# Stores and caches live in a scratch directory, set before any backend module reads them
+SCRATCH_DIR = tempfile.mkdtemp(prefix="rice-tests-")
+for variable, name in [
+    ("LLM_CACHE_PATH", "llm_cache.sqlite3"),
+    ("INSIGHTS_DB_PATH", "news_insights.sqlite3"),
+    ("NEWS_CACHE_DIR", "news_cache"),
+    ("JOB_STATE_DIR", "jobs"),
+    ("RELEVANCE_FILTER_PATH", "relevance_filter.pkl"),
+]:
+    os.environ[variable] = os.path.join(SCRATCH_DIR, name)
+
+# A few grid cells stand in for the large grid asset, so the API imports without it
+GRID_CELLS = [("Sheikhupura", 74.0, 31.7), ("Sheikhupura", 74.01, 31.7), ("Bahawalnagar", 73.2, 30.0)]
+os.environ["GRID_GEOJSON_PATH"] = os.path.join(SCRATCH_DIR, "grid.geojson")
+with open(os.environ["GRID_GEOJSON_PATH"], "w") as f:
+    json.dump({"type": "FeatureCollection", "features": [
+        {
+            "type": "Feature",
+            "properties": {"district": district},
+            "geometry": {"type": "Polygon", "coordinates": [[
+                [lon, lat], [lon + 0.01, lat], [lon + 0.01, lat + 0.01], [lon, lat + 0.01], [lon, lat],
+            ]]},
+        }
+        for district, lon, lat in GRID_CELLS
+    ]}, f)
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """
+    A running FakeOpenAIServer that llm_client talks to.
+    """
+    pytest.importorskip("openai")
+    import llm_client
+    from fake_openai_server import FakeOpenAIServer
+
+    server = FakeOpenAIServer(latency=0.0).start()
+    monkeypatch.setattr(llm_client, "client",
+                        llm_client.OpenAI(api_key="test", base_url=server.base_url, max_retries=0))
+    monkeypatch.setattr(llm_client, "LLM_BACKOFF_SECONDS", 0.01)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_newsapi(monkeypatch, tmp_path):
+    """
+    A running FakeNewsAPIServer that news_client fetches from, with an empty response cache.
+    """
+    pytest.importorskip("requests")
+    import news_client
+    from fake_newsapi_server import FakeNewsAPIServer
+
+    server = FakeNewsAPIServer(latency=0.0).start()
+    monkeypatch.setattr(news_client, "NEWS_API_URL", server.url)
+    monkeypatch.setattr(news_client, "NEWS_CACHE_DIR", str(tmp_path / "news_cache"))
+    monkeypatch.setattr(news_client, "NEWS_BACKOFF_SECONDS", 0.01)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client():
+    """
+    A Flask test client for the backend app, served from the synthetic grid.
+    """
+    pytest.importorskip("flask")
+    from app import app
+    return app.test_client()
@@ -0,0 +1,34 @@
+import pytest
+
+
+@pytest.mark.parametrize("path", ["/predict/batch", "/historical/ingest"])
+@pytest.mark.parametrize("body", [[1], "text", 5])
+def test_non_object_bodies_are_rejected(client, path, body):
+    response = client.post(path, json=body)
+
+    assert response.status_code == 400
+    assert "JSON object" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("workers", ["-1", "0", "many"])
+def test_backfill_rejects_invalid_worker_counts(client, workers):
+    response = client.post(f"/news/backfill?start=2024-11-01&end=2024-11-02&workers={workers}")
+
+    assert response.status_code == 400
+
+
+def test_backfill_caps_worker_count(client, monkeypatch):
+    import jobs
+    from backfill import MAX_BACKFILL_WORKERS
+    submitted = []
+
+    def fake_submit(key, fn, *args):
+        submitted.append(args)
+        return {"id": "1", "status": "queued"}, True
+
+    monkeypatch.setattr(jobs, "submit", fake_submit)
+
+    response = client.post("/news/backfill?start=2024-11-01&end=2024-11-02&workers=100000")
+
+    assert response.status_code == 202
+    assert submitted[0][-1] == MAX_BACKFILL_WORKERS
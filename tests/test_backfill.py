@@ -0,0 +1,59 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("requests")
+import backfill
+from news_dedup import DEDUP_WINDOW_DAYS
+
+START = datetime(2023, 3, 1)
+STORY = {"title": "Punjab rice exports rise", "content": "Rice exports from Punjab rose sharply this month on demand."}
+
+
+@pytest.fixture
+def recorded_runs(monkeypatch):
+    """
+    Stub the fetch and the LLM pipeline, recording the clusters each date is processed with.
+    The same story is published every day, each time under a new URL.
+    """
+    lock = threading.Lock()
+    runs = {"clusters": {}, "running": 0, "max_running": 0}
+
+    def fake_pipeline(report_progress, date, articles=None, clusters=None):
+        with lock:
+            runs["clusters"][date] = clusters
+            runs["running"] += 1
+            runs["max_running"] = max(runs["max_running"], runs["running"])
+        time.sleep(0.05)
+        with lock:
+            runs["running"] -= 1
+
+    monkeypatch.setattr(backfill, "run_news_pipeline", fake_pipeline)
+    monkeypatch.setattr(backfill, "fetch_news", lambda date: [{**STORY, "url": f"https://news/{date:%Y-%m-%d}"}])
+    monkeypatch.setattr(backfill, "get_last_execution", lambda: {})
+    return runs
+
+
+def test_backfill_dedups_against_earlier_dates_of_the_same_run(recorded_runs):
+    end = START + timedelta(days=DEDUP_WINDOW_DAYS + 1)
+
+    summary = backfill.run_backfill(lambda **fields: None, START, end, force=True, workers=4)
+
+    assert summary["dates_done"] == DEDUP_WINDOW_DAYS + 2
+    earlier = [recorded_runs["clusters"][START + timedelta(days=i)][0]["earlier"] for i in range(DEDUP_WINDOW_DAYS + 2)]
+    # The first day's story is new, the copies within its window are duplicates of it,
+    # and the day after the window has no new story left to match and starts over
+    assert earlier[0] is None
+    assert all(match["url"] == f"https://news/{START:%Y-%m-%d}" for match in earlier[1:-1])
+    assert earlier[-1] is None
+
+
+def test_backfill_processes_dates_in_parallel(recorded_runs):
+    end = START + timedelta(days=7)
+
+    summary = backfill.run_backfill(lambda **fields: None, START, end, force=True, workers=4)
+
+    assert summary["dates_done"] == 8
+    assert recorded_runs["max_running"] > 2
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("openai")
+from trend_analysis import _parse_batch_verdicts, classify_headlines
+
+HEADLINE_COUNT = 20
+BATCH_SIZE = 10
+
+
+def headlines(tag):
+    # Tagged per test, so no verdict comes from an earlier test's cache
+    return [f"[{tag}] Headline {i}: " + ("rice prices surge" if i % 3 == 0 else "cricket final tonight")
+            for i in range(HEADLINE_COUNT)]
+
+
+def expected_verdicts():
+    return ["Relevant" if i % 3 == 0 else "Irrelevant" for i in range(HEADLINE_COUNT)]
+
+
+@pytest.mark.parametrize("batch_mode, requests", [
+    ("ok", 2),
+    # Every other verdict is missing and classified one by one
+    ("partial", 2 + HEADLINE_COUNT // 2),
+    # Nothing parses, every headline is classified one by one
+    ("malformed", 2 + HEADLINE_COUNT),
+])
+def test_batches_fall_back_to_single_headlines(fake_openai, batch_mode, requests):
+    fake_openai.batch_mode = batch_mode
+
+    verdicts = classify_headlines(headlines(batch_mode), batch_size=BATCH_SIZE)
+
+    assert verdicts == expected_verdicts()
+    assert fake_openai.request_count == requests
+
+
+def test_batch_verdicts_are_cached_per_headline(fake_openai):
+    titles = headlines("cached")
+    classify_headlines(titles, batch_size=BATCH_SIZE)
+    fake_openai.request_count = 0
+
+    # A different batching of the same headlines is answered from the cache
+    assert classify_headlines(titles[::-1], batch_size=3) == expected_verdicts()[::-1]
+    assert fake_openai.request_count == 0
+
+
+def test_parse_batch_verdicts_skips_invalid_entries():
+    response = """```json
+    [{"id": 1, "verdict": "relevant"}, {"id": 2, "verdict": "Maybe"}, {"id": 9, "verdict": "Relevant"},
+     {"id": "3", "verdict": "Irrelevant"}, "junk", {"id": 4, "verdict": " IRRELEVANT "}]
+    ```"""
+
+    assert _parse_batch_verdicts(response, 4) == {1: "Relevant", 4: "Irrelevant"}
+    assert _parse_batch_verdicts("not json", 4) == {}
+    assert _parse_batch_verdicts('{"id": 1}', 4) == {}
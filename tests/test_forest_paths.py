@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+import joblib
+from forest_compiler import FLAT_PREDICT_MAX_ROWS, compile_forest, predict_point, tree_outputs
+from forest_uncertainty import predict_with_intervals, tree_predictions
+from model_registry import MODEL_PATH
+
+
+@pytest.fixture(scope="module")
+def model():
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.mark.parametrize("n_rows", [3, FLAT_PREDICT_MAX_ROWS + 1])
+def test_flat_and_sklearn_paths_agree(model, n_rows):
+    rng = np.random.default_rng(0)
+    inputs = rng.uniform(0, 400, (n_rows, model.n_features_in_))
+    inputs[0, 0] = np.nan
+
+    outputs = tree_predictions(model, inputs)
+    predicted, lower, upper, _ = predict_with_intervals(model, inputs)
+
+    np.testing.assert_array_equal(outputs, tree_outputs(compile_forest(model), inputs))
+    np.testing.assert_array_equal(predicted, model.predict(inputs))
+    np.testing.assert_array_equal(predict_point(model, inputs), model.predict(inputs))
+    expected_lower, expected_upper = np.percentile(outputs, [5, 95], axis=1)
+    np.testing.assert_allclose(lower, expected_lower)
+    np.testing.assert_allclose(upper, expected_upper)
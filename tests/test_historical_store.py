@@ -0,0 +1,66 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+import historical_store
+from historical_store import HISTORICAL_COLUMNS, HistoricalStore, _parse_seasons
+
+
+def season(year, district, area=100.0):
+    row = {column: 1.0 for column in HISTORICAL_COLUMNS}
+    row.update(Year=year, District=district, Area=area)
+    return row
+
+
+@pytest.fixture
+def live_store(monkeypatch, tmp_path):
+    csv_path = tmp_path / "historical.csv"
+    rows = pd.DataFrame([season("2022-23", "Lahore"), season("2023-24", "Lahore"), season("2023-24", "Multan")],
+                        columns=HISTORICAL_COLUMNS)
+    rows.to_csv(csv_path, index=False)
+    monkeypatch.setattr(historical_store, "HISTORICAL_CSV_PATH", str(csv_path))
+    monkeypatch.setattr(historical_store, "_store", HistoricalStore(_parse_seasons(rows)))
+    monkeypatch.setattr(historical_store, "_csv_offset", csv_path.stat().st_size)
+    return csv_path
+
+
+def test_ingest_swaps_in_a_new_generation(live_store):
+    before = historical_store.get_store()
+
+    changed = historical_store.ingest_rows([season("2024-25", "Lahore")])
+
+    after = historical_store.get_store()
+    assert changed == ["Lahore"]
+    assert after.generation > before.generation
+    assert after.district_data("Lahore")["Historical_Data"]["Years"] == [2022, 2023, 2024]
+    assert before.district_data("Lahore")["Historical_Data"]["Years"] == [2022, 2023]
+
+
+@pytest.mark.parametrize("rows", [
+    [season("2023-24", "Lahore")],
+    [season(2023, "Multan")],
+    [season("2024-25", "Multan"), season("2024-25", "Multan", area=50.0)],
+])
+def test_ingest_rejects_repeated_seasons(live_store, rows):
+    csv_before = live_store.read_bytes()
+    store_before = historical_store.get_store()
+
+    with pytest.raises(ValueError, match="already present"):
+        historical_store.ingest_rows(rows)
+
+    assert live_store.read_bytes() == csv_before
+    assert historical_store.get_store() is store_before
+
+
+def test_watcher_skips_appended_rows_for_present_seasons(live_store):
+    changes = []
+    appended = pd.DataFrame([season("2023-24", "Multan", area=50.0), season("2024-25", "Multan")],
+                            columns=HISTORICAL_COLUMNS)
+    with open(live_store, "a", newline="") as f:
+        appended.to_csv(f, header=False, index=False)
+
+    historical_store._check_csv(changes.append)
+
+    assert changes == [["Multan"]]
+    multan = historical_store.get_store().district_data("Multan")["Historical_Data"]
+    assert multan["Years"] == [2023, 2024]
+    assert historical_store._csv_offset == live_store.stat().st_size
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import jobs
+from conftest import ROOT
+
+SUBMIT_SCRIPT = """
+import json, jobs
+job, created = jobs.submit({key!r}, str)
+print(json.dumps([job["id"], created]))
+"""
+
+
+def submit_in_other_process(key):
+    output = subprocess.run(
+        [sys.executable, "-c", SUBMIT_SCRIPT.format(key=key)],
+        env={**os.environ, "PYTHONPATH": os.path.join(ROOT, "backend")},
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def wait_for(job_id):
+    for _ in jobs.iter_events(job_id):
+        pass
+    return jobs.get_job(job_id)
+
+
+def test_running_job_is_returned_to_other_processes():
+    release = threading.Event()
+    job, created = jobs.submit("news:2024-11-01", lambda report_progress: release.wait(10))
+    assert created
+
+    other_id, other_created = submit_in_other_process("news:2024-11-01")
+    assert (other_id, other_created) == (job["id"], False)
+
+    release.set()
+    assert wait_for(job["id"])["status"] == "done"
+    _, created_after = submit_in_other_process("news:2024-11-01")
+    assert created_after
+
+
+def test_claim_of_dead_process_is_taken_over():
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    path = jobs._claim_path("news:2024-11-02")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"job_id": "0" * 32, "pid": dead.pid}, f)
+
+    job, created = jobs.submit("news:2024-11-02", str)
+
+    assert created
+    assert wait_for(job["id"])["status"] == "done"
+
+
+def test_backfill_claim_collapses_triggers_onto_the_backfill_job():
+    release = threading.Event()
+
+    def backfill(report_progress):
+        with jobs.claim("news:2024-11-03", jobs.current_job_id()) as claimed:
+            assert claimed
+            release.wait(10)
+
+    backfill_job, _ = jobs.submit("backfill:2024-11-03", backfill)
+    try:
+        # Wait until the backfill holds the date
+        for _ in range(100):
+            if os.path.exists(jobs._claim_path("news:2024-11-03")):
+                break
+            time.sleep(0.05)
+        job, created = jobs.submit("news:2024-11-03", str)
+        assert (job["id"], created) == (backfill_job["id"], False)
+        with jobs.claim("news:2024-11-03") as claimed:
+            assert not claimed
+    finally:
+        release.set()
+    assert wait_for(backfill_job["id"])["status"] == "done"
+    assert not os.path.exists(jobs._claim_path("news:2024-11-03"))
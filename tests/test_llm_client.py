@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip("openai")
+import llm_client
+
+
+def test_rate_limits_are_retried_until_they_pass(fake_openai, monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_MAX_RETRIES", 20)
+    monkeypatch.setattr(llm_client, "retry_delay", lambda *args: 0.0)
+    fake_openai.rate_limit_ratio = 0.5
+
+    answers = [llm_client.chat_completion("system", f"Headline: rice {i}", use_cache=False) for i in range(20)]
+
+    assert answers == ["Insight: Headline: rice " + str(i) for i in range(20)]
+    assert fake_openai.request_count > 20
+
+
+def test_rate_limit_is_raised_once_retries_run_out(fake_openai, monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_MAX_RETRIES", 2)
+    fake_openai.rate_limit_ratio = 1.0
+
+    with pytest.raises(llm_client.openai.RateLimitError):
+        llm_client.chat_completion("system", "Headline: rice", use_cache=False)
+    assert fake_openai.request_count == 3
+
+
+def test_cached_answers_make_no_request(fake_openai):
+    first = llm_client.chat_completion("system", "Headline: cached rice answer")
+    second = llm_client.chat_completion("system", "Headline: cached rice answer")
+
+    assert first == second
+    assert fake_openai.request_count == 1
+
+
+def test_map_concurrent_bounds_calls_in_flight_and_keeps_order(fake_openai):
+    fake_openai.latency = 0.05
+
+    answers = llm_client.map_concurrent(
+        lambda i: llm_client.chat_completion("system", f"prompt {i}", use_cache=False), range(16), concurrency=4
+    )
+
+    assert answers == [f"Insight: prompt {i}" for i in range(16)]
+    assert fake_openai.request_count == 16
+    assert fake_openai.max_in_flight == 4
@@ -0,0 +1,45 @@
+import pytest
+
+joblib = pytest.importorskip("joblib")
+import model_registry
+
+
+def test_failed_reload_is_not_retried_until_the_file_changes(monkeypatch, tmp_path):
+    path = str(tmp_path / "model.pkl")
+    joblib.dump({"version": 1}, path)
+    sha256 = model_registry.file_sha256(path)
+    monkeypatch.setattr(model_registry, "_models", model_registry.OrderedDict())
+    monkeypatch.setattr(model_registry, "_failed_signatures", {})
+    assert model_registry.get_model(path, sha256) == {"version": 1}
+
+    # A file that does not match the manifest checksum keeps the previous model
+    joblib.dump({"version": 2, "padding": "x" * 100}, path)
+    hashed = []
+    real_file_sha256 = model_registry.file_sha256
+    monkeypatch.setattr(model_registry, "file_sha256", lambda p: hashed.append(p) or real_file_sha256(p))
+    for _ in range(3):
+        assert model_registry.get_model(path, sha256) == {"version": 1}
+    assert len(hashed) == 1
+
+    joblib.dump({"version": 3}, path)
+    assert model_registry.get_model(path, model_registry.file_sha256(path)) == {"version": 3}
+    assert model_registry._failed_signatures == {}
+
+
+def test_warm_up_export_is_written_once_and_memory_mapped(monkeypatch, tmp_path):
+    np = pytest.importorskip("numpy")
+    ensemble = pytest.importorskip("sklearn.ensemble")
+    from forest_compiler import FlatForestModel
+
+    rng = np.random.default_rng(0)
+    inputs = rng.uniform(0, 1, (50, 3))
+    model = ensemble.RandomForestRegressor(n_estimators=5, random_state=0).fit(inputs, inputs.sum(axis=1))
+    path = str(tmp_path / "model.pkl")
+    joblib.dump(model, path)
+    monkeypatch.setattr(model_registry, "_models", model_registry.OrderedDict())
+
+    assert model_registry.ensure_flat_export(path, model)
+    assert not model_registry.ensure_flat_export(path, model)
+    served = model_registry.get_model(path)
+    assert isinstance(served, FlatForestModel)
+    np.testing.assert_array_equal(served.predict(inputs), model.predict(inputs))
@@ -0,0 +1,55 @@
+from datetime import datetime
+import pytest
+
+pytest.importorskip("requests")
+import news_client
+from trend_analysis import fetch_news
+
+OLD_DATE = datetime(2024, 11, 1)
+
+
+def test_all_pages_are_fetched_once(fake_newsapi):
+    fake_newsapi.articles_per_day = 250
+
+    articles = fetch_news(OLD_DATE, use_cache=False)
+
+    assert [article["url"] for article in articles] == [f"https://example.com/2024-11-01/{i}" for i in range(250)]
+    assert fake_newsapi.request_count == 3
+
+
+def test_failed_pages_are_retried(fake_newsapi, monkeypatch):
+    monkeypatch.setattr(news_client, "NEWS_MAX_RETRIES", 20)
+    fake_newsapi.articles_per_day = 500
+    fake_newsapi.error_ratio = 0.3
+
+    articles = fetch_news(OLD_DATE, use_cache=False)
+
+    assert len(articles) == 500
+    assert fake_newsapi.request_count == 5 + fake_newsapi.error_count
+
+
+def test_fetch_fails_once_retries_run_out(fake_newsapi, monkeypatch):
+    monkeypatch.setattr(news_client, "NEWS_MAX_RETRIES", 2)
+    fake_newsapi.error_ratio = 1.0
+
+    with pytest.raises(RuntimeError, match="after 3 attempts"):
+        fetch_news(OLD_DATE, use_cache=False)
+    assert fake_newsapi.request_count == 3
+
+
+def test_past_dates_are_served_from_the_cache(fake_newsapi):
+    first = fetch_news(OLD_DATE)
+    fake_newsapi.request_count = 0
+
+    assert fetch_news(OLD_DATE) == first
+    assert fake_newsapi.request_count == 0
+
+
+def test_recent_dates_are_revalidated_with_etag(fake_newsapi, monkeypatch):
+    monkeypatch.setattr(news_client, "NEWS_CACHE_RECENT_TTL_SECONDS", 0)
+    first = fetch_news(datetime.now())
+    fake_newsapi.request_count = 0
+
+    assert fetch_news(datetime.now()) == first
+    assert fake_newsapi.request_count == 1
+    assert fake_newsapi.not_modified_count == 1
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("requests")
+import jobs
+
+STAGES = ["verdict", "insight", "tldr_token", "done"]
+
+
+@pytest.fixture
+def pipeline(fake_openai, fake_newsapi, monkeypatch, tmp_path):
+    import trend_analysis
+    monkeypatch.setattr(trend_analysis, "execution_log_file", str(tmp_path / "last_execution.json"))
+    fake_openai.token_delay = 0.01
+    fake_newsapi.articles_per_day = 6
+    # Fresh headlines for every test, so nothing is answered from the LLM cache
+    fake_newsapi.run_tag = tmp_path.name
+    return trend_analysis
+
+
+def assert_stages_in_order(types):
+    assert types[-1] == "done"
+    firsts = [types.index(stage) for stage in STAGES]
+    assert firsts == sorted(firsts)
+    # Every verdict arrives before the first insight, every insight before the TL;DR
+    last_verdict = max(i for i, kind in enumerate(types) if kind == "verdict")
+    last_insight = max(i for i, kind in enumerate(types) if kind == "insight")
+    assert last_verdict < types.index("insight") and last_insight < types.index("tldr_token")
+
+
+def test_pipeline_events_arrive_in_order_and_replay(pipeline, fake_openai):
+    date = datetime(2024, 11, 4)
+    job, _ = jobs.submit(f"news:{date:%Y-%m-%d}", pipeline.run_news_pipeline, date)
+
+    events = [event for _, event in jobs.iter_events(job["id"])]
+
+    types = [event["type"] for event in events if event["type"] != "progress"]
+    assert_stages_in_order(types)
+    tldr = "".join(event["text"] for event in events if event["type"] == "tldr_token")
+    assert tldr.strip() == "- Rice supply is stable.\n- Prices are expected to rise."
+    assert [event for _, event in jobs.iter_events(job["id"], start=5)] == events[5:]
+
+
+def parse_sse(body):
+    frames = []
+    for block in body.decode("utf-8").split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            frames.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+def test_news_stream_endpoint_and_last_event_id_replay(pipeline, client):
+    response = client.post("/news/stream?date=2024-11-05")
+    assert response.mimetype == "text/event-stream"
+    frames = parse_sse(response.get_data())
+
+    assert frames[0][1] == "job"
+    assert_stages_in_order([kind for _, kind, _ in frames[1:] if kind != "progress"])
+    job_id = frames[0][2]["id"]
+
+    replay = parse_sse(client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": "3"}).get_data())
+    assert replay[0][1] == "job"
+    assert replay[1:] == [frame for frame in frames[1:] if int(frame[0]) > 3]
+
+
+def test_streams_are_closed_and_resumed_with_last_event_id(pipeline, client, monkeypatch):
+    import api
+    monkeypatch.setattr(api, "SSE_STREAM_SECONDS", 0)
+
+    frames = parse_sse(client.post("/news/stream?date=2024-11-06").get_data())
+    job_id = frames[0][2]["id"]
+    # Reconnect like the Trends page until the job's final event arrives
+    while frames[-1][1] not in ("done", "failed"):
+        ids = [frame[0] for frame in frames if frame[0] is not None]
+        headers = {"Last-Event-ID": ids[-1]} if ids else {}
+        resumed = parse_sse(client.get(f"/jobs/{job_id}/events", headers=headers).get_data())
+        frames += [frame for frame in resumed if frame[1] != "job"]
+
+    ids = [int(frame[0]) for frame in frames if frame[0] is not None]
+    assert ids == list(range(len(ids)))
+    assert_stages_in_order([kind for _, kind, _ in frames if kind not in ("job", "progress")])
@@ -0,0 +1,52 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+from training.relevance import TARGET_PRECISION, choose_thresholds, evaluate
+
+
+def test_thresholds_do_not_cross_on_separable_labels():
+    # Well separated, but so few relevant headlines that a running precision over all of them stays above target
+    rng = np.random.default_rng(0)
+    labels = np.array([0] * 290 + [1] * 10)
+    probabilities = np.concatenate([rng.uniform(0.0, 0.3, 290), rng.uniform(0.7, 1.0, 10)])
+
+    thresholds = choose_thresholds(probabilities, labels)
+    report = evaluate(probabilities, labels, thresholds)
+
+    assert thresholds["irrelevant_below"] < thresholds["relevant_above"]
+    assert report["irrelevant"]["decided"] + report["relevant"]["decided"] <= len(labels)
+    for side in ("irrelevant", "relevant"):
+        if report[side]["decided"]:
+            assert report[side]["precision"] >= TARGET_PRECISION
+
+
+def test_threshold_never_splits_tied_probabilities():
+    probabilities = np.array([0.1, 0.2, 0.2, 0.2, 0.9])
+    labels = np.array([0, 0, 1, 1, 1])
+
+    thresholds = choose_thresholds(probabilities, labels, target_precision=0.9)
+
+    assert thresholds["irrelevant_below"] == 0.1
+    assert thresholds["relevant_above"] == 0.9
+
+
+def test_trained_filter_meets_target_precision(monkeypatch, tmp_path):
+    pytest.importorskip("sklearn")
+    from training import relevance
+
+    relevant = ["rice export prices climb", "basmati harvest delayed by floods", "paddy procurement target raised",
+                "rice tariff cut by importers", "monsoon threatens rice yield"]
+    irrelevant = ["cricket final tonight", "stock markets close higher", "new phone launched",
+                  "football transfer rumours", "film festival opens"]
+    rows = [(f"{title} {i}", "Relevant") for i in range(30) for title in relevant]
+    rows += [(f"{title} {i}", "Irrelevant") for i in range(30) for title in irrelevant]
+    monkeypatch.setattr(relevance.insights_store, "llm_labelled_headlines", lambda: rows)
+
+    meta = relevance.run_relevance_training(output_path=str(tmp_path / "relevance_filter.pkl"))
+
+    thresholds, report = meta["thresholds"], meta["cross_validation"]
+    assert thresholds["irrelevant_below"] < thresholds["relevant_above"]
+    assert report["relevant_dropped"] == 0
+    for side in ("irrelevant", "relevant"):
+        if report[side]["decided"]:
+            assert report[side]["precision"] >= TARGET_PRECISION
@@ -0,0 +1,30 @@
+import math
+import pytest
+
+from retry_backoff import retry_delay
+
+MAX_SECONDS = 60.0
+
+
+def response(retry_after):
+    return type("Response", (), {"headers": {"Retry-After": retry_after}})()
+
+
+@pytest.mark.parametrize("retry_after, expected", [
+    ("2.5", 2.5),
+    ("86400", MAX_SECONDS),
+    ("inf", MAX_SECONDS),
+])
+def test_retry_after_is_honoured_up_to_the_maximum(retry_after, expected):
+    assert retry_delay(response(retry_after), 0, 1.0, MAX_SECONDS) == expected
+
+
+@pytest.mark.parametrize("retry_after", ["-5", "nan", "soon"])
+def test_unusable_retry_after_falls_back_to_backoff(retry_after):
+    delay = retry_delay(response(retry_after), 3, 1.0, MAX_SECONDS)
+    assert not math.isnan(delay)
+    assert 4.0 <= delay <= 12.0
+
+
+def test_backoff_is_capped():
+    assert retry_delay(None, 20, 1.0, 5.0) == 5.0
@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip("sklearn")
+import scenarios
+from scenarios import MAX_SCENARIOS, run_scenarios
+
+DISTRICT = next(iter(scenarios.HARDCODED_DATA))
+MONTE_CARLO = {"mode": "monte_carlo", "parameters": {"Area": {"distribution": "uniform", "low": 1, "high": 2}}}
+
+
+@pytest.mark.parametrize("body, message", [
+    ({"parameters": {"Area": {"start": 1, "stop": 2, "steps": 10 ** 12}}}, "limit"),
+    ({"parameters": {"Area": {"start": 1, "stop": 2, "steps": MAX_SCENARIOS},
+                     "Growth_Rainfall": {"start": 1, "stop": 2, "steps": 2}}}, "limit"),
+    ({"parameters": {"Area": {"values": list(range(MAX_SCENARIOS + 1))}}}, "limit"),
+    ({"parameters": {"Area": {"values": 5}}}, "list"),
+    ({"parameters": {"Area": {"start": 1, "stop": 2, "steps": 0}}}, "at least one"),
+    ({"parameters": {"Area": {"values": [1, 2]}}, "percentiles": 50}, "percentiles"),
+    ({"parameters": {"Area": {"values": [1, 2]}}, "percentiles": ["median"]}, "percentiles"),
+    ([1, 2, 3], "object"),
+    ({**MONTE_CARLO, "seed": "x"}, "seed"),
+    ({**MONTE_CARLO, "seed": -1}, "seed"),
+    ({**MONTE_CARLO, "seed": 1.5}, "seed"),
+])
+def test_invalid_bodies_raise_value_error(body, message):
+    with pytest.raises(ValueError, match=message):
+        run_scenarios(DISTRICT, body)
+
+
+def test_grid_within_limit_is_scored():
+    result = run_scenarios(DISTRICT, {"parameters": {"Area": {"start": 100, "stop": 200, "steps": 3}}})
+
+    assert result["scenario_count"] == 3
+    assert result["Production_Bands"]["Area"]["values"] == [100.0, 150.0, 200.0]
@@ -0,0 +1,54 @@
+import threading
+import pytest
+
+pytest.importorskip("sklearn")
+import crop_prediction
+
+
+def test_shadow_scoring_is_skipped_when_the_queue_is_full(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def slow_shadow_score(*args):
+        calls.append(args)
+        release.wait(10)
+
+    monkeypatch.setattr(crop_prediction, "_shadow_score", slow_shadow_score)
+    monkeypatch.setattr(crop_prediction, "_shadow_slots", threading.BoundedSemaphore(2))
+    monkeypatch.setattr(crop_prediction, "_shadow_stats", {"scored": 0, "failed": 0, "dropped": 0})
+
+    for _ in range(5):
+        crop_prediction._submit_shadow("shadow", None, "primary", None)
+    assert crop_prediction.get_shadow_stats()["dropped"] == 3
+
+    release.set()
+    crop_prediction._shadow_executor.submit(lambda: None).result(10)
+    # Both slots are free again once the queued batches ran
+    crop_prediction._submit_shadow("shadow", None, "primary", None)
+    crop_prediction._shadow_executor.submit(lambda: None).result(10)
+    assert len(calls) == 3
+    assert crop_prediction.get_shadow_stats()["dropped"] == 3
+
+
+def test_shadow_runs_are_counted_by_outcome(monkeypatch):
+    import numpy as np
+
+    class ConstantModel:
+        def predict(self, inputs):
+            return np.ones(len(inputs))
+
+    versions = {"good": ("good", ConstantModel(), {}), "bad": None}
+
+    def fake_get_model_version(version):
+        if versions[version] is None:
+            raise ValueError(f"Unknown model version '{version}'")
+        return versions[version]
+
+    monkeypatch.setattr(crop_prediction, "get_model_version", fake_get_model_version)
+    monkeypatch.setattr(crop_prediction, "_shadow_stats", {"scored": 0, "failed": 0, "dropped": 0})
+    inputs = np.zeros((2, len(crop_prediction.WEATHER_FEATURES)))
+
+    crop_prediction._shadow_score("good", inputs, "primary", np.zeros(2))
+    crop_prediction._shadow_score("bad", inputs, "primary", np.zeros(2))
+
+    assert crop_prediction.get_shadow_stats() == {"scored": 1, "failed": 1, "dropped": 0}